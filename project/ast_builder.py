@@ -0,0 +1,594 @@
+from token_types import TokenType  # Import TokenType Enum
+from token_cursor import TokenCursor  # Import token cursor
+from block_index import is_invalid_case_token  # Import switch case validation
+from runtime import SHORT_CIRCUIT_OPS  # Import the short-circuiting boolean operators
+from ast_nodes import (Program, Literal, Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast,
+                       FunctionCall, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Case, Switch, Loop, FunctionDef, Break, Return, Raise, BukkitOp)  # Import AST node classes
+
+# tokens that end a VISIBLE argument list
+VISIBLE_TERMINATORS = {TokenType.GIMMEH, TokenType.KTHXBYE,
+                       TokenType.YA_RLY, TokenType.NO_WAI, TokenType.MEBBE,
+                       TokenType.OIC, TokenType.O_RLY,
+                       TokenType.IM_OUTTA_YR, TokenType.OMG,
+                       TokenType.OMGWTF, TokenType.GTFO,
+                       TokenType.VISIBLE, TokenType.BTW, TokenType.IS_NOW_A,
+                       TokenType.I_HAS_A, TokenType.IM_IN_YR,
+                       TokenType.I_IZ, TokenType.FOUND_YR,
+                       TokenType.HOW_IZ_I, TokenType.IF_U_SAY_SO,
+                       TokenType.PUT_IN, TokenType.SHUV_IN}
+
+# numeric operator tokens
+NUMERIC_OPS = {TokenType.SUM_OF, TokenType.DIFF_OF, TokenType.PRODUKT_OF,
+               TokenType.QUOSHUNT_OF, TokenType.MOD_OF, TokenType.BIGGR_OF,
+               TokenType.SMALLR_OF}
+
+# variadic boolean operator tokens
+BOOLEAN_OPS = {TokenType.ALL_OF, TokenType.ANY_OF, TokenType.BOTH_OF,
+               TokenType.EITHER_OF, TokenType.WON_OF}
+
+# BUKKIT operator tokens -> number of operands (separated by AN)
+BUKKIT_OPS = {TokenType.PIK_OF: 2, TokenType.SIZ_OF: 1, TokenType.PUT_IN: 3, TokenType.SHUV_IN: 2}
+
+# blocks closed by OIC (used to skip nested conditionals and switches)
+OIC_BLOCKS = {TokenType.O_RLY, TokenType.WTF}
+
+# error raised for tokens that are not a valid switch case
+def case_error(token):
+    return SyntaxError(f"Syntax Error at line {token.line}: Expected OMG or OMGWTF in switch case, got '{token.value}'")
+
+# error inside an expression or VISIBLE: steps are the expressions the token interpreter evaluates
+# before it reaches the error (the operands parsed before it, in order)
+class IncompleteExpression(Exception):
+    def __init__(self, error, steps):
+        super().__init__(error)
+        self.error = error
+        self.steps = steps
+
+# error inside a statement that checks something before it gets to the error (the variable of an
+# assignment or of a loop); statement does that check and then raises the error
+class IncompleteStatement(Exception):
+    def __init__(self, statement):
+        super().__init__(statement)
+        self.statement = statement
+
+# (error, steps) of an exception raised while parsing an expression
+def error_steps(error):
+    if type(error) is IncompleteExpression:
+        return error.error, error.steps
+    return error, ()
+
+# statement that stands for a statement whose parsing failed with error
+def error_statement(error, line):
+    if type(error) is IncompleteStatement:
+        return error.statement
+    error, steps = error_steps(error)
+    return Raise(error, steps, line)
+
+# ASTBuilder class for turning tokens into an immutable AST
+# the grammar follows the token interpreter in parser.py so both accept the same programs;
+# syntax errors inside a block become Raise nodes so they are reported when (and only if) execution reaches them,
+# placed at the failing operand or clause so that what runs before the error still runs
+class ASTBuilder(TokenCursor):
+    def __init__(self, tokens):
+        super().__init__(tokens)
+        self.in_function = False
+
+    # build the Program node
+    def build(self):
+        statements = []
+        try:
+            # parse any function definitions before HAI
+            while self.current_token() and self.current_token().type == TokenType.HOW_IZ_I:
+                statements.append(self.parse_function_definition())
+
+            # Expect HAI to start main program
+            self.expect(TokenType.HAI)
+
+            # Optional variable declaration section
+            if self.current_token() and self.current_token().type == TokenType.WAZZUP:
+                self.advance()
+                while self.current_token() and self.current_token().type != TokenType.BUHBYE:
+                    statements.append(self.parse_variable_declaration())
+                self.expect(TokenType.BUHBYE)
+
+            # Main program body
+            while self.current_token() and self.current_token().type != TokenType.KTHXBYE:
+                if self.current_token().type == TokenType.HOW_IZ_I:
+                    statements.append(self.parse_function_definition())
+                else:
+                    statements.append(self.parse_statement())
+                self.release_tokens()
+
+            # Expect KTHXBYE to end main program
+            self.expect(TokenType.KTHXBYE)
+
+            # parse any function definitions after KTHXBYE
+            while self.current_token() and self.current_token().type == TokenType.HOW_IZ_I:
+                statements.append(self.parse_function_definition())
+
+            if self.current_token():
+                token = self.current_token()
+                raise SyntaxError(
+                    f"Syntax Error at line {token.line}: "
+                    f"Unexpected token '{token.value}' after KTHXBYE."
+                )
+        except Exception as error:
+            # the rest of the program is never reached at runtime
+            statements.append(error_statement(error, self.current_line()))
+
+        return Program(tuple(statements))
+
+    # line of the current token (None at end of input)
+    def current_line(self):
+        token = self.current_token()
+        return token.line if token else None
+
+    # parse statements until a terminator token or the end position
+    # an error ends the block: the statement standing for it is added and the rest of the block is skipped
+    def parse_block(self, terminators, end=None, validate_cases=False):
+        statements = []
+        while True:
+            token = self.current_token()
+            if not token or token.type in terminators:
+                break
+            if end is not None and self.position >= end:
+                break
+            start = self.position
+            try:
+                # statements in switch cases are validated before they run
+                if validate_cases and is_invalid_case_token(token):
+                    raise case_error(token)
+                statements.append(self.parse_statement())
+            except Exception as error:
+                statements.append(error_statement(error, token.line))
+                self.skip_block(start, terminators, end)
+                break
+        return tuple(statements)
+
+    # skip the rest of a block after an error in the statement starting at start
+    def skip_block(self, start, terminators, end=None):
+        if end is not None:
+            self.position = end
+        else:
+            self.position = self.find_block_end(start, terminators)
+
+    # find the first terminator at the current nesting level, counting O RLY?/WTF? ... OIC pairs
+    def find_block_end(self, position, terminators):
+        depth = 0
+        token = self.token_at(position)
+        while token:
+            if token.type in OIC_BLOCKS:
+                depth += 1
+            elif depth == 0 and token.type in terminators:
+                break
+            elif token.type == TokenType.OIC:
+                depth -= 1
+            position += 1
+            token = self.token_at(position)
+        return position
+
+    # parse variable declaration inside WAZZUP
+    def parse_variable_declaration(self):
+        line = self.expect(TokenType.I_HAS_A).line
+        var_name = self.expect(TokenType.IDENTIFIER).value
+
+        value = None  # NOOB by default
+
+        if self.current_token() and self.current_token().type == TokenType.ITZ:
+            self.advance()
+            value = self.parse_expression()
+
+        return Declaration(var_name, value, line)
+
+    # parse a general statement
+    def parse_statement(self):
+        token = self.current_token()
+
+        if token.type == TokenType.I_HAS_A:
+            raise SyntaxError(f"Syntax Error at line {token.line}: Variable declaration outside WAZZUP")
+        elif token.type == TokenType.VISIBLE:
+            return self.parse_visible()
+        elif token.type == TokenType.GIMMEH:
+            self.advance()
+            return Gimmeh(self.expect(TokenType.IDENTIFIER).value, token.line)
+        elif token.type == TokenType.O_RLY:
+            return self.parse_if_then_else()
+        elif token.type == TokenType.WTF:
+            return self.parse_switch()
+        elif token.type == TokenType.IM_IN_YR:
+            return self.parse_loop()
+        elif token.type == TokenType.GTFO:
+            self.advance()
+            # GTFO inside a function returns NOOB
+            if self.in_function:
+                return Return(None, token.line)
+            return Break(token.line)
+        elif token.type == TokenType.FOUND_YR:
+            self.advance()
+            return Return(self.parse_expression(), token.line)
+        elif token.type == TokenType.IDENTIFIER:
+            if self.peek() and self.peek().type == TokenType.R:
+                return self.parse_assignment()
+            elif self.peek() and self.peek().type == TokenType.IS_NOW_A:
+                return self.parse_type_cast()
+        return ExpressionStatement(self.parse_expression(), token.line)
+
+    # parse assignment statement
+    # the variable is checked before the value is evaluated, so an error in the value is raised in its place
+    def parse_assignment(self):
+        token = self.expect(TokenType.IDENTIFIER)
+        self.expect(TokenType.R)
+        try:
+            value = self.parse_expression()
+        except Exception as error:
+            error, steps = error_steps(error)
+            raise IncompleteStatement(Assignment(token.value, Raise(error, steps, token.line), token.line))
+        return Assignment(token.value, value, token.line)
+
+    # parse type cast statement
+    def parse_type_cast(self):
+        token = self.expect(TokenType.IDENTIFIER)
+        self.expect(TokenType.IS_NOW_A)
+        type_name = self.current_token().value # get target type
+        self.advance()
+        return TypeCast(token.value, type_name, token.line)
+
+    # parse VISIBLE statement
+    def parse_visible(self):
+        line = self.current_token().line
+        self.advance()
+        parts = []
+
+        while self.current_token():
+            token = self.current_token()
+
+            # Break on statement-ending tokens
+            if token.type in VISIBLE_TERMINATORS:
+                break
+
+            # Break on assignment or type cast statement
+            if token.type == TokenType.IDENTIFIER and self.peek() and self.peek().type in (TokenType.R, TokenType.IS_NOW_A):
+                break
+
+            # Skip AN / PLUS separators
+            if token.type == TokenType.AN or token.type == TokenType.PLUS:
+                self.advance()
+                continue
+
+            try:
+                parts.append(self.parse_expression())
+            except Exception as error:
+                # the parts before the error are evaluated, nothing is printed
+                error, steps = error_steps(error)
+                raise IncompleteExpression(error, tuple(parts) + steps)
+
+        return Visible(tuple(parts), line)
+
+    # parse IF-THEN-ELSE statement
+    def parse_if_then_else(self):
+        line = self.current_token().line
+        block_end = self.blocks.end(self.position)
+        self.advance()  # consume O RLY?
+        branch = self.position
+        self.expect(TokenType.YA_RLY)
+
+        # after a branch the next one is found with the block index like in the token interpreter,
+        # so a stray YA RLY ends the chain of branches
+        then_body = self.parse_block({TokenType.NO_WAI, TokenType.MEBBE, TokenType.OIC})
+        self.position = self.blocks.next_branch(branch)
+
+        # MEBBE <condition> branches
+        mebbe_clauses = []
+        while self.current_token() and self.current_token().type == TokenType.MEBBE:
+            branch = self.position
+            self.advance()
+            try:
+                condition = self.parse_expression()
+                body = self.parse_block({TokenType.NO_WAI, TokenType.MEBBE, TokenType.OIC})
+            except Exception as error:
+                # raised if the condition is reached, the branch body is never run
+                error, steps = error_steps(error)
+                condition, body = Raise(error, steps, self.token_at(branch).line), ()
+            mebbe_clauses.append((condition, body))
+            self.position = self.blocks.next_branch(branch)
+
+        # NO WAI branch
+        else_body = None
+        if self.current_token() and self.current_token().type == TokenType.NO_WAI:
+            self.advance()
+            else_body = self.parse_block({TokenType.OIC})
+
+        self.position = block_end
+        end_error = None
+        try:
+            self.expect(TokenType.OIC)
+        except SyntaxError as error:
+            end_error = error
+
+        return If(then_body, tuple(mebbe_clauses), else_body, end_error, line)
+
+    # first invalid case token between the current position and the end of the case (raised when the case is skipped)
+    def find_skip_error(self, terminators):
+        end = self.find_block_end(self.position, terminators)
+        for index in range(self.position, end):
+            token = self.token_at(index)
+            if is_invalid_case_token(token):
+                return case_error(token)
+        return None
+
+    # parse SWITCH statement
+    def parse_switch(self):
+        line = self.current_token().line
+        self.advance()  # consume WTF?
+
+        case_terminators = {TokenType.OMG, TokenType.OMGWTF, TokenType.OIC}
+        cases = []
+        default = None
+
+        # process cases until OIC
+        while self.current_token() and self.current_token().type != TokenType.OIC:
+            token = self.current_token()
+
+            if token.type == TokenType.OMG:
+                self.advance()
+                start = self.position
+                try:
+                    label = self.parse_expression()
+                except Exception as error:
+                    # the switch stops at a bad case label
+                    error, steps = error_steps(error)
+                    cases.append(Case(Raise(error, steps, token.line), (), None, token.line))
+                    self.position = self.find_block_end(start, {TokenType.OIC})
+                    break
+                skip_error = self.find_skip_error(case_terminators)
+                body = self.parse_block(case_terminators, validate_cases=True)
+                cases.append(Case(label, body, skip_error, token.line))
+
+            elif token.type == TokenType.OMGWTF:
+                self.advance()
+                skip_error = self.find_skip_error({TokenType.OIC})
+                body = self.parse_block({TokenType.OIC}, validate_cases=True)
+                default = Case(None, body, skip_error, token.line)
+
+            else:
+                # invalid token in switch case
+                raise case_error(token)
+
+        # expect OIC to end switch
+        if self.current_token() and self.current_token().type == TokenType.OIC:
+            self.advance()
+
+        return Switch(tuple(cases), default, line)
+
+    # parse loop statement
+    def parse_loop(self):
+        line = self.current_token().line
+        loop_start = self.position
+        self.advance()  # consume IM IN YR
+        loop_name = self.expect(TokenType.IDENTIFIER).value
+
+        # Check for operation (UPPIN or NERFIN)
+        operation = None
+        loop_var = None
+        if self.current_token() and self.current_token().type in [TokenType.UPPIN, TokenType.NERFIN]:
+            operation = self.current_token().type
+            self.advance()
+            self.expect(TokenType.YR)
+            loop_var = self.expect(TokenType.IDENTIFIER).value
+
+        # Check for condition (TIL or WILE)
+        condition_type = None
+        condition = None
+        if self.current_token() and self.current_token().type in [TokenType.TIL, TokenType.WILE]:
+            condition_type = self.current_token().type
+            self.advance()
+            try:
+                condition = self.parse_expression()
+            except Exception as error:
+                # the token interpreter checks the loop variable and then only the syntax of the condition
+                error, _ = error_steps(error)
+                if loop_var is None:
+                    raise error
+                raise IncompleteStatement(Loop(loop_name, operation, loop_var, None, None, (Raise(error, (), line),),
+                                               None, (), line))
+
+        # End of the loop from the block index
+        loop_end = self.blocks.end(loop_start)
+
+        body = self.parse_block({TokenType.IM_OUTTA_YR}, end=loop_end)
+
+        # closing label is checked when the loop finishes
+        self.position = loop_end
+        end_error = None
+        if self.current_token() and self.current_token().type == TokenType.IM_OUTTA_YR:
+            self.advance()
+            try:
+                expected_name = self.expect(TokenType.IDENTIFIER).value
+                if expected_name != loop_name:
+                    end_error = SyntaxError(f"Loop name mismatch: expected '{loop_name}', got '{expected_name}'")
+            except SyntaxError as error:
+                end_error = error
+
+        return Loop(loop_name, operation, loop_var, condition_type, condition, body, end_error, (), line)
+
+    # parse function definition
+    def parse_function_definition(self):
+        line = self.current_token().line
+        func_start = self.position
+        self.advance()  # consume HOW IZ I
+        func_name = self.expect(TokenType.IDENTIFIER).value
+
+        # Parse parameters
+        params = []
+        while self.current_token() and self.current_token().type == TokenType.YR:
+            self.advance()
+            params.append(self.expect(TokenType.IDENTIFIER).value)
+            if self.current_token() and self.current_token().type == TokenType.AN:
+                self.advance()
+
+        # End of function from the block index
+        func_end = self.blocks.end(func_start)
+
+        # function body is parsed with GTFO meaning return
+        old_in_function = self.in_function
+        self.in_function = True
+        try:
+            body = self.parse_block(set(), end=func_end)
+        finally:
+            self.in_function = old_in_function
+
+        # Skip to end of function
+        self.position = func_end
+        if self.current_token() and self.current_token().type == TokenType.IF_U_SAY_SO:
+            self.advance()
+
+        return FunctionDef(func_name, tuple(params), body, line)
+
+    # parse function call
+    def parse_function_call(self):
+        line = self.current_token().line
+        self.advance()  # consume I IZ
+        func_name = self.expect(TokenType.IDENTIFIER).value
+
+        # Parse arguments
+        args = []
+        try:
+            while self.current_token() and self.current_token().type == TokenType.YR:
+                self.advance()
+                args.append(self.parse_expression())
+                if self.current_token() and self.current_token().type == TokenType.AN:
+                    self.advance()
+        except Exception as error:
+            # the function is looked up and the arguments before the error are evaluated first
+            error, steps = error_steps(error)
+            args.append(Raise(error, steps, line))
+            raise IncompleteExpression(error, (FunctionCall(func_name, tuple(args), line),))
+
+        if self.current_token() and self.current_token().type == TokenType.MKAY:
+            self.advance()
+
+        return FunctionCall(func_name, tuple(args), line)
+
+    # parse expression into a node
+    def parse_expression(self):
+        token = self.current_token()
+
+        # check for end of tokens
+        if not token:
+            raise SyntaxError("Unexpected end of input")
+
+        # Literals
+        if token.type == TokenType.NUMBR_LITERAL:
+            self.advance()
+            return Literal(int(token.value), token.line)
+
+        if token.type == TokenType.NUMBAR_LITERAL:
+            self.advance()
+            return Literal(float(token.value), token.line)
+
+        if token.type == TokenType.YARN_LITERAL:
+            self.advance()
+            return Literal(token.value[1:-1], token.line)  # Remove quotes
+
+        if token.type == TokenType.TROOF_LITERAL:
+            self.advance()
+            return Literal(token.value == "WIN", token.line)
+
+        if token.type == TokenType.NOOB:
+            self.advance()
+            return Literal(None, token.line)
+
+        # Variable reference
+        if token.type == TokenType.IDENTIFIER:
+            self.advance()
+            return Variable(token.value, token.line)
+
+        # Function call as expression
+        if token.type == TokenType.I_IZ:
+            return self.parse_function_call()
+
+        operands = []  # operands of the operation parsed so far
+        try:
+            return self.parse_operation(token, operands)
+        except Exception as error:
+            raise self.incomplete_operation(token, operands, error)
+
+    # parse an operation (the current token is its operator), adding each operand to operands as it is parsed
+    def parse_operation(self, token, operands):
+        # arithmetic operations
+        if token.type in NUMERIC_OPS:
+            self.advance()
+            operands.append(self.parse_expression())
+            self.expect(TokenType.AN)
+            operands.append(self.parse_expression())
+            self.skip_mkay()
+            return NumericOp(token.type, operands[0], operands[1], token.line)
+
+        # Boolean operations
+        if token.type in BOOLEAN_OPS:
+            self.advance()
+            operands.append(self.parse_expression())
+            while self.current_token() and self.current_token().type == TokenType.AN:
+                self.advance()
+                operands.append(self.parse_expression())
+            self.skip_mkay()
+            return BooleanOp(token.type, tuple(operands), token.line)
+
+        if token.type == TokenType.NOT:
+            self.advance()
+            return Not(self.parse_expression(), token.line)
+
+        # Comparison
+        if token.type == TokenType.BOTH_SAEM or token.type == TokenType.DIFFRINT:
+            self.advance()
+            operands.append(self.parse_expression())
+            self.expect(TokenType.AN)
+            operands.append(self.parse_expression())
+            self.skip_mkay()
+            return Comparison(token.type, operands[0], operands[1], token.line)
+
+        # String concatenation
+        if token.type == TokenType.SMOOSH:
+            self.advance()
+            while self.current_token() and self.current_token().type not in [TokenType.MKAY,
+                                                                             TokenType.I_HAS_A,
+                                                                             TokenType.VISIBLE]:
+                operands.append(self.parse_expression())
+                if self.current_token() and self.current_token().type == TokenType.AN:
+                    self.advance()
+                else:
+                    break
+            self.skip_mkay()
+            return Smoosh(tuple(operands), token.line)
+
+        # BUKKITs
+        if token.type == TokenType.BUKKIT:
+            self.advance()
+            return BukkitOp(TokenType.BUKKIT, (), token.line)
+
+        if token.type in BUKKIT_OPS:
+            self.advance()
+            operands.append(self.parse_expression())
+            for _ in range(BUKKIT_OPS[token.type] - 1):
+                self.expect(TokenType.AN)
+                operands.append(self.parse_expression())
+            self.skip_mkay()
+            return BukkitOp(token.type, tuple(operands), token.line)
+
+        if token.type == TokenType.MAEK:
+            self.advance()
+            operands.append(self.parse_expression())
+            return Cast(operands[0], self.parse_cast_type(), token.line)
+
+        raise SyntaxError(f"Syntax Error at line {token.line}: Unexpected token {token.type.value}")
+
+    # IncompleteExpression for an error in an operation after operands were parsed: the token interpreter
+    # evaluates them in order before it reaches the error, except that ALL OF / ANY OF / BOTH OF / EITHER OF
+    # stop at an operand that decides the result (and raise the error while skipping the rest)
+    def incomplete_operation(self, token, operands, error):
+        error, steps = error_steps(error)
+        if token.type in SHORT_CIRCUIT_OPS and operands:
+            operands.append(Raise(error, steps, token.line))
+            return IncompleteExpression(error, (BooleanOp(token.type, tuple(operands), token.line),))
+        return IncompleteExpression(error, tuple(operands) + steps)
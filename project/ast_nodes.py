@@ -0,0 +1,153 @@
+# AST node classes for LOLCODE programs
+# nodes are immutable: attributes are set once in __init__ and use __slots__ to keep trees small
+# child lists (statements, operands, arguments) are stored as tuples
+
+# Base class for all AST nodes
+class Node:
+    __slots__ = ()
+    fields = ()
+
+    # set each field from the positional arguments, in the order of fields
+    def __init__(self, *values):
+        if len(values) != len(self.fields):
+            raise TypeError(f"{type(self).__name__} expects {len(self.fields)} fields, got {len(values)}")
+        for name, value in zip(self.fields, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} nodes are immutable")
+
+    # rebuild from field values (slots + blocked __setattr__ need an explicit pickle recipe)
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, name) for name in self.fields))
+
+    # String representation of node for debugging
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.fields if name != 'line')
+        return f"{type(self).__name__}({values})"
+
+# ---- program ----
+
+# whole program: statements in execution order (function definitions, WAZZUP declarations, HAI body)
+class Program(Node):
+    __slots__ = fields = ('statements',)
+
+# ---- expressions ----
+
+# NUMBR, NUMBAR, YARN, TROOF or NOOB literal (value is the Python value)
+class Literal(Node):
+    __slots__ = fields = ('value', 'line')
+
+# variable reference
+class Variable(Node):
+    __slots__ = fields = ('name', 'line')
+
+# SUM OF, DIFF OF, PRODUKT OF, QUOSHUNT OF, MOD OF, BIGGR OF, SMALLR OF (op is the TokenType)
+class NumericOp(Node):
+    __slots__ = fields = ('op', 'left', 'right', 'line')
+
+# BOTH SAEM, DIFFRINT
+class Comparison(Node):
+    __slots__ = fields = ('op', 'left', 'right', 'line')
+
+# ANY OF, ALL OF, BOTH OF, EITHER OF, WON OF with any number of operands
+class BooleanOp(Node):
+    __slots__ = fields = ('op', 'operands', 'line')
+
+# NOT
+class Not(Node):
+    __slots__ = fields = ('operand', 'line')
+
+# SMOOSH string concatenation
+class Smoosh(Node):
+    __slots__ = fields = ('operands', 'line')
+
+# A BUKKIT, PIK OF <bukkit> AN <index>, SIZ OF <bukkit>, PUT IN <bukkit> AN <index> AN <value>,
+# SHUV IN <bukkit> AN <value> (op is the TokenType, operands are in source order)
+class BukkitOp(Node):
+    __slots__ = fields = ('op', 'operands', 'line')
+
+# MAEK <expression> A <type>
+class Cast(Node):
+    __slots__ = fields = ('operand', 'type_name', 'line')
+
+# I IZ <name> YR <arg> AN YR <arg> MKAY
+class FunctionCall(Node):
+    __slots__ = fields = ('name', 'args', 'line')
+
+# loop-invariant expression hoisted by the optimizer (see loop_invariants.py): evaluated the first time it
+# runs after its loop is entered, the value is reused until the loop is entered again
+class Invariant(Node):
+    __slots__ = fields = ('expression', 'line')
+
+# ---- statements ----
+
+# I HAS A <name> [ITZ <value>] inside WAZZUP (value is None for NOOB)
+class Declaration(Node):
+    __slots__ = fields = ('name', 'value', 'line')
+
+# <name> R <value>
+class Assignment(Node):
+    __slots__ = fields = ('name', 'value', 'line')
+
+# VISIBLE <parts>
+class Visible(Node):
+    __slots__ = fields = ('parts', 'line')
+
+# GIMMEH <name>
+class Gimmeh(Node):
+    __slots__ = fields = ('name', 'line')
+
+# <name> IS NOW A <type>
+class TypeCast(Node):
+    __slots__ = fields = ('name', 'type_name', 'line')
+
+# bare expression or I IZ call, its value goes to IT
+class ExpressionStatement(Node):
+    __slots__ = fields = ('expression', 'line')
+
+# O RLY? YA RLY ... [MEBBE <condition> ...] [NO WAI ...] OIC
+# mebbe_clauses is a tuple of (condition, body) pairs, else_body is None without NO WAI
+# end_error is raised after the statement runs when the closing OIC is missing
+class If(Node):
+    __slots__ = fields = ('then_body', 'mebbe_clauses', 'else_body', 'end_error', 'line')
+
+# one OMG case (label is None for OMGWTF)
+# skip_error is the case validation error raised when the case body is skipped
+class Case(Node):
+    __slots__ = fields = ('label', 'body', 'skip_error', 'line')
+
+# WTF? OMG ... [OMGWTF ...] OIC (default is None without OMGWTF)
+class Switch(Node):
+    __slots__ = fields = ('cases', 'default', 'line')
+
+# IM IN YR <label> [UPPIN|NERFIN YR <variable>] [TIL|WILE <condition>] ... IM OUTTA YR <label>
+# operation and condition_type are TokenTypes or None
+# end_error is raised after the loop finishes when the closing label is wrong
+# invariants are the Invariant nodes of this loop (their values are forgotten each time the loop is entered)
+class Loop(Node):
+    __slots__ = fields = ('label', 'operation', 'variable', 'condition_type', 'condition', 'body', 'end_error',
+                          'invariants', 'line')
+
+# HOW IZ I <name> [YR <param> [AN YR <param>]] ... IF U SAY SO
+class FunctionDef(Node):
+    __slots__ = fields = ('name', 'params', 'body', 'line')
+
+# GTFO outside a function
+class Break(Node):
+    __slots__ = fields = ('line',)
+
+# FOUND YR <value>, or GTFO inside a function (value is None)
+class Return(Node):
+    __slots__ = fields = ('value', 'line')
+
+# FOUND YR I IZ <name> ... MKAY inside function <name>: a self-recursive call in tail position
+# (not built by ASTBuilder; Evaluator marks these when tail calls are enabled, see mark_tail_calls)
+class TailCall(Node):
+    __slots__ = fields = ('call', 'line')
+
+# error found while building the tree, raised when execution reaches it
+# (the token interpreter only reports syntax errors in code it actually runs);
+# operands are the expressions it evaluates before it gets to the error, run in order first
+class Raise(Node):
+    __slots__ = fields = ('error', 'operands', 'line')
@@ -0,0 +1,829 @@
+import sys # Import sys for command line arguments
+import time # Import time for timing benchmark runs
+import tracemalloc # Import tracemalloc for memory benchmarks
+import tempfile # Import tempfile for a scratch cache directory
+from lexer import Lexer # Import Lexer class
+from parser import Parser, ENGINES, TOKEN_ENGINES # Import Parser class and engine names
+from program_cache import ProgramCache # Import on-disk program cache
+from ast_builder import ASTBuilder # Import AST front end
+from evaluator import Evaluator # Import AST evaluator
+from closure_compiler import ClosureCompiler # Import closure-compiling backend
+from optimizer import Optimizer # Import AST optimizer
+import random # Import random for generated runtime values
+import runtime # Import runtime value helpers
+from token_types import TokenType # Import TokenType Enum
+
+# Benchmarks for the LOLCODE interpreter
+# usage: python benchmarks.py [name ...]   (runs every benchmark when no name is given)
+
+# statements used to generate large synthetic programs (covers comments, strings and multi-word keywords)
+SAMPLE_STATEMENTS = [
+    'VISIBLE "value of x: " x BTW print x',
+    'x R SUM OF x AN PRODUKT OF y AN 2',
+    'y R QUOSHUNT OF DIFF OF x AN 3 AN 2.5',
+    'BOTH SAEM x AN BIGGR OF y AN 10',
+    'O RLY?',
+    '    YA RLY',
+    '        VISIBLE SMOOSH "big " AN x MKAY',
+    '    NO WAI',
+    '        VISIBLE "small"',
+    'OIC',
+    'flag R ALL OF WIN AN NOT FAIL AN EITHER OF flag AN WIN MKAY',
+    'name R MAEK x A YARN',
+    'x IS NOW A NUMBAR',
+    'OBTW',
+    '    multi-line comment SUM OF ignored',
+    'TLDR',
+]
+
+# generate a program with roughly the given number of lines
+def make_program(line_count):
+    lines = ['HAI', 'WAZZUP', 'I HAS A x ITZ 1', 'I HAS A y ITZ 2', 'I HAS A flag ITZ WIN', 'I HAS A name', 'BUHBYE']
+    while len(lines) < line_count:
+        lines.extend(SAMPLE_STATEMENTS)
+    lines.append('KTHXBYE')
+    return '\n'.join(lines)
+
+# run a function repeatedly and return the best wall-clock time
+def best_time(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+# compare token throughput of the table-driven lexer with the original per-character scan
+def bench_lexer():
+    source = make_program(5000)
+    old_tokens = Lexer(source, table_driven=False).tokenize()
+    new_tokens = Lexer(source).tokenize()
+
+    # both implementations must produce the same token stream
+    old_stream = [(t.type, t.value, t.line, t.column) for t in old_tokens]
+    new_stream = [(t.type, t.value, t.line, t.column) for t in new_tokens]
+    if old_stream != new_stream:
+        raise AssertionError("table-driven lexer produced a different token stream")
+
+    old_time = best_time(lambda: Lexer(source, table_driven=False).tokenize())
+    new_time = best_time(lambda: Lexer(source).tokenize())
+    count = len(new_tokens)
+    print(f"lexer: {count} tokens, {source.count(chr(10)) + 1} lines")
+    print(f"  per-character scan: {count / old_time:12.0f} tokens/sec")
+    print(f"  table-driven:       {count / new_time:12.0f} tokens/sec ({old_time / new_time:.1f}x)")
+
+# measure memory allocated by func (result kept alive while measuring), returns (result, bytes)
+def allocated_memory(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+# compare memory of a list of Token objects with a struct-of-arrays TokenStream on a 100k-line program
+def bench_token_memory():
+    source = make_program(100000)
+    tokens, list_size = allocated_memory(lambda: Lexer(source).tokenize())
+    stream, stream_size = allocated_memory(lambda: Lexer(source).tokenize_stream())
+    count = len(tokens)
+    if len(stream) != count:
+        raise AssertionError("TokenStream has a different number of tokens")
+    print(f"token memory: {count} tokens, {source.count(chr(10)) + 1} lines, source {len(source) / 2**20:.1f} MiB")
+    print(f"  list of Token: {list_size / 2**20:8.1f} MiB ({list_size / count:6.1f} bytes/token)")
+    print(f"  TokenStream:   {stream_size / 2**20:8.1f} MiB ({stream_size / count:6.1f} bytes/token)")
+
+# peak memory traced while func runs, returns (result, bytes)
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+# run a 200k-line program from a file with the token interpreter: tokens streamed by Lexer.iter_tokens
+# (the parser keeps a small window of them) against the whole file tokenized into a list first
+def bench_stream_memory():
+    source = make_program(200000)
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/program.lol"
+        with open(path, 'w') as source_file:
+            source_file.write(source)
+
+        def run(stream):
+            output = []
+            with open(path) as source_file:
+                tokens = Lexer().iter_tokens(source_file) if stream else Lexer(source_file.read()).tokenize()
+                Parser(tokens, lambda name, value: None, lambda text: output.append(len(text)), lambda prompt: '',
+                       engine='tokens').parse()
+            return len(output)
+
+        streamed, stream_size = peak_memory(lambda: run(True))
+        listed, list_size = peak_memory(lambda: run(False))
+    if streamed != listed:
+        raise AssertionError("streamed tokens gave a different output")
+    print(f"stream memory: {source.count(chr(10)) + 1} lines, source {len(source) / 2**20:.1f} MiB (peak traced memory)")
+    print(f"  token list:      {list_size / 2**20:8.1f} MiB")
+    print(f"  streamed tokens: {stream_size / 2**10:8.1f} KiB")
+
+# counting loop: the loop body and TIL condition run 20000 times
+LOOP_PROGRAM = '''HAI
+WAZZUP
+I HAS A i ITZ 0
+I HAS A total ITZ 0
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN 20000
+    total R SUM OF total AN MOD OF i AN 7
+IM OUTTA YR lp
+VISIBLE total
+KTHXBYE'''
+
+# recursive fibonacci: every call runs the function body again
+FIB_PROGRAM = '''HOW IZ I fib YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR 0
+    OIC
+    BOTH SAEM n AN 1
+    O RLY?
+        YA RLY
+            FOUND YR 1
+    OIC
+    FOUND YR SUM OF I IZ fib YR DIFF OF n AN 1 MKAY MKAY AN I IZ fib YR DIFF OF n AN 2 MKAY MKAY
+IF U SAY SO
+HAI
+I IZ fib YR 15 MKAY
+VISIBLE IT
+KTHXBYE'''
+
+# string building: SMOOSH grows a YARN on every iteration
+STRING_PROGRAM = '''HAI
+WAZZUP
+I HAS A i ITZ 0
+I HAS A text ITZ ""
+BUHBYE
+IM IN YR build UPPIN YR i TIL BOTH SAEM i AN 3000
+    text R SMOOSH text AN "ab" AN i MKAY
+IM OUTTA YR build
+VISIBLE text
+KTHXBYE'''
+
+# recursive factorial called in a loop, with a large WAZZUP section (function calls must not copy globals)
+FACTORIAL_PROGRAM = '''HOW IZ I fact YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR 1
+    OIC
+    FOUND YR PRODUKT OF n AN I IZ fact YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+WAZZUP
+I HAS A i ITZ 0
+I HAS A total ITZ 0
+''' + '\n'.join(f'I HAS A g{index} ITZ {index}' for index in range(200)) + '''
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN 30
+    total R SUM OF total AN MOD OF I IZ fact YR 25 MKAY AN 1009
+IM OUTTA YR lp
+VISIBLE total
+KTHXBYE'''
+
+# tail-recursive functions: accumulator loop in O RLY?, tail calls inside a switch and a loop,
+# a call whose result is used (not a tail call) and GTFO returning NOOB
+TAIL_CALL_PROGRAM = '''HOW IZ I total YR n AN YR acc
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR acc
+        NO WAI
+            FOUND YR I IZ total YR DIFF OF n AN 1 AN YR SUM OF acc AN n MKAY
+    OIC
+IF U SAY SO
+HOW IZ I collatz YR n AN YR steps
+    BOTH SAEM n AN 1
+    O RLY?
+        YA RLY
+            FOUND YR steps
+    OIC
+    MOD OF n AN 2
+    WTF?
+        OMG 0
+            FOUND YR I IZ collatz YR QUOSHUNT OF n AN 2 AN YR SUM OF steps AN 1 MKAY
+        OMGWTF
+            IM IN YR once
+                FOUND YR I IZ collatz YR SUM OF PRODUKT OF n AN 3 AN 1 AN YR SUM OF steps AN 1 MKAY
+            IM OUTTA YR once
+    OIC
+IF U SAY SO
+HOW IZ I down YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            VISIBLE "bottom"
+            GTFO
+    OIC
+    VISIBLE "down " n
+    FOUND YR I IZ down YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HOW IZ I fact YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR 1
+    OIC
+    FOUND YR PRODUKT OF n AN I IZ fact YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+I IZ total YR {depth} AN YR 0 MKAY
+VISIBLE IT
+I IZ collatz YR 27 AN YR 0 MKAY
+VISIBLE IT
+I IZ down YR 3 MKAY
+VISIBLE "down returned [" IT "]"
+I IZ fact YR 10 MKAY
+VISIBLE IT
+I IZ total YR 2 MKAY
+KTHXBYE'''
+
+# non-tail recursion: SUM OF n AN total(n - 1)
+RECURSIVE_SUM_PROGRAM = '''HOW IZ I total YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR 0
+    OIC
+    FOUND YR SUM OF n AN I IZ total YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+I IZ total YR {depth} MKAY
+VISIBLE IT
+KTHXBYE'''
+
+# doubly recursive fibonacci (pure, exponential without memoization) next to a function that prints
+# (impure, never cached)
+MEMO_FIB_PROGRAM = '''HOW IZ I fib YR n
+    BOTH SAEM n AN BIGGR OF n AN 2
+    O RLY?
+        YA RLY
+            I IZ fib YR DIFF OF n AN 1 MKAY
+            FOUND YR SUM OF IT AN I IZ fib YR DIFF OF n AN 2 MKAY
+    OIC
+    FOUND YR n
+IF U SAY SO
+HOW IZ I shout YR n
+    VISIBLE "fib " n
+    FOUND YR I IZ fib YR n MKAY
+IF U SAY SO
+HAI
+I IZ shout YR {n} MKAY
+VISIBLE IT
+I IZ shout YR {n} MKAY
+VISIBLE IT
+KTHXBYE'''
+
+# run a program with the given engine and return its console output
+def run_program(source, engine, **options):
+    output = []
+    Parser(Lexer(source).tokenize(), lambda name, value: None, output.append, input, engine=engine, **options).parse()
+    return ''.join(output)
+
+# compare execution engines on loop, recursion and string-building programs
+# (all engines must print the same output)
+def bench_engines():
+    for name, source in [('loop', LOOP_PROGRAM), ('fib', FIB_PROGRAM), ('strings', STRING_PROGRAM)]:
+        expected = run_program(source, 'tokens')
+        base_time = best_time(lambda: run_program(source, 'tokens'), repeat=5)
+        print(f"{name}: output {expected.strip()[:40]!r} ({len(expected)} chars)")
+        for engine in ENGINES:
+            if run_program(source, engine) != expected:
+                raise AssertionError(f"engine '{engine}' produced different output for {name}")
+            elapsed = best_time(lambda: run_program(source, engine), repeat=5)
+            print(f"  {engine:10s} {elapsed * 1000:9.1f} ms ({base_time / elapsed:.1f}x vs tokens)")
+
+# function call cost: recursive fibonacci and factorial on every engine
+def bench_calls():
+    for name, source, calls in [('fib(15)', FIB_PROGRAM, 1973), ('30 x fact(25)', FACTORIAL_PROGRAM, 30 * 26)]:
+        expected = run_program(source, 'ast')
+        print(f"{name}: output {expected.strip()!r}, {calls} calls")
+        for engine in ENGINES:
+            if run_program(source, engine) != expected:
+                raise AssertionError(f"engine '{engine}' produced different output for {name}")
+            elapsed = best_time(lambda: run_program(source, engine), repeat=5)
+            print(f"  {engine:10s} {elapsed * 1000:9.1f} ms ({calls / elapsed:10.0f} calls/sec)")
+
+# 20000 calls / inner loops; {exit} is replaced by the statement under test
+CALL_LOOP_PROGRAM = '''HOW IZ I f YR n
+    {exit}
+IF U SAY SO
+HAI
+WAZZUP
+I HAS A i ITZ 0
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN 20000
+    I IZ f YR i MKAY
+IM OUTTA YR lp
+KTHXBYE'''
+
+INNER_LOOP_PROGRAM = '''HAI
+WAZZUP
+I HAS A i ITZ 0
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN 20000
+    IM IN YR inner {exit}
+    IM OUTTA YR inner
+IM OUTTA YR lp
+KTHXBYE'''
+
+# tail calls: the output and symbol updates must not change with tail calls on; a recursion depth that
+# overflows the Python stack without them must run with them
+def bench_tail_calls():
+    def run(source, tail_calls):
+        events = []
+        try:
+            Parser(Lexer(source).tokenize(), lambda name, value: events.append((name, value)), events.append,
+                   input, tail_calls=tail_calls).parse()
+        except Exception as e:
+            events.append(f"{type(e).__name__}: {e}")
+        return events
+
+    shallow = TAIL_CALL_PROGRAM.format(depth=100)
+    if run(shallow, False) != run(shallow, True):
+        raise AssertionError("tail calls changed the output or symbol updates")
+    print(f"tail calls: same output and symbol updates with and without ({len(run(shallow, True))} events)")
+
+    deep = TAIL_CALL_PROGRAM.format(depth=100000)
+    without = run(deep, False)
+    print(f"  depth 100000 without tail calls: {without[-1]}")
+    if '5000050000\n' not in run(deep, True):
+        raise AssertionError("tail-recursive total(100000) failed with tail calls on")
+    print("  depth 100000 with tail calls:    5000050000")
+
+    # 100 x total(100): the calls are the whole run time
+    source = TAIL_CALL_PROGRAM.split('HAI')[0] + """HAI
+WAZZUP
+I HAS A i ITZ 0
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN 100
+    I IZ total YR 100 AN YR 0 MKAY
+IM OUTTA YR lp
+VISIBLE IT
+KTHXBYE"""
+    if run(source, False) != run(source, True) or '5050\n' not in run(source, True):
+        raise AssertionError("tail calls changed the result of total(100)")
+    plain_time = best_time(lambda: run(source, False), repeat=5)
+    tail_time = best_time(lambda: run(source, True), repeat=5)
+    print(f"  100 x total(100): {plain_time * 1000:7.1f} ms -> {tail_time * 1000:7.1f} ms ({plain_time / tail_time:.1f}x)")
+
+# memoization of pure functions: exponential fib(n) becomes linear, impure functions still print
+def bench_memoize():
+    source = MEMO_FIB_PROGRAM.format(n=22)
+    expected = run_program(source, 'ast')
+    for memo_size in (None, 2):
+        output = []
+        parser = Parser(Lexer(source).tokenize(), lambda name, value: None, output.append, input,
+                        memoize=True, memo_size=memo_size)
+        parser.parse()
+        if ''.join(output) != expected:
+            raise AssertionError(f"memoization (memo_size={memo_size}) changed the output")
+        stats = parser.call_cache.stats()
+        print(f"memoize: fib(22) twice, memo_size={stats['max_size']}: "
+              f"{stats['hits']} hits, {stats['misses']} misses, {stats['size']} cached")
+
+    plain_time = best_time(lambda: run_program(source, 'ast'), repeat=3)
+    memo_time = best_time(lambda: run_program(source, 'ast', memoize=True), repeat=3)
+    print(f"  ast: {plain_time * 1000:8.1f} ms -> {memo_time * 1000:8.1f} ms ({plain_time / memo_time:.0f}x)")
+
+# recursion depth: engines that recurse in Python stop at a few hundred LOLCODE frames,
+# the vm keeps its call stack on the heap and stops cleanly at its frame budget
+def bench_recursion():
+    print("recursion: non-tail recursive total(n)")
+    for depth in (100, 10000, 200000):
+        source = RECURSIVE_SUM_PROGRAM.format(depth=depth)
+        for engine in ENGINES:
+            start = time.perf_counter()
+            try:
+                result = run_program(source, engine).strip()
+            except Exception as e:
+                result = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - start
+            print(f"  depth {depth:6d} {engine:10s} {elapsed * 1000:9.1f} ms  {result[:60]}")
+        if run_program(source, 'vm') != f"{depth * (depth + 1) // 2}\n":
+            raise AssertionError(f"vm returned the wrong total for depth {depth}")
+
+    try:
+        run_program(RECURSIVE_SUM_PROGRAM.format(depth=5000), 'vm', frame_budget=1000)
+    except RuntimeError as e:
+        print(f"  frame budget 1000, depth 5000: {e}")
+    else:
+        raise AssertionError("vm ran past its frame budget")
+
+# per-return / per-break cost of the AST evaluator with exceptions vs completion signals:
+# the time of a program whose calls end with FOUND YR (loops end with GTFO) minus the same program
+# whose calls fall off the end (loops end on their condition), divided by the 20000 exits
+def bench_control_flow():
+    cases = [
+        ('FOUND YR', CALL_LOOP_PROGRAM.format(exit='FOUND YR n'), CALL_LOOP_PROGRAM.format(exit='n')),
+        ('GTFO', INNER_LOOP_PROGRAM.format(exit='\n        GTFO'), INNER_LOOP_PROGRAM.format(exit='WILE FAIL')),
+    ]
+    print("control flow: cost per exit (20000 exits)")
+    for name, source, baseline in cases:
+        program = ASTBuilder(Lexer(source).tokenize()).build()
+        baseline_program = ASTBuilder(Lexer(baseline).tokenize()).build()
+        for mode in ('exceptions', 'signals'):
+            def run(tree):
+                Evaluator(tree, lambda name, value: None, print, input, control_flow=mode).run()
+            cost = best_time(lambda: run(program), repeat=5) - best_time(lambda: run(baseline_program), repeat=5)
+            print(f"  {name:9s} {mode:10s} {cost / 20000 * 1e9:8.0f} ns")
+
+# counted loop summing its counter; {condition} is the loop condition (the same test written so it is
+# not recognised as a counted loop gives the baseline)
+COUNTED_LOOP_PROGRAM = '''HAI
+WAZZUP
+I HAS A i ITZ 0
+I HAS A n ITZ 20000
+I HAS A total ITZ 0
+BUHBYE
+IM IN YR lp UPPIN YR i {condition}
+    total R SUM OF total AN i
+IM OUTTA YR lp
+VISIBLE i " " total
+KTHXBYE'''
+
+# counted loops: same output and final symbol table as the general loop, time with and without the fast path
+def bench_counted_loops():
+    counted = COUNTED_LOOP_PROGRAM.format(condition='TIL BOTH SAEM i AN n')
+    general = COUNTED_LOOP_PROGRAM.format(condition='TIL BOTH SAEM SUM OF i AN 0 AN n')
+    print("counted loops: 20000 iterations of total R SUM OF total AN i")
+    for engine in ('tokens', 'ast'):
+        def run(source):
+            output, symbols = [], {}
+            parser = Parser(Lexer(source).tokenize(), symbols.__setitem__, output.append, input, engine=engine)
+            parser.parse()
+            return ''.join(output), symbols, parser.variables
+        if run(counted) != run(general):
+            raise AssertionError(f"counted loop fast path changed the result ({engine})")
+        general_time = best_time(lambda: run(general), repeat=5)
+        counted_time = best_time(lambda: run(counted), repeat=5)
+        print(f"  {engine:7s} {general_time * 1000:8.1f} ms -> {counted_time * 1000:8.1f} ms "
+              f"({general_time / counted_time:.2f}x)")
+
+# state machine: a WTF? with {cases} literal cases dispatched 5000 times; each state moves to the next
+def state_machine_program(cases):
+    lines = ['HAI', 'WAZZUP', 'I HAS A i ITZ 0', 'I HAS A state ITZ 0', 'I HAS A visits ITZ 0', 'BUHBYE',
+             'IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN 5000', '    state', '    WTF?']
+    for case in range(cases):
+        lines += [f'        OMG {case}', f'            state R {(case + 1) % cases}',
+                  '            visits R SUM OF visits AN 1', '            GTFO']
+    lines += ['        OMGWTF', '            state R 0', '    OIC', 'IM OUTTA YR lp',
+              'VISIBLE state " " visits', 'KTHXBYE']
+    return '\n'.join(lines)
+
+# switch dispatch: cost of a WTF? with many literal cases; a label that is not a literal
+# (SUM OF 0 AN 0 for case 0) makes the switch run case by case and gives the baseline
+def bench_switch():
+    print("switch: 5000 dispatches of a state machine")
+    for cases in (4, 32):
+        table = state_machine_program(cases)
+        general = table.replace('OMG 0\n', 'OMG SUM OF 0 AN 0\n')
+        for engine in ('tokens', 'ast'):
+            if run_program(table, engine) != run_program(general, engine):
+                raise AssertionError(f"switch jump table changed the output ({engine})")
+            general_time = best_time(lambda: run_program(general, engine), repeat=5)
+            table_time = best_time(lambda: run_program(table, engine), repeat=5)
+            print(f"  {cases:2d} cases {engine:7s} {general_time * 1000:8.1f} ms -> {table_time * 1000:8.1f} ms "
+                  f"({general_time / table_time:.1f}x)")
+
+# ---- runtime value helpers ----
+
+# time per call of the runtime value helpers on mixed values
+# (tests/test_runtime.py checks them against the helpers they replaced)
+def bench_runtime():
+    rng = random.Random(2024)
+    values = [rng.choice([None, True, False, rng.randint(-1000, 1000), rng.uniform(-100, 100),
+                          str(rng.randint(-1000, 1000)), '', 'abc', '1.5']) for _ in range(2000)]
+    numbers = [rng.choice([rng.randint(-1000, 1000), rng.uniform(-100, 100), str(rng.randint(0, 99))])
+               for _ in range(2000)]
+    cases = [
+        ('to_number', lambda: [runtime.to_number(value) for value in numbers]),
+        ('is_truthy', lambda: [runtime.is_truthy(value) for value in values]),
+        ('stringify', lambda: [runtime.stringify(value) for value in values]),
+        ('values_equal', lambda: [runtime.values_equal(value, other) for value, other in zip(values, reversed(values))]),
+        ('numeric_op', lambda: [runtime.numeric_op(TokenType.SUM_OF, value, other)
+                                for value, other in zip(numbers, reversed(numbers))]),
+    ]
+    print("runtime: 2000 calls per helper")
+    for name, run in cases:
+        print(f"  {name:12s} {best_time(run, repeat=5) * 1e9 / 2000:7.0f} ns per call")
+
+# generated-looking loop: literal-only expressions evaluated on every iteration
+FOLDING_PROGRAM = '''HAI
+WAZZUP
+I HAS A i ITZ 0
+I HAS A total ITZ 0
+I HAS A label ITZ ""
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN PRODUKT OF 100 AN 100
+    total R SUM OF total AN PRODUKT OF SUM OF 2 AN 3 AN MAEK "12" A NUMBR
+    label R SMOOSH "total" AN ": " AN QUOSHUNT OF 7 AN 2 MKAY
+    BOTH SAEM WIN AN WIN
+    O RLY?
+        YA RLY
+            total R DIFF OF total AN 1
+        NO WAI
+            total R 0
+    OIC
+IM OUTTA YR lp
+VISIBLE label " " total
+KTHXBYE'''
+
+# compare every AST engine with and without the optimizer (output must not change)
+def bench_optimizer():
+    expected = run_program(FOLDING_PROGRAM, 'ast')
+    print(f"optimizer: output {expected.strip()!r}")
+    for engine in ENGINES:
+        if engine in TOKEN_ENGINES:
+            continue
+        if run_program(FOLDING_PROGRAM, engine, optimize=True) != expected:
+            raise AssertionError(f"optimized program printed different output with engine '{engine}'")
+        plain_time = best_time(lambda: run_program(FOLDING_PROGRAM, engine), repeat=5)
+        optimized_time = best_time(lambda: run_program(FOLDING_PROGRAM, engine, optimize=True), repeat=5)
+        print(f"  {engine:10s} {plain_time * 1000:9.1f} ms -> {optimized_time * 1000:9.1f} ms "
+              f"({plain_time / optimized_time:.1f}x)")
+
+# compare lexing + parsing with loading the same program from the on-disk cache
+def bench_cache():
+    source = make_program(5000)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProgramCache(directory, enabled=True)
+        uncached = ProgramCache(directory, enabled=False)
+        cache.compile(source)
+        cold_time = best_time(lambda: uncached.compile(source))
+        warm_time = best_time(lambda: cache.compile(source))
+        if cache.hits != 3:
+            raise AssertionError("program cache did not hit")
+    print(f"program cache: {source.count(chr(10)) + 1} lines")
+    print(f"  lex + parse:    {cold_time * 1000:9.1f} ms")
+    print(f"  cache load:     {warm_time * 1000:9.1f} ms ({cold_time / warm_time:.1f}x)")
+
+# NUMBR and NUMBAR arithmetic whose operand types TypeInference can prove
+ARITHMETIC_PROGRAM = '''HAI
+WAZZUP
+I HAS A i ITZ 0
+I HAS A total ITZ 0
+I HAS A mean ITZ 0.0
+I HAS A hits ITZ 0
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN 20000
+    total R SUM OF total AN PRODUKT OF i AN 3
+    mean R SUM OF mean AN PRODUKT OF MAEK i A NUMBAR AN 0.5
+    BOTH SAEM MOD OF i AN 7 AN 0
+    O RLY?
+        YA RLY
+            hits R SUM OF hits AN 1
+    OIC
+IM OUTTA YR lp
+VISIBLE total " " mean " " hits
+KTHXBYE'''
+
+# run a program with the closures engine, without the type-specialized operations when specialize is False
+def run_closures(source, specialize):
+    output = []
+    compiler = ClosureCompiler(ASTBuilder(Lexer(source).tokenize()).build(), lambda name, value: None,
+                               output.append, input)
+    if not specialize:
+        compiler.types = {}  # nothing proven: every operation takes the generic runtime path
+    compiler.run()
+    return ''.join(output)
+
+# closures engine with and without the operations specialized by type inference
+def bench_type_inference():
+    expected = run_closures(ARITHMETIC_PROGRAM, False)
+    if run_closures(ARITHMETIC_PROGRAM, True) != expected:
+        raise AssertionError("type-specialized operations changed the output")
+    generic_time = best_time(lambda: run_closures(ARITHMETIC_PROGRAM, False), repeat=5)
+    specialized_time = best_time(lambda: run_closures(ARITHMETIC_PROGRAM, True), repeat=5)
+    print(f"type inference: output {expected.strip()!r}")
+    print(f"  closures   {generic_time * 1000:9.1f} ms -> {specialized_time * 1000:9.1f} ms "
+          f"({generic_time / specialized_time:.2f}x)")
+
+# report built one row at a time with SMOOSH; each row is 60-odd characters
+REPORT_PROGRAM = '''HAI
+WAZZUP
+I HAS A report ITZ ""
+I HAS A i ITZ 0
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN {rows}
+    report R SMOOSH report AN "row " AN i AN ": 0123456789abcdef0123456789abcdef0123456789abcdef" MKAY
+IM OUTTA YR lp
+VISIBLE report
+KTHXBYE'''
+
+# building a YARN with SMOOSH in a loop: flat strs (every SMOOSH copies the report) against ropes,
+# at 1 MB, then a 10 MB report with ropes only (flat strs would copy about 800 GB)
+def bench_ropes():
+    def report(rows):
+        return ''.join(f"row {row}: 0123456789abcdef0123456789abcdef0123456789abcdef" for row in range(rows)) + '\n'
+    print("ropes: report of 16000 rows (1 MB) and 160000 rows (10 MB)")
+    small, large = report(16000), report(160000)
+    min_length = runtime.ROPE_MIN_LENGTH
+    for engine in ENGINES:
+        try:
+            runtime.ROPE_MIN_LENGTH = sys.maxsize  # never start a rope
+            flat_time = best_time(lambda: run_program(REPORT_PROGRAM.format(rows=16000), engine), repeat=1)
+        finally:
+            runtime.ROPE_MIN_LENGTH = min_length
+        if run_program(REPORT_PROGRAM.format(rows=16000), engine) != small:
+            raise AssertionError(f"engine '{engine}' built a different 1 MB report")
+        rope_time = best_time(lambda: run_program(REPORT_PROGRAM.format(rows=16000), engine), repeat=1)
+        if run_program(REPORT_PROGRAM.format(rows=160000), engine) != large:
+            raise AssertionError(f"engine '{engine}' built a different 10 MB report")
+        large_time = best_time(lambda: run_program(REPORT_PROGRAM.format(rows=160000), engine), repeat=1)
+        print(f"  {engine:10s} 1 MB {flat_time * 1000:8.1f} ms -> {rope_time * 1000:7.1f} ms "
+              f"({flat_time / rope_time:4.1f}x), 10 MB {large_time * 1000:8.1f} ms")
+
+# {size}-element table updated 5000 times: each step reads element MOD OF j AN {size}, adds it to a total
+# and stores the total back; the fake array keeps every element in its own variable, indexed by a WTF?
+def fake_array_program(size):
+    lines = ['HAI', 'WAZZUP', 'I HAS A j ITZ 0', 'I HAS A index ITZ 0', 'I HAS A value ITZ 0', 'I HAS A total ITZ 0']
+    lines += [f'I HAS A elem{k} ITZ {k}' for k in range(size)]
+    lines += ['BUHBYE', 'IM IN YR lp UPPIN YR j TIL BOTH SAEM j AN 5000',
+              f'    index R MOD OF j AN {size}', '    index', '    WTF?']
+    for k in range(size):
+        lines += [f'        OMG {k}', f'            value R elem{k}', '            GTFO']
+    lines += ['    OIC', '    total R MOD OF SUM OF total AN value AN 1000', '    index', '    WTF?']
+    for k in range(size):
+        lines += [f'        OMG {k}', f'            elem{k} R total', '            GTFO']
+    lines += ['    OIC', 'IM OUTTA YR lp', 'VISIBLE total', 'KTHXBYE']
+    return '\n'.join(lines)
+
+def bukkit_program(size):
+    return '\n'.join(['HAI', 'WAZZUP', 'I HAS A j ITZ 0', 'I HAS A index ITZ 0', 'I HAS A total ITZ 0',
+                      'I HAS A elems ITZ A BUKKIT', 'BUHBYE',
+                      f'IM IN YR fill UPPIN YR j TIL BOTH SAEM j AN {size}', '    SHUV IN elems AN j', 'IM OUTTA YR fill',
+                      'j R 0', 'IM IN YR lp UPPIN YR j TIL BOTH SAEM j AN 5000', f'    index R MOD OF j AN {size}',
+                      '    total R MOD OF SUM OF total AN PIK OF elems AN index AN 1000',
+                      '    PUT IN elems AN index AN total', 'IM OUTTA YR lp', 'VISIBLE total', 'KTHXBYE'])
+
+# BUKKIT: indexed access compared with the variables-and-WTF? arrays it replaces, and the memory of
+# NUMBR elements in the array('q') storage compared with a list
+def bench_bukkits():
+    print("bukkits: 5000 reads and writes of a table")
+    for size in (16, 256):
+        fake, bukkit = fake_array_program(size), bukkit_program(size)
+        for engine in ('tokens', 'ast', 'closures'):
+            if run_program(fake, engine) != run_program(bukkit, engine):
+                raise AssertionError(f"BUKKIT program printed a different total ({engine})")
+            fake_time = best_time(lambda: run_program(fake, engine), repeat=3)
+            bukkit_time = best_time(lambda: run_program(bukkit, engine), repeat=3)
+            print(f"  {size:3d} elements {engine:8s} {fake_time * 1000:8.1f} ms -> {bukkit_time * 1000:7.1f} ms "
+                  f"({fake_time / bukkit_time:.1f}x)")
+
+    def filled(store):
+        for value in range(100000):
+            store.append(value * 1000003)
+        return store
+    _, list_size = allocated_memory(lambda: filled([]))
+    bukkit, bukkit_size = allocated_memory(lambda: filled(runtime.Bukkit()))
+    if bukkit.items.typecode != 'q':
+        raise AssertionError("a BUKKIT of NUMBRs left its array('q') storage")
+    print(f"  100000 NUMBRs: list {list_size / 2**20:5.1f} MiB, BUKKIT {bukkit_size / 2**20:5.1f} MiB "
+          f"({list_size / bukkit_size:.1f}x smaller)")
+
+# guarded conditions: a cheap test decides ALL OF / ANY OF for 9 of every 10 iterations, the recursive
+# check after it (20 calls deep) is only needed for the rest
+GUARD_PROGRAM = '''HOW IZ I check YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR WIN
+    OIC
+    FOUND YR I IZ check YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+WAZZUP
+I HAS A i ITZ 0
+I HAS A hits ITZ 0
+BUHBYE
+IM IN YR lp UPPIN YR i TIL BOTH SAEM i AN 1000
+    ALL OF BOTH SAEM MOD OF i AN 10 AN 0 AN I IZ check YR 20 MKAY MKAY
+    O RLY?
+        YA RLY
+            hits R SUM OF hits AN 1
+    OIC
+    NOT ANY OF DIFFRINT MOD OF i AN 10 AN 5 AN I IZ check YR 20 MKAY MKAY
+    O RLY?
+        YA RLY
+            hits R SUM OF hits AN 1
+    OIC
+IM OUTTA YR lp
+VISIBLE hits
+KTHXBYE'''
+
+# short-circuit evaluation: the guard program with every operand evaluated (SHORT_CIRCUIT_OPS emptied while
+# the engine compiles and runs it) and with ALL OF / ANY OF stopping at the deciding operand
+def bench_short_circuit():
+    print("short circuit: 1000 iterations of two guarded conditions")
+    short_circuit_ops = dict(runtime.SHORT_CIRCUIT_OPS)
+    for engine in ENGINES:
+        try:
+            runtime.SHORT_CIRCUIT_OPS.clear()
+            eager_output = run_program(GUARD_PROGRAM, engine)
+            eager_time = best_time(lambda: run_program(GUARD_PROGRAM, engine), repeat=3)
+        finally:
+            runtime.SHORT_CIRCUIT_OPS.update(short_circuit_ops)
+        if run_program(GUARD_PROGRAM, engine) != eager_output:
+            raise AssertionError(f"short-circuit evaluation changed the output ({engine})")
+        short_time = best_time(lambda: run_program(GUARD_PROGRAM, engine), repeat=3)
+        print(f"  {engine:10s} {eager_time * 1000:8.1f} ms -> {short_time * 1000:7.1f} ms ({eager_time / short_time:.1f}x)")
+
+# nested loops whose bodies recompute values that only depend on variables the loops never write
+INVARIANT_PROGRAM = '''HAI
+WAZZUP
+I HAS A n ITZ 100
+I HAS A i ITZ 0
+I HAS A j ITZ 0
+I HAS A total ITZ 0
+I HAS A prefix ITZ "row"
+I HAS A label ITZ ""
+BUHBYE
+IM IN YR rows UPPIN YR i TIL BOTH SAEM i AN n
+    j R 0
+    IM IN YR cols UPPIN YR j TIL BOTH SAEM j AN PRODUKT OF n AN 2
+        total R SUM OF total AN PRODUKT OF i AN QUOSHUNT OF PRODUKT OF n AN n AN SUM OF n AN 1
+        label R SMOOSH prefix AN " " AN i MKAY
+    IM OUTTA YR cols
+IM OUTTA YR rows
+VISIBLE label " " total
+KTHXBYE'''
+
+# loop-invariant hoisting: the program has nothing to fold, so --optimize only hoists its invariants
+def bench_loop_invariants():
+    optimizer = Optimizer()
+    optimizer.optimize(ASTBuilder(Lexer(INVARIANT_PROGRAM).tokenize()).build())
+    print(f"loop invariants: 20000 iterations, {len(optimizer.report)} expressions hoisted")
+    for engine in ENGINES:
+        if engine in TOKEN_ENGINES:
+            continue
+        expected = run_program(INVARIANT_PROGRAM, engine)
+        if run_program(INVARIANT_PROGRAM, engine, optimize=True) != expected:
+            raise AssertionError(f"hoisting changed the output ({engine})")
+        plain_time = best_time(lambda: run_program(INVARIANT_PROGRAM, engine), repeat=3)
+        hoisted_time = best_time(lambda: run_program(INVARIANT_PROGRAM, engine, optimize=True), repeat=3)
+        print(f"  {engine:10s} {plain_time * 1000:8.1f} ms -> {hoisted_time * 1000:7.1f} ms "
+              f"({plain_time / hoisted_time:.1f}x)")
+
+# tiered engine: everything interpreted (tier 0), hot loops and functions compiled, everything compiled (tier 1)
+# (the tiers must print the same output as the token interpreter)
+def bench_tiers():
+    for name, source in [('loop', LOOP_PROGRAM), ('fib', FIB_PROGRAM), ('strings', STRING_PROGRAM),
+                         ('counted', COUNTED_LOOP_PROGRAM.format(condition='TIL BOTH SAEM i AN n'))]:
+        expected = run_program(source, 'tokens')
+        print(f"{name}: output {expected.strip()[:40]!r} ({len(expected)} chars)")
+        base_time = None
+        for label, options in [('tier 0', {'tier': 0}), ('tiered', {}), ('tier 1', {'tier': 1})]:
+            if run_program(source, 'tiered', **options) != expected:
+                raise AssertionError(f"{label} produced different output for {name}")
+            elapsed = best_time(lambda: run_program(source, 'tiered', **options), repeat=3)
+            base_time = base_time or elapsed
+            print(f"  {label:10s} {elapsed * 1000:9.1f} ms ({base_time / elapsed:.1f}x vs tier 0)")
+
+# registry of benchmarks runnable from the command line
+BENCHMARKS = {
+    'lexer': bench_lexer,
+    'runtime': bench_runtime,
+    'token_memory': bench_token_memory,
+    'stream_memory': bench_stream_memory,
+    'engines': bench_engines,
+    'calls': bench_calls,
+    'control_flow': bench_control_flow,
+    'counted_loops': bench_counted_loops,
+    'switch': bench_switch,
+    'tail_calls': bench_tail_calls,
+    'recursion': bench_recursion,
+    'memoize': bench_memoize,
+    'cache': bench_cache,
+    'optimizer': bench_optimizer,
+    'type_inference': bench_type_inference,
+    'ropes': bench_ropes,
+    'bukkits': bench_bukkits,
+    'short_circuit': bench_short_circuit,
+    'loop_invariants': bench_loop_invariants,
+    'tiers': bench_tiers,
+}
+
+def main(names):
+    for name in names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}', choose from: {', '.join(BENCHMARKS)}")
+            continue
+        BENCHMARKS[name]()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,126 @@
+from bisect import bisect_left, insort  # Import bisect for the sorted list of invalid case tokens
+from token_types import TokenType  # Import TokenType Enum
+
+# block opener -> closer
+BLOCK_CLOSERS = {
+    TokenType.O_RLY: TokenType.OIC,
+    TokenType.WTF: TokenType.OIC,
+    TokenType.IM_IN_YR: TokenType.IM_OUTTA_YR,
+    TokenType.HOW_IZ_I: TokenType.IF_U_SAY_SO,
+}
+
+# branch marker -> opener of the block it belongs to
+BRANCH_OPENERS = {
+    TokenType.YA_RLY: TokenType.O_RLY,
+    TokenType.MEBBE: TokenType.O_RLY,
+    TokenType.NO_WAI: TokenType.O_RLY,
+    TokenType.OMG: TokenType.WTF,
+    TokenType.OMGWTF: TokenType.WTF,
+}
+
+# identifier that looks like a misspelled OMG/OMGWTF (rejected inside switch cases)
+def is_invalid_case_token(token):
+    if token and token.type == TokenType.IDENTIFIER:
+        value = token.value.upper()
+        return value.startswith("OMG") and value not in ["OMG", "OMGWTF"]
+    return False
+
+# Jump table from block openers and branch markers to their matching closer / next branch
+#   end(p)         - O RLY?/WTF? -> OIC, IM IN YR -> IM OUTTA YR, HOW IZ I -> IF U SAY SO
+#   next_branch(p) - YA RLY/MEBBE/NO WAI/OMG/OMGWTF -> next branch marker of the same block or its OIC
+# O RLY? and WTF? nest with each other (both end at OIC); loops and functions are matched by their own
+# depth like before. An unclosed block ends at the end of the tokens.
+# Blocks are indexed by one forward scan that records every block nested inside it, so a block is
+# scanned once (build() indexes the whole program up front; otherwise blocks are scanned when first entered)
+class BlockIndex:
+    # token_at(index) returns the token at index or None past the end
+    def __init__(self, token_at):
+        self.token_at = token_at
+        self.ends = {}
+        self.branches = {}
+        # positions of identifiers that are invalid inside a switch case, sorted
+        self.invalid_cases = []
+        self.invalid_seen = set()
+
+    # index every block in the program
+    def build(self):
+        position = 0
+        token = self.token_at(position)
+        while token:
+            if token.type in BLOCK_CLOSERS and position not in self.ends:
+                self.scan(position)
+            if position in self.ends:
+                # the whole block was indexed by the scan
+                position = self.ends[position]
+            else:
+                self.note_invalid_case(token, position)
+            position += 1
+            token = self.token_at(position)
+
+    # closer position of the block opened at position
+    def end(self, position):
+        if position not in self.ends:
+            self.scan(position)
+        return self.ends[position]
+
+    # position of the branch marker (or OIC) following the one at position
+    # (filled in when the enclosing block is scanned by end())
+    def next_branch(self, position):
+        return self.branches[position]
+
+    # position of the first invalid case token in [start, end), or None
+    # (the range must lie in a block that has been scanned)
+    def first_invalid_case(self, start, end):
+        index = bisect_left(self.invalid_cases, start)
+        if index < len(self.invalid_cases) and self.invalid_cases[index] < end:
+            return self.invalid_cases[index]
+        return None
+
+    def note_invalid_case(self, token, position):
+        if is_invalid_case_token(token) and position not in self.invalid_seen:
+            self.invalid_seen.add(position)
+            insort(self.invalid_cases, position)
+
+    # scan forward from the opener at start until its closer, recording every block closed on the way
+    def scan(self, start):
+        opener = self.token_at(start).type
+        closer = BLOCK_CLOSERS[opener]
+        # open blocks per closer type: [opener position, opener type, last branch marker position]
+        stacks = {TokenType.OIC: [], TokenType.IM_OUTTA_YR: [], TokenType.IF_U_SAY_SO: []}
+        target = stacks[closer]
+        target.append([start, opener, None])
+
+        position = start + 1
+        token = self.token_at(position)
+        while token:
+            token_type = token.type
+            if token_type in BLOCK_CLOSERS:
+                stacks[BLOCK_CLOSERS[token_type]].append([position, token_type, None])
+            elif token_type in BRANCH_OPENERS:
+                open_blocks = stacks[TokenType.OIC]
+                if open_blocks and open_blocks[-1][1] == BRANCH_OPENERS[token_type]:
+                    block = open_blocks[-1]
+                    if block[2] is not None:
+                        self.branches[block[2]] = position
+                    block[2] = position
+            elif token_type in stacks:
+                open_blocks = stacks[token_type]
+                if open_blocks:
+                    self.close(open_blocks.pop(), position)
+                    if not target:
+                        return
+            else:
+                self.note_invalid_case(token, position)
+            position += 1
+            token = self.token_at(position)
+
+        # unclosed blocks end at the end of the tokens
+        for open_blocks in stacks.values():
+            for block in open_blocks:
+                if block[0] not in self.ends:
+                    self.close(block, position)
+
+    def close(self, block, position):
+        self.ends[block[0]] = position
+        if block[2] is not None:
+            self.branches[block[2]] = position
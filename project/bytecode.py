@@ -0,0 +1,465 @@
+import sys  # Import sys for command line arguments
+from token_types import TokenType  # Import TokenType Enum
+from ast_nodes import (Literal, Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, BukkitOp,
+                       FunctionCall, Invariant, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Switch, Loop, FunctionDef, Break, Return, Raise)  # Import AST node classes
+from runtime import SHORT_CIRCUIT_OPS  # Import the boolean operators that stop early
+from memoization import collect_calls  # Import expression scan for calls and BUKKIT operations
+
+# Bytecode format for the LOLCODE stack VM (vm.py)
+# a CodeObject holds a list of (opcode, argument) instructions and the source line of each one;
+# values live on an operand stack, control flow is jumps to absolute instruction indices
+
+# ---- opcodes ----
+# loads / stores
+LOAD_CONST = 0       # push arg
+LOAD_NAME = 1        # push variable arg
+LOAD_IT = 2          # push the IT register
+DECLARE = 3          # pop value, declare variable arg (I HAS A)
+ASSIGN = 4           # pop value, store in declared variable arg, set IT (R)
+SET_IT = 5           # pop value into the IT register (expression statement)
+CHECK_VAR = 6        # raise if variable arg is not declared
+CHECK_LOOP_VAR = 7   # raise if loop variable arg is not declared
+STEP_VAR = 8         # arg (name, step): variable = to_number(variable) + step
+CAST_VAR = 9         # arg (name, type): <name> IS NOW A <type>
+POP = 10             # discard top of stack
+LOAD_INVARIANT = 11  # arg (index, target): push hoisted invariant index and jump to target if it is computed
+STORE_INVARIANT = 12 # keep top of stack as the value of invariant arg
+RESET_INVARIANTS = 13 # forget the invariants with the indexes in arg (entering their loop)
+# arithmetic (SUM OF ... SMALLR OF)
+ADD = 20
+SUB = 21
+MUL = 22
+DIV = 23
+MOD = 24
+MAX = 25
+MIN = 26
+# comparisons, boolean ops, strings and casts
+EQ = 30              # BOTH SAEM
+NE = 31              # DIFFRINT
+MATCH = 32           # pop label, compare with the switch value below it, push result
+NOT = 33
+BOOL_OP = 34         # arg (op TokenType, count)
+SMOOSH = 35          # arg count
+CAST = 36            # arg type name (MAEK)
+BUKKIT_OP = 37       # arg (op TokenType, count): A BUKKIT, PIK OF, SIZ OF, PUT IN, SHUV IN
+# jumps
+JUMP = 40
+POP_JUMP_IF_FALSE = 41
+POP_JUMP_IF_TRUE = 42
+# calls / returns
+DEFINE = 50          # arg (name, params, CodeObject): register function (HOW IZ I)
+FUNCTION = 51        # push function arg, raise if not defined
+CALL = 52            # arg count: pop arguments and function, call, push result
+RETURN = 53          # pop value and return from the function
+BREAK = 54           # GTFO outside a loop or switch
+RAISE = 55           # raise the exception arg
+UNWIND = 56          # pop value and raise ReturnException (FOUND YR outside a function)
+# I/O
+PRINT = 60           # arg count: pop values, write them joined (VISIBLE)
+READ = 61            # read input into variable arg (GIMMEH)
+
+OPNAMES = {value: name for name, value in list(globals().items())
+           if name.isupper() and isinstance(value, int)}
+
+# numeric operator token -> opcode, and back (the VM uses runtime.numeric_op for the slow path)
+NUMERIC_OPCODES = {
+    TokenType.SUM_OF: ADD,
+    TokenType.DIFF_OF: SUB,
+    TokenType.PRODUKT_OF: MUL,
+    TokenType.QUOSHUNT_OF: DIV,
+    TokenType.MOD_OF: MOD,
+    TokenType.BIGGR_OF: MAX,
+    TokenType.SMALLR_OF: MIN,
+}
+NUMERIC_OPERATORS = {opcode: op for op, opcode in NUMERIC_OPCODES.items()}
+
+# opcodes whose argument is a jump target
+JUMP_OPCODES = {JUMP, POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE}
+
+# compiled code for the main program or one function body
+class CodeObject:
+    def __init__(self, name):
+        self.name = name
+        self.instructions = []
+        self.lines = []
+
+    def __len__(self):
+        return len(self.instructions)
+
+# BytecodeCompiler class for compiling a Program AST into a CodeObject
+# control flow matches Evaluator: GTFO jumps to the end of the innermost loop or switch case,
+# and errors deferred by ASTBuilder become RAISE instructions
+class BytecodeCompiler:
+    def __init__(self, program):
+        self.program = program
+        self.code = None
+        self.in_function = False
+        # one list of pending GTFO jumps per enclosing loop / switch case
+        self.break_jumps = []
+        # id(Invariant) -> index of its value in the invariants of a frame
+        self.invariant_indexes = {}
+
+        # node class -> compile method
+        self.statement_compilers = {
+            Declaration: self.compile_declaration,
+            Assignment: self.compile_assignment,
+            Visible: self.compile_visible,
+            Gimmeh: self.compile_gimmeh,
+            TypeCast: self.compile_type_cast,
+            ExpressionStatement: self.compile_expression_statement,
+            If: self.compile_if,
+            Switch: self.compile_switch,
+            Loop: self.compile_loop,
+            FunctionDef: self.compile_function_definition,
+            Break: self.compile_break,
+            Return: self.compile_return,
+            Raise: self.compile_raise,
+        }
+        self.expression_compilers = {
+            Literal: self.compile_literal,
+            Variable: self.compile_variable,
+            NumericOp: self.compile_numeric_op,
+            Comparison: self.compile_comparison,
+            BooleanOp: self.compile_boolean_op,
+            Not: self.compile_not,
+            Smoosh: self.compile_smoosh,
+            Cast: self.compile_cast,
+            BukkitOp: self.compile_bukkit_op,
+            FunctionCall: self.compile_function_call,
+            Invariant: self.compile_invariant,
+            Raise: self.compile_raise,
+        }
+
+    # compile the program into the main CodeObject
+    def compile(self):
+        return self.compile_code('<main>', self.program.statements, 0, in_function=False)
+
+    # compile a statement list into a new CodeObject ending with RETURN NOOB
+    def compile_code(self, name, statements, line, in_function=True):
+        saved = self.code, self.break_jumps, self.in_function
+        self.code = CodeObject(name)
+        self.break_jumps = []
+        self.in_function = in_function
+        try:
+            self.compile_block(statements)
+            self.emit(LOAD_CONST, None, line)
+            self.emit(RETURN, None, line)
+            return self.code
+        finally:
+            self.code, self.break_jumps, self.in_function = saved
+
+    # append an instruction and return its index
+    def emit(self, opcode, arg, line):
+        self.code.instructions.append((opcode, arg))
+        self.code.lines.append(line)
+        return len(self.code.instructions) - 1
+
+    # point the jump at index to target (default: the next instruction)
+    def patch(self, index, target=None):
+        if target is None:
+            target = len(self.code.instructions)
+        self.code.instructions[index] = (self.code.instructions[index][0], target)
+
+    def compile_block(self, statements):
+        for statement in statements:
+            self.statement_compilers[type(statement)](statement)
+
+    def compile_expression(self, expression):
+        self.expression_compilers[type(expression)](expression)
+
+    # compile a loop or case body, returning the GTFO jumps it contains
+    def compile_breakable(self, statements):
+        self.break_jumps.append([])
+        self.compile_block(statements)
+        return self.break_jumps.pop()
+
+    # ---- statements ----
+
+    def compile_declaration(self, node):
+        if node.value is None:
+            self.emit(LOAD_CONST, None, node.line)
+        else:
+            self.compile_expression(node.value)
+        self.emit(DECLARE, node.name, node.line)
+
+    def compile_assignment(self, node):
+        self.emit(CHECK_VAR, node.name, node.line)
+        self.compile_expression(node.value)
+        self.emit(ASSIGN, node.name, node.line)
+
+    # PRINT stringifies every part at once, so a part that a later part could change (a BUKKIT passed to a
+    # function or to SHUV IN / PUT IN) is stringified before that part runs, as the other engines do
+    def compile_visible(self, node):
+        for index, part in enumerate(node.parts):
+            self.compile_expression(part)
+            if any(may_change_bukkits(later) for later in node.parts[index + 1:]):
+                self.emit(CAST, 'YARN', node.line)
+        self.emit(PRINT, len(node.parts), node.line)
+
+    def compile_gimmeh(self, node):
+        self.emit(READ, node.name, node.line)
+
+    def compile_type_cast(self, node):
+        self.emit(CAST_VAR, (node.name, node.type_name), node.line)
+
+    def compile_expression_statement(self, node):
+        self.compile_expression(node.expression)
+        self.emit(SET_IT, None, node.line)
+
+    # O RLY? tests IT, then each MEBBE condition, then falls through to NO WAI
+    def compile_if(self, node):
+        end_jumps = []
+        self.emit(LOAD_IT, None, node.line)
+        next_jump = self.emit(POP_JUMP_IF_FALSE, None, node.line)
+        self.compile_block(node.then_body)
+        end_jumps.append(self.emit(JUMP, None, node.line))
+
+        for condition, body in node.mebbe_clauses:
+            self.patch(next_jump)
+            self.compile_expression(condition)
+            next_jump = self.emit(POP_JUMP_IF_FALSE, None, node.line)
+            self.compile_block(body)
+            end_jumps.append(self.emit(JUMP, None, node.line))
+
+        self.patch(next_jump)
+        if node.else_body is not None:
+            self.compile_block(node.else_body)
+        for index in end_jumps:
+            self.patch(index)
+        if node.end_error:
+            self.emit(RAISE, node.end_error, node.line)
+
+    # WTF? keeps the switch value (IT at entry) on the stack while testing the OMG labels
+    # after a matching case finishes without GTFO, the remaining labels are still evaluated and
+    # skipped cases validated (post-match path); GTFO in case i only validates the cases after it
+    def compile_switch(self, node):
+        cases = node.cases
+        default = node.default
+        line = node.line
+        end_jumps = []
+        matched_jumps = []   # (jump index, index of the next case)
+        case_breaks = []     # (GTFO jumps, index of the next case)
+
+        self.emit(LOAD_IT, None, line)
+        for i, case in enumerate(cases):
+            self.compile_expression(case.label)
+            self.emit(MATCH, None, case.line)
+            no_match = self.emit(POP_JUMP_IF_FALSE, None, case.line)
+            case_breaks.append((self.compile_breakable(case.body), i + 1))
+            matched_jumps.append((self.emit(JUMP, None, case.line), i + 1))
+            self.patch(no_match)
+            if case.skip_error:
+                self.emit(RAISE, case.skip_error, case.line)
+
+        # no case matched: run OMGWTF
+        if default is not None:
+            end_jumps.extend(self.compile_breakable(default.body))
+        end_jumps.append(self.emit(JUMP, None, line))
+
+        # post-match path: case i starts at post_match[i] and falls through to the next case
+        post_match = []
+        for case in cases:
+            post_match.append(len(self.code.instructions))
+            self.compile_expression(case.label)
+            self.emit(POP, None, case.line)
+            if case.skip_error:
+                self.emit(RAISE, case.skip_error, case.line)
+        post_match.append(len(self.code.instructions))
+        if default is not None and default.skip_error:
+            self.emit(RAISE, default.skip_error, default.line)
+        end_jumps.append(self.emit(JUMP, None, line))
+        for index, start in matched_jumps:
+            self.patch(index, post_match[start])
+
+        # GTFO path after case i: validate later cases without evaluating their labels
+        for jumps, start in case_breaks:
+            error = self.first_skip_error(cases[start:], default)
+            if error is None:
+                end_jumps.extend(jumps)
+                continue
+            target = self.emit(RAISE, error, line)
+            for index in jumps:
+                self.patch(index, target)
+
+        for index in end_jumps:
+            self.patch(index)
+        self.emit(POP, None, line)
+
+    # first validation error among skipped cases (and OMGWTF), or None
+    def first_skip_error(self, cases, default):
+        for case in cases:
+            if case.skip_error:
+                return case.skip_error
+        if default is not None and default.skip_error:
+            return default.skip_error
+        return None
+
+    def compile_loop(self, node):
+        line = node.line
+        if node.variable is not None:
+            self.emit(CHECK_LOOP_VAR, node.variable, line)
+        if node.invariants:
+            self.emit(RESET_INVARIANTS, tuple(self.invariant_index(invariant) for invariant in node.invariants), line)
+
+        top = len(self.code.instructions)
+        exit_jump = None
+        if node.condition is not None:
+            self.compile_expression(node.condition)
+            # TIL exits when the condition is true, WILE when it is false
+            opcode = POP_JUMP_IF_TRUE if node.condition_type == TokenType.TIL else POP_JUMP_IF_FALSE
+            exit_jump = self.emit(opcode, None, line)
+
+        breaks = self.compile_breakable(node.body)
+        if node.variable is not None:
+            step = 1 if node.operation == TokenType.UPPIN else -1
+            self.emit(STEP_VAR, (node.variable, step), line)
+        self.emit(JUMP, top, line)
+
+        if exit_jump is not None:
+            self.patch(exit_jump)
+        for index in breaks:
+            self.patch(index)
+        if node.end_error:
+            self.emit(RAISE, node.end_error, line)
+
+    def compile_function_definition(self, node):
+        code = self.compile_code(node.name, node.body, node.line)
+        self.emit(DEFINE, (node.name, node.params, code), node.line)
+
+    # GTFO jumps out of the innermost loop / switch case, or raises BreakException at top level
+    def compile_break(self, node):
+        if self.break_jumps:
+            self.break_jumps[-1].append(self.emit(JUMP, None, node.line))
+        else:
+            self.emit(BREAK, None, node.line)
+
+    def compile_return(self, node):
+        if node.value is None:
+            self.emit(LOAD_CONST, None, node.line)
+        else:
+            self.compile_expression(node.value)
+        self.emit(RETURN if self.in_function else UNWIND, None, node.line)
+
+    def compile_raise(self, node):
+        for operand in node.operands:
+            self.compile_expression(operand)
+            self.emit(POP, None, node.line)
+        self.emit(RAISE, node.error, node.line)
+
+    # ---- expressions ----
+
+    def compile_literal(self, node):
+        self.emit(LOAD_CONST, node.value, node.line)
+
+    def compile_variable(self, node):
+        self.emit(LOAD_NAME, node.name, node.line)
+
+    def compile_numeric_op(self, node):
+        self.compile_expression(node.left)
+        self.compile_expression(node.right)
+        self.emit(NUMERIC_OPCODES[node.op], None, node.line)
+
+    def compile_comparison(self, node):
+        self.compile_expression(node.left)
+        self.compile_expression(node.right)
+        self.emit(EQ if node.op == TokenType.BOTH_SAEM else NE, None, node.line)
+
+    # ALL OF / BOTH OF jump out at the first false operand and ANY OF / EITHER OF at the first true one,
+    # skipping the rest; WON OF evaluates every operand
+    def compile_boolean_op(self, node):
+        stop = SHORT_CIRCUIT_OPS.get(node.op)
+        if stop is None:
+            for operand in node.operands:
+                self.compile_expression(operand)
+            self.emit(BOOL_OP, (node.op, len(node.operands)), node.line)
+            return
+        stop_jumps = []
+        for operand in node.operands:
+            self.compile_expression(operand)
+            stop_jumps.append(self.emit(POP_JUMP_IF_TRUE if stop else POP_JUMP_IF_FALSE, None, node.line))
+        self.emit(LOAD_CONST, not stop, node.line)
+        end_jump = self.emit(JUMP, None, node.line)
+        for index in stop_jumps:
+            self.patch(index)
+        self.emit(LOAD_CONST, stop, node.line)
+        self.patch(end_jump)
+
+    def compile_not(self, node):
+        self.compile_expression(node.operand)
+        self.emit(NOT, None, node.line)
+
+    def compile_smoosh(self, node):
+        for operand in node.operands:
+            self.compile_expression(operand)
+        self.emit(SMOOSH, len(node.operands), node.line)
+
+    def compile_cast(self, node):
+        self.compile_expression(node.operand)
+        self.emit(CAST, node.type_name, node.line)
+
+    def compile_bukkit_op(self, node):
+        for operand in node.operands:
+            self.compile_expression(operand)
+        self.emit(BUKKIT_OP, (node.op, len(node.operands)), node.line)
+
+    # a hoisted loop invariant is computed the first time it runs in a run of its loop;
+    # after that LOAD_INVARIANT pushes the value and jumps over the computation
+    def compile_invariant(self, node):
+        index = self.invariant_index(node)
+        load = self.emit(LOAD_INVARIANT, None, node.line)
+        self.compile_expression(node.expression)
+        self.emit(STORE_INVARIANT, index, node.line)
+        self.code.instructions[load] = (LOAD_INVARIANT, (index, len(self.code.instructions)))
+
+    def invariant_index(self, node):
+        return self.invariant_indexes.setdefault(id(node), len(self.invariant_indexes))
+
+    # the function is looked up before its arguments are evaluated
+    def compile_function_call(self, node):
+        self.emit(FUNCTION, node.name, node.line)
+        for arg in node.args:
+            self.compile_expression(arg)
+        self.emit(CALL, len(node.args), node.line)
+
+# True when evaluating the expression can run a BUKKIT operation, directly or in a called function
+def may_change_bukkits(expression):
+    called = set()
+    return collect_calls(expression, called) or bool(called)
+
+# format a CodeObject (and the functions it defines) as readable text
+def disassemble(code):
+    lines = [f"code {code.name}:"]
+    functions = []
+    previous_line = None
+    for index, ((opcode, arg), line) in enumerate(zip(code.instructions, code.lines)):
+        line_text = str(line) if line != previous_line else ''
+        previous_line = line
+        if opcode == DEFINE:
+            functions.append(arg[2])
+            arg_text = f"{arg[0]} ({', '.join(arg[1])})"
+        elif opcode in JUMP_OPCODES:
+            arg_text = f"-> {arg}"
+        elif opcode == RAISE:
+            arg_text = f"{type(arg).__name__}: {arg}"
+        elif opcode == BOOL_OP or opcode == BUKKIT_OP:
+            arg_text = f"{arg[0].name} {arg[1]}"
+        elif opcode == LOAD_INVARIANT:
+            arg_text = f"{arg[0]} -> {arg[1]}"
+        elif arg is None and opcode != LOAD_CONST:
+            arg_text = ''
+        else:
+            arg_text = repr(arg)
+        lines.append(f"{line_text:>6} {index:6d} {OPNAMES[opcode]:18s} {arg_text}".rstrip())
+    for function in functions:
+        lines.append('')
+        lines.append(disassemble(function))
+    return '\n'.join(lines)
+
+# usage: python bytecode.py program.lol   (prints the disassembled bytecode)
+if __name__ == "__main__":
+    from lexer import Lexer
+    from ast_builder import ASTBuilder
+    with open(sys.argv[1]) as source_file:
+        program = ASTBuilder(Lexer(source_file.read()).tokenize()).build()
+    print(disassemble(BytecodeCompiler(program).compile()))
@@ -0,0 +1,488 @@
+from token_types import TokenType  # Import TokenType Enum
+from LOL_exceptions import BreakException, ReturnException  # Import custom exceptions for control flow
+from runtime import (to_number, is_truthy, stringify, cast_value, values_equal, numeric_op, boolean_op,
+                     smoosh, bukkit_op, NUMBR_OPS, NUMBAR_OPS, SHORT_CIRCUIT_OPS)  # Import runtime value helpers
+from ast_nodes import (Literal, Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, BukkitOp,
+                       FunctionCall, Invariant, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Switch, Loop, FunctionDef, Break, Return, Raise)  # Import AST node classes
+from resolver import Resolver, IT_SLOT, UNSET  # Import slot resolution pass
+from type_inference import TypeInference  # Import static type inference pass
+
+# operand types that numeric operators take without coercion
+SPECIALIZED_TYPES = ('NUMBR', 'NUMBAR')
+
+# types values_equal compares as numbers
+NUMBER_TYPES = ('NUMBR', 'NUMBAR', 'TROOF')
+
+# operator -> closure over two NUMBR operand closures, for the operators that need no zero check
+NUMBR_OPERATORS = {
+    TokenType.SUM_OF: lambda left, right: lambda: left() + right(),
+    TokenType.DIFF_OF: lambda left, right: lambda: left() - right(),
+    TokenType.PRODUKT_OF: lambda left, right: lambda: left() * right(),
+}
+
+# the same with a NUMBR literal as the right operand
+NUMBR_CONSTANT_OPERATORS = {
+    TokenType.SUM_OF: lambda left, value: lambda: left() + value,
+    TokenType.DIFF_OF: lambda left, value: lambda: left() - value,
+    TokenType.PRODUKT_OF: lambda left, value: lambda: left() * value,
+}
+
+# ClosureCompiler class for executing a Program AST as nested Python closures
+# every node is compiled once into a closure that runs it; a statement closure takes no arguments,
+# an expression closure takes none and returns the value, so execution is plain function calls
+# with no per-node dispatch. Semantics follow Evaluator exactly.
+# Variables live in a flat list of slots (self.slots) assigned by the Resolver before compiling;
+# a function call swaps in a new slot list for the callee. References to undeclared variables are
+# found by the resolver and compiled to raise its error, so accesses need no declared-name check.
+# Operations whose operand types TypeInference proves are compiled without the runtime type checks
+# (plain +, -, * and == on NUMBRs / NUMBARs, casts to the type the value already has).
+class ClosureCompiler:
+    # Initialize compiler with program and callbacks for symbol table updates and console I/O
+    def __init__(self, program, update_symbol_callback, write_console_callback, read_input_callback):
+        self.program = program
+        self.resolver = Resolver().resolve(program)
+        self.types = TypeInference().infer(program).types
+        self.slots = self.resolver.global_scope.new_frame()
+        self.IT = None
+        self.update_symbol_callback = update_symbol_callback
+        self.write_console_callback = write_console_callback
+        self.read_input_callback = read_input_callback
+        self.functions = {}
+        self.code = None
+        self.global_slots = self.slots
+
+        # node class -> compile method
+        self.statement_compilers = {
+            Declaration: self.compile_declaration,
+            Assignment: self.compile_assignment,
+            Visible: self.compile_visible,
+            Gimmeh: self.compile_gimmeh,
+            TypeCast: self.compile_type_cast,
+            ExpressionStatement: self.compile_expression_statement,
+            If: self.compile_if,
+            Switch: self.compile_switch,
+            Loop: self.compile_loop,
+            FunctionDef: self.compile_function_definition,
+            Break: self.compile_break,
+            Return: self.compile_return,
+            Raise: self.compile_raise,
+        }
+        self.expression_compilers = {
+            Literal: self.compile_literal,
+            Variable: self.compile_variable,
+            NumericOp: self.compile_numeric_op,
+            Comparison: self.compile_comparison,
+            BooleanOp: self.compile_boolean_op,
+            Not: self.compile_not,
+            Smoosh: self.compile_smoosh,
+            Cast: self.compile_cast,
+            BukkitOp: self.compile_bukkit_op,
+            FunctionCall: self.compile_function_call,
+            Invariant: self.compile_invariant,
+            Raise: self.compile_raise,
+        }
+
+    # program variables by name (slots mapped back to identifiers, undeclared slots left out)
+    @property
+    def variables(self):
+        return self.resolver.global_scope.variables(self.global_slots)
+
+    # compile the whole program once, then run it
+    def run(self):
+        if self.code is None:
+            self.code = self.compile_block(self.program.statements)
+        self.code()
+
+    # compile a statement list into one closure
+    def compile_block(self, statements):
+        compiled = tuple(self.compile_statement(statement) for statement in statements)
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run_block():
+            for statement in compiled:
+                statement()
+        return run_block
+
+    def compile_statement(self, statement):
+        return self.statement_compilers[type(statement)](statement)
+
+    def compile_expression(self, expression):
+        return self.expression_compilers[type(expression)](expression)
+
+    # ---- statements ----
+
+    def compile_declaration(self, node):
+        name = node.name
+        slot = self.resolver.slots[id(node)]
+        update = self.update_symbol_callback
+        value = None if node.value is None else self.compile_expression(node.value)
+
+        def declaration():
+            result = None if value is None else value()
+            self.slots[slot] = result
+            update(name, result)
+        return declaration
+
+    def compile_assignment(self, node):
+        error = self.resolver.errors.get(id(node))
+        if error is not None:
+            return self.compile_error(error)
+        name = node.name
+        slot = self.resolver.slots[id(node)]
+        update = self.update_symbol_callback
+        value = self.compile_expression(node.value)
+
+        def assignment():
+            result = value()
+            self.slots[slot] = result
+            update(name, result)
+            self.IT = result
+            update('IT', result)
+        return assignment
+
+    def compile_visible(self, node):
+        parts = tuple(self.compile_expression(part) for part in node.parts)
+        write = self.write_console_callback
+
+        def visible():
+            write(''.join([stringify(part()) for part in parts]) + '\n')
+        return visible
+
+    def compile_gimmeh(self, node):
+        error = self.resolver.errors.get(id(node))
+        if error is not None:
+            return self.compile_error(error)
+        name = node.name
+        slot = self.resolver.slots[id(node)]
+        update = self.update_symbol_callback
+        read = self.read_input_callback
+
+        def gimmeh():
+            input_value = read(f"Enter value for {name}:")
+            self.slots[slot] = input_value
+            update(name, input_value)
+        return gimmeh
+
+    def compile_type_cast(self, node):
+        error = self.resolver.errors.get(id(node))
+        if error is not None:
+            return self.compile_error(error)
+        name = node.name
+        slot = self.resolver.slots[id(node)]
+        type_name = node.type_name
+        update = self.update_symbol_callback
+
+        def type_cast():
+            slots = self.slots
+            casted_value = cast_value(slots[slot], type_name)
+            slots[slot] = casted_value
+            update(name, casted_value)
+        return type_cast
+
+    def compile_expression_statement(self, node):
+        expression = self.compile_expression(node.expression)
+        update = self.update_symbol_callback
+
+        def expression_statement():
+            result = expression()
+            self.IT = result
+            update('IT', result)
+        return expression_statement
+
+    # O RLY? uses IT as condition
+    def compile_if(self, node):
+        then_body = self.compile_block(node.then_body)
+        mebbe_clauses = tuple((self.compile_expression(condition), self.compile_block(body))
+                              for condition, body in node.mebbe_clauses)
+        else_body = None if node.else_body is None else self.compile_block(node.else_body)
+        end_error = node.end_error
+
+        def if_statement():
+            if is_truthy(self.IT):
+                then_body()
+            else:
+                for condition, body in mebbe_clauses:
+                    if is_truthy(condition()):
+                        body()
+                        break
+                else:
+                    if else_body is not None:
+                        else_body()
+            if end_error:
+                raise end_error
+        return if_statement
+
+    # WTF? compares IT with each OMG label in order; the first match runs until the next case or GTFO
+    # (labels are evaluated for every case until a GTFO, skipped case bodies are validated)
+    def compile_switch(self, node):
+        cases = tuple((self.compile_expression(case.label), self.compile_block(case.body), case.skip_error)
+                      for case in node.cases)
+        default = node.default
+        default_body = None if default is None else self.compile_block(default.body)
+        default_error = None if default is None else default.skip_error
+
+        def switch():
+            switch_value = self.IT
+            found_match = False
+            should_break = False
+
+            for label, body, skip_error in cases:
+                if should_break:
+                    if skip_error:
+                        raise skip_error
+                    continue
+                case_value = label()
+                if not found_match and values_equal(switch_value, case_value):
+                    found_match = True
+                    try:
+                        body()
+                    except BreakException:
+                        should_break = True
+                elif skip_error:
+                    raise skip_error
+
+            if default_body is not None:
+                if not found_match and not should_break:
+                    try:
+                        default_body()
+                    except BreakException:
+                        pass
+                elif default_error:
+                    raise default_error
+        return switch
+
+    def compile_loop(self, node):
+        error = self.resolver.errors.get(id(node))
+        if error is not None:
+            return self.compile_error(error)
+        loop_var = node.variable
+        slot = self.resolver.slots.get(id(node))
+        condition = None if node.condition is None else self.compile_expression(node.condition)
+        until = node.condition_type == TokenType.TIL
+        step = 1 if node.operation == TokenType.UPPIN else -1
+        body = self.compile_block(node.body)
+        end_error = node.end_error
+        update = self.update_symbol_callback
+        invariant_slots = tuple(self.resolver.slots[id(invariant)] for invariant in node.invariants)
+
+        def loop():
+            # invariants computed in an earlier run of the loop are computed again
+            if invariant_slots:
+                slots = self.slots
+                for invariant_slot in invariant_slots:
+                    slots[invariant_slot] = UNSET
+            while True:
+                # Check condition if present
+                if condition is not None:
+                    if is_truthy(condition()) == until:
+                        break
+
+                # Execute loop body
+                try:
+                    body()
+                except BreakException:
+                    break
+
+                # Update loop variable
+                if loop_var is not None:
+                    slots = self.slots
+                    slots[slot] = to_number(slots[slot]) + step
+                    update(loop_var, slots[slot])
+
+            if end_error:
+                raise end_error
+        return loop
+
+    # the body is compiled here, once; defining the function at run time only registers it
+    # (a function is its parameters, their slots, its scope and the compiled body)
+    def compile_function_definition(self, node):
+        name = node.name
+        scope = self.resolver.function_scopes[id(node)]
+        param_slots = tuple(scope.slots[param] for param in node.params)
+        function = (node.params, param_slots, scope, self.compile_block(node.body))
+
+        def function_definition():
+            self.functions[name] = function
+        return function_definition
+
+    def compile_break(self, node):
+        def break_statement():
+            raise BreakException()
+        return break_statement
+
+    def compile_return(self, node):
+        if node.value is None:
+            def return_statement():
+                raise ReturnException(None)
+            return return_statement
+
+        value = self.compile_expression(node.value)
+
+        def return_statement():
+            raise ReturnException(value())
+        return return_statement
+
+    def compile_raise(self, node):
+        if not node.operands:
+            return self.compile_error(node.error)
+        operands = tuple(self.compile_expression(operand) for operand in node.operands)
+        error = node.error
+
+        def raise_error():
+            for operand in operands:
+                operand()
+            raise error
+        return raise_error
+
+    # closure that raises error (syntax errors and unresolved variables)
+    def compile_error(self, error):
+        def raise_error():
+            raise error
+        return raise_error
+
+    # ---- expressions ----
+
+    def compile_literal(self, node):
+        value = node.value
+        return lambda: value
+
+    def compile_variable(self, node):
+        error = self.resolver.errors.get(id(node))
+        if error is not None:
+            return self.compile_error(error)
+        slot = self.resolver.slots[id(node)]
+        return lambda: self.slots[slot]
+
+    def compile_numeric_op(self, node):
+        op = node.op
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+        left_type = self.types.get(id(node.left))
+        right_type = self.types.get(id(node.right))
+        if left_type == right_type == 'NUMBR':
+            if op in NUMBR_OPERATORS:
+                if type(node.right) is Literal:
+                    return NUMBR_CONSTANT_OPERATORS[op](left, node.right.value)
+                return NUMBR_OPERATORS[op](left, right)
+            operation = NUMBR_OPS[op]
+            return lambda: operation(left(), right())
+        if left_type in SPECIALIZED_TYPES and right_type in SPECIALIZED_TYPES:
+            operation = NUMBAR_OPS[op]
+            return lambda: operation(left(), right())
+        return lambda: numeric_op(op, left(), right())
+
+    # values of the same type, and numbers, are equal exactly when == says so (see values_equal)
+    def compile_comparison(self, node):
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+        left_type = self.types.get(id(node.left))
+        right_type = self.types.get(id(node.right))
+        if left_type is not None and (left_type == right_type or
+                                      (left_type in NUMBER_TYPES and right_type in NUMBER_TYPES)):
+            if node.op == TokenType.BOTH_SAEM:
+                return lambda: left() == right()
+            return lambda: left() != right()
+        if node.op == TokenType.BOTH_SAEM:
+            return lambda: values_equal(left(), right())
+        return lambda: not values_equal(left(), right())
+
+    # ALL OF / BOTH OF stop at the first false operand, ANY OF / EITHER OF at the first true one
+    # (operands proven to be TROOFs are used without is_truthy)
+    def compile_boolean_op(self, node):
+        op = node.op
+        stop = SHORT_CIRCUIT_OPS.get(op)
+        if stop is None:
+            operands = tuple(self.compile_expression(operand) for operand in node.operands)
+            return lambda: boolean_op(op, [operand() for operand in operands])
+        operands = tuple(self.compile_truth(operand) for operand in node.operands)
+        if len(operands) == 2:
+            first, second = operands
+            if stop:
+                return lambda: first() or second()
+            return lambda: first() and second()
+        if stop:
+            return lambda: any(operand() for operand in operands)
+        return lambda: all(operand() for operand in operands)
+
+    # closure giving the TROOF an expression's value converts to
+    def compile_truth(self, node):
+        value = self.compile_expression(node)
+        if self.types.get(id(node)) == 'TROOF':
+            return value
+        return lambda: is_truthy(value())
+
+    def compile_not(self, node):
+        operand = self.compile_expression(node.operand)
+        if self.types.get(id(node.operand)) == 'TROOF':
+            return lambda: not operand()
+        return lambda: not is_truthy(operand())
+
+    def compile_smoosh(self, node):
+        operands = tuple(self.compile_expression(operand) for operand in node.operands)
+        return lambda: smoosh([operand() for operand in operands])
+
+    # casting a value to the type it already has returns it unchanged
+    def compile_cast(self, node):
+        operand = self.compile_expression(node.operand)
+        type_name = node.type_name
+        if self.types.get(id(node.operand)) == type_name.upper():
+            return operand
+        return lambda: cast_value(operand(), type_name)
+
+    def compile_bukkit_op(self, node):
+        op = node.op
+        operands = tuple(self.compile_expression(operand) for operand in node.operands)
+        return lambda: bukkit_op(op, [operand() for operand in operands])
+
+    # a hoisted loop invariant is computed the first time it runs in a run of its loop, then read from its slot
+    # (a function call has its own slots, so a recursive call running the same loop does not see them)
+    def compile_invariant(self, node):
+        expression = self.compile_expression(node.expression)
+        slot = self.resolver.slots[id(node)]
+
+        def invariant():
+            slots = self.slots
+            value = slots[slot]
+            if value is UNSET:
+                value = slots[slot] = expression()
+            return value
+        return invariant
+
+    # call a function with an isolated scope holding only its parameters and IT
+    def compile_function_call(self, node):
+        name = node.name
+        args = tuple(self.compile_expression(arg) for arg in node.args)
+        update = self.update_symbol_callback
+
+        def function_call():
+            function = self.functions.get(name)
+            if function is None:
+                raise NameError(f"Semantic Error: Function '{name}' not defined")
+            params, param_slots, scope, body = function
+
+            values = [arg() for arg in args]
+            if len(values) != len(params):
+                raise ValueError(f"Function '{name}' expects {len(params)} arguments, got {len(values)}")
+
+            saved_slots = self.slots
+            frame = scope.new_frame()
+            for slot, value in zip(param_slots, values):
+                frame[slot] = value
+            frame[IT_SLOT] = None
+            self.slots = frame
+
+            return_value = None
+            try:
+                body()
+            except ReturnException as e:
+                return_value = e.value
+            finally:
+                self.slots = saved_slots
+
+            self.IT = return_value
+            saved_slots[IT_SLOT] = return_value
+            update('IT', return_value)
+            return return_value
+        return function_call
@@ -0,0 +1,619 @@
+from token_types import TokenType  # Import TokenType Enum
+from LOL_exceptions import BreakException, ReturnException  # Import custom exceptions for control flow
+from runtime import (to_number, is_truthy, stringify, cast_value, values_equal, numeric_op, boolean_op, CaseTable,
+                     smoosh, bukkit_op, SHORT_CIRCUIT_OPS)  # Import runtime value helpers
+from ast_nodes import (Literal, Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, BukkitOp,
+                       FunctionCall, Invariant, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Case, Switch, Loop, FunctionDef, Break, Return, Raise, TailCall)  # Import AST node classes
+from memoization import CallCache, DEFAULT_MEMO_SIZE, pure_functions, entry_it_readers  # Import call cache for pure functions
+
+# how GTFO / FOUND YR reach the enclosing loop, switch or call
+#   signals    - statements return a Completion that the enclosing construct checks (default)
+#   exceptions - GTFO / FOUND YR raise BreakException / ReturnException like the token interpreter
+CONTROL_FLOW_MODES = ('signals', 'exceptions')
+
+# completion signal of a statement that did not finish normally (normal completion is None)
+class Completion:
+    __slots__ = ('kind', 'value')
+
+    def __init__(self, kind, value=None):
+        self.kind = kind
+        self.value = value
+
+# GTFO outside a function
+BREAK = Completion('break')
+
+# Evaluator class for executing a Program AST
+# walks the tree built once by ASTBuilder instead of re-parsing tokens on every loop iteration / call;
+# semantics (scoping, IT, callbacks, error messages) follow the token interpreter in parser.py
+# In signals mode a GTFO returns BREAK and FOUND YR returns a 'return' Completion; execute_block stops at
+# the first signal and hands it to the loop, switch or call that handles it. A signal that reaches the
+# top of the program is raised as the exception the token interpreter would raise.
+# With tail_calls, FOUND YR I IZ <self> ... MKAY in a function runs as a jump back to the start of the
+# function with the new arguments (no Python recursion), so tail-recursive functions run in constant stack.
+# With memoize, results of pure functions (see memoization.py) are kept in an LRU cache of memo_size entries
+# and a repeated call returns the cached value without running the body (the symbol table updates made
+# inside the body are not repeated).
+class Evaluator:
+    # Initialize evaluator with program and callbacks for symbol table updates and console I/O
+    def __init__(self, program, update_symbol_callback, write_console_callback, read_input_callback,
+                 control_flow='signals', tail_calls=False, memoize=False, memo_size=DEFAULT_MEMO_SIZE):
+        if control_flow not in CONTROL_FLOW_MODES:
+            raise ValueError(f"Unknown control flow mode '{control_flow}', expected one of: {', '.join(CONTROL_FLOW_MODES)}")
+        if tail_calls and control_flow != 'signals':
+            raise ValueError("Tail calls need the 'signals' control flow mode")
+        if memoize and control_flow != 'signals':
+            raise ValueError("Memoization needs the 'signals' control flow mode")
+        self.tail_calls = tail_calls
+        self.call_cache = CallCache(memo_size) if memoize else None
+        self.pure_functions = pure_functions(program) if memoize else set()
+        self.entry_it_readers = entry_it_readers(program) if memoize else set()
+        self.counted_loops = {}  # Loop node -> bound node of a counted loop, or None
+        self.case_tables = {}    # Switch node -> CaseTable when every label is a literal, or None
+        self.invariant_values = {}  # Invariant node -> value in the current run of its loop
+        self.program = program
+        self.variables = {"IT": None}
+        self.IT = None
+        self.update_symbol_callback = update_symbol_callback
+        self.write_console_callback = write_console_callback
+        self.read_input_callback = read_input_callback
+        self.functions = {}
+
+        # node class -> handler
+        self.statement_handlers = {
+            Declaration: self.exec_declaration,
+            Assignment: self.exec_assignment,
+            Visible: self.exec_visible,
+            Gimmeh: self.exec_gimmeh,
+            TypeCast: self.exec_type_cast,
+            ExpressionStatement: self.exec_expression_statement,
+            If: self.exec_if,
+            Switch: self.exec_switch,
+            Loop: self.exec_loop,
+            FunctionDef: self.exec_function_definition,
+            Break: self.exec_break,
+            Return: self.exec_return,
+            Raise: self.exec_raise,
+            TailCall: self.exec_tail_call,
+        }
+        if control_flow == 'exceptions':
+            self.statement_handlers.update({
+                Switch: self.exec_switch_raising,
+                Loop: self.exec_loop_raising,
+                Break: self.exec_break_raising,
+                Return: self.exec_return_raising,
+            })
+        self.expression_handlers = {
+            Literal: self.eval_literal,
+            Variable: self.eval_variable,
+            NumericOp: self.eval_numeric_op,
+            Comparison: self.eval_comparison,
+            BooleanOp: self.eval_boolean_op,
+            Not: self.eval_not,
+            Smoosh: self.eval_smoosh,
+            Cast: self.eval_cast,
+            BukkitOp: self.eval_bukkit_op,
+            FunctionCall: self.eval_function_call,
+            Invariant: self.eval_invariant,
+            Raise: self.exec_raise,
+        }
+        if control_flow == 'exceptions':
+            self.expression_handlers[FunctionCall] = self.eval_function_call_raising
+
+    # run the whole program
+    def run(self):
+        signal = self.execute_block(self.program.statements)
+        # GTFO outside any loop or switch / FOUND YR outside a function
+        if signal is BREAK:
+            raise BreakException()
+        if signal is not None:
+            raise ReturnException(signal.value)
+
+    # execute statements in order; returns the completion signal that stopped the block, or None
+    def execute_block(self, statements):
+        handlers = self.statement_handlers
+        for statement in statements:
+            signal = handlers[type(statement)](statement)
+            if signal is not None:
+                return signal
+        return None
+
+    # evaluate an expression node and return its value
+    def evaluate(self, expression):
+        return self.expression_handlers[type(expression)](expression)
+
+    # ---- statements ----
+
+    def exec_declaration(self, node):
+        value = None if node.value is None else self.evaluate(node.value)
+        self.variables[node.name] = value
+        self.update_symbol_callback(node.name, value)
+
+    def exec_assignment(self, node):
+        if node.name not in self.variables:
+            raise NameError(f"Semantic Error: Variable '{node.name}' not declared")
+        value = self.evaluate(node.value)
+        self.variables[node.name] = value
+        self.update_symbol_callback(node.name, value)
+        self.IT = value
+        self.update_symbol_callback('IT', self.IT)
+
+    def exec_visible(self, node):
+        output = ''.join([stringify(self.evaluate(part)) for part in node.parts])
+        self.write_console_callback(output + '\n')
+
+    def exec_gimmeh(self, node):
+        if node.name not in self.variables:
+            raise NameError(f"Semantic Error: Variable '{node.name}' not declared")
+        input_value = self.read_input_callback(f"Enter value for {node.name}:")
+        self.variables[node.name] = input_value
+        self.update_symbol_callback(node.name, input_value)
+
+    def exec_type_cast(self, node):
+        casted_value = cast_value(self.variables[node.name], node.type_name)
+        self.variables[node.name] = casted_value
+        self.update_symbol_callback(node.name, casted_value)
+
+    def exec_expression_statement(self, node):
+        self.IT = self.evaluate(node.expression)
+        self.update_symbol_callback('IT', self.IT)
+
+    # O RLY? uses IT as condition
+    def exec_if(self, node):
+        signal = None
+        if is_truthy(self.IT):
+            signal = self.execute_block(node.then_body)
+        else:
+            for condition, body in node.mebbe_clauses:
+                if is_truthy(self.evaluate(condition)):
+                    signal = self.execute_block(body)
+                    break
+            else:
+                if node.else_body is not None:
+                    signal = self.execute_block(node.else_body)
+        if signal is not None:
+            return signal
+        if node.end_error:
+            raise node.end_error
+        return None
+
+    # WTF? compares IT with each OMG label in order; the first match runs until the next case or GTFO
+    # (labels are evaluated for every case until a GTFO, skipped case bodies are validated)
+    def exec_switch(self, node):
+        if node not in self.case_tables:
+            self.case_tables[node] = case_table(node)
+        table = self.case_tables[node]
+        if table is not None:
+            return self.exec_switch_table(node, table)
+
+        switch_value = self.IT
+        found_match = False
+        should_break = False
+
+        for case in node.cases:
+            if should_break:
+                if case.skip_error:
+                    raise case.skip_error
+                continue
+            case_value = self.evaluate(case.label)
+            if not found_match and values_equal(switch_value, case_value):
+                found_match = True
+                signal = self.execute_block(case.body)
+                if signal is BREAK:
+                    should_break = True
+                elif signal is not None:
+                    return signal
+            elif case.skip_error:
+                raise case.skip_error
+
+        default = node.default
+        if default is not None:
+            if not found_match and not should_break:
+                signal = self.execute_block(default.body)
+                if signal is not None and signal is not BREAK:
+                    return signal
+            elif default.skip_error:
+                raise default.skip_error
+        return None
+
+    # jump straight to the matching case (or OMGWTF): literal labels cannot fail or have effects and
+    # there is no case error to raise, so the cases that are not taken need not be looked at
+    def exec_switch_table(self, node, table):
+        index = table.match(self.IT)
+        if index is not None:
+            body = node.cases[index].body
+        elif node.default is not None:
+            body = node.default.body
+        else:
+            return None
+        signal = self.execute_block(body)
+        if signal is not None and signal is not BREAK:
+            return signal
+        return None
+
+    def exec_loop(self, node):
+        if node.invariants:
+            return self.run_with_invariants(node, self.run_loop)
+        return self.run_loop(node)
+
+    # a loop starts without the invariant values of an earlier run; when it ends, the values of the run it
+    # interrupted (a recursive call can enter the same loop) are put back
+    def run_with_invariants(self, node, run_loop):
+        values = self.invariant_values
+        saved = [(invariant, values.pop(invariant)) for invariant in node.invariants if invariant in values]
+        try:
+            return run_loop(node)
+        finally:
+            for invariant in node.invariants:
+                values.pop(invariant, None)
+            values.update(saved)
+
+    def run_loop(self, node):
+        loop_var = node.variable
+        if loop_var is not None and loop_var not in self.variables:
+            raise NameError(f"Semantic Error: Loop variable '{loop_var}' not declared")
+
+        condition = node.condition
+        until = node.condition_type == TokenType.TIL
+        step = 1 if node.operation == TokenType.UPPIN else -1
+
+        if loop_var is not None and condition is not None:
+            if node not in self.counted_loops:
+                self.counted_loops[node] = counted_loop_bound(node)
+            bound = self.counted_loops[node]
+            if bound is not None:
+                if type(bound) is Literal:
+                    bound = bound.value
+                elif type(bound) is Variable:
+                    bound = self.variables.get(bound.name)
+                else:
+                    # a hoisted bound is computed now instead of by the first condition check
+                    bound = self.evaluate(bound)
+                if type(bound) is int and type(self.variables[loop_var]) is int:
+                    return self.exec_counted_loop(node, step, bound)
+
+        while True:
+            # Check condition if present
+            if condition is not None:
+                if is_truthy(self.evaluate(condition)) == until:
+                    break
+
+            # Execute loop body
+            signal = self.execute_block(node.body)
+            if signal is BREAK:
+                break
+            if signal is not None:
+                return signal
+
+            # Update loop variable
+            if loop_var is not None:
+                self.variables[loop_var] = to_number(self.variables[loop_var]) + step
+                self.update_symbol_callback(loop_var, self.variables[loop_var])
+
+        if node.end_error:
+            raise node.end_error
+        return None
+
+    # counted loop on a native int counter: the loop ends when the counter reaches bound, so the condition
+    # is not evaluated; the counter is stored in variables every iteration (the body may read it) but only
+    # sent to the symbol table when the loop ends
+    def exec_counted_loop(self, node, step, bound):
+        variables = self.variables
+        loop_var = node.variable
+        start = counter = variables[loop_var]
+        signal = None
+        try:
+            while counter != bound:
+                signal = self.execute_block(node.body)
+                if signal is not None:
+                    break
+                counter += step
+                variables[loop_var] = counter
+        finally:
+            if counter != start:
+                self.update_symbol_callback(loop_var, counter)
+
+        if signal is not None and signal is not BREAK:
+            return signal
+        if node.end_error:
+            raise node.end_error
+        return None
+
+    def exec_function_definition(self, node):
+        if self.tail_calls:
+            node = FunctionDef(node.name, node.params, mark_tail_calls(node.body, node.name), node.line)
+        self.functions[node.name] = node
+
+    def exec_break(self, node):
+        return BREAK
+
+    def exec_return(self, node):
+        return Completion('return', None if node.value is None else self.evaluate(node.value))
+
+    def exec_raise(self, node):
+        for operand in node.operands:
+            self.evaluate(operand)
+        raise node.error
+
+    # evaluate the arguments here, the running call rebinds its parameters and starts over
+    def exec_tail_call(self, node):
+        call = node.call
+        func = self.functions.get(call.name)
+        if func is None:
+            raise NameError(f"Semantic Error: Function '{call.name}' not defined")
+        return Completion('tail', (func, [self.evaluate(arg) for arg in call.args]))
+
+    # ---- expressions ----
+
+    def eval_literal(self, node):
+        return node.value
+
+    def eval_variable(self, node):
+        try:
+            return self.variables[node.name]
+        except KeyError:
+            raise NameError(f"Semantic Error: Variable '{node.name}' not declared") from None
+
+    def eval_numeric_op(self, node):
+        return numeric_op(node.op, self.evaluate(node.left), self.evaluate(node.right))
+
+    def eval_comparison(self, node):
+        equal = values_equal(self.evaluate(node.left), self.evaluate(node.right))
+        return equal if node.op == TokenType.BOTH_SAEM else not equal
+
+    # ALL OF / BOTH OF stop at the first false operand, ANY OF / EITHER OF at the first true one
+    def eval_boolean_op(self, node):
+        stop = SHORT_CIRCUIT_OPS.get(node.op)
+        if stop is None:
+            return boolean_op(node.op, [self.evaluate(operand) for operand in node.operands])
+        for operand in node.operands:
+            if is_truthy(self.evaluate(operand)) is stop:
+                return stop
+        return not stop
+
+    def eval_not(self, node):
+        return not is_truthy(self.evaluate(node.operand))
+
+    def eval_smoosh(self, node):
+        return smoosh([self.evaluate(operand) for operand in node.operands])
+
+    def eval_cast(self, node):
+        return cast_value(self.evaluate(node.operand), node.type_name)
+
+    def eval_bukkit_op(self, node):
+        return bukkit_op(node.op, [self.evaluate(operand) for operand in node.operands])
+
+    # computed the first time it runs in this run of its loop
+    def eval_invariant(self, node):
+        values = self.invariant_values
+        if node in values:
+            return values[node]
+        value = values[node] = self.evaluate(node.expression)
+        return value
+
+    # call a function with an isolated scope holding only its parameters and IT
+    def eval_function_call(self, node):
+        func = self.functions.get(node.name)
+        if func is None:
+            raise NameError(f"Semantic Error: Function '{node.name}' not defined")
+
+        args = [self.evaluate(arg) for arg in node.args]
+        key = None
+        if self.call_cache is not None and func.name in self.pure_functions:
+            caller_it = self.IT if func.name in self.entry_it_readers else None
+            key = self.call_cache.key(func, args, caller_it)
+            found, value = (False, None) if key is None else self.call_cache.lookup(key)
+            if found:
+                self.IT = value
+                self.update_symbol_callback('IT', self.IT)
+                self.variables['IT'] = self.IT
+                return value
+
+        saved_variables = self.variables
+        # calls run so far in this frame (1 + tail calls)
+        calls = 0
+        try:
+            while True:
+                if len(args) != len(func.params):
+                    raise ValueError(f"Function '{func.name}' expects {len(func.params)} arguments, got {len(args)}")
+                self.variables = dict(zip(func.params, args))
+                self.variables['IT'] = None
+                calls += 1
+
+                signal = self.execute_block(func.body)
+                if signal is None or signal.kind != 'tail':
+                    break
+                func, args = signal.value
+        finally:
+            self.variables = saved_variables
+        # (GTFO inside a function is a Return node, so a signal here is always a return)
+        return_value = None if signal is None else signal.value
+        if key is not None:
+            self.call_cache.store(key, return_value)
+
+        # every call returns to its caller, which sets IT (the callers of tail calls have already exited)
+        for _ in range(calls):
+            self.IT = return_value
+            self.update_symbol_callback('IT', self.IT)
+        self.variables['IT'] = self.IT
+        return return_value
+
+    # ---- exceptions mode (GTFO / FOUND YR unwind as BreakException / ReturnException) ----
+
+    def exec_switch_raising(self, node):
+        switch_value = self.IT
+        found_match = False
+        should_break = False
+
+        for case in node.cases:
+            if should_break:
+                if case.skip_error:
+                    raise case.skip_error
+                continue
+            case_value = self.evaluate(case.label)
+            if not found_match and values_equal(switch_value, case_value):
+                found_match = True
+                try:
+                    self.execute_block(case.body)
+                except BreakException:
+                    should_break = True
+            elif case.skip_error:
+                raise case.skip_error
+
+        default = node.default
+        if default is not None:
+            if not found_match and not should_break:
+                try:
+                    self.execute_block(default.body)
+                except BreakException:
+                    pass
+            elif default.skip_error:
+                raise default.skip_error
+
+    def exec_loop_raising(self, node):
+        if node.invariants:
+            return self.run_with_invariants(node, self.run_loop_raising)
+        return self.run_loop_raising(node)
+
+    def run_loop_raising(self, node):
+        loop_var = node.variable
+        if loop_var is not None and loop_var not in self.variables:
+            raise NameError(f"Semantic Error: Loop variable '{loop_var}' not declared")
+
+        condition = node.condition
+        until = node.condition_type == TokenType.TIL
+        step = 1 if node.operation == TokenType.UPPIN else -1
+
+        while True:
+            # Check condition if present
+            if condition is not None:
+                if is_truthy(self.evaluate(condition)) == until:
+                    break
+
+            # Execute loop body
+            try:
+                self.execute_block(node.body)
+            except BreakException:
+                break
+
+            # Update loop variable
+            if loop_var is not None:
+                self.variables[loop_var] = to_number(self.variables[loop_var]) + step
+                self.update_symbol_callback(loop_var, self.variables[loop_var])
+
+        if node.end_error:
+            raise node.end_error
+
+    def exec_break_raising(self, node):
+        raise BreakException()
+
+    def exec_return_raising(self, node):
+        raise ReturnException(None if node.value is None else self.evaluate(node.value))
+
+    def eval_function_call_raising(self, node):
+        func = self.functions.get(node.name)
+        if func is None:
+            raise NameError(f"Semantic Error: Function '{node.name}' not defined")
+
+        args = [self.evaluate(arg) for arg in node.args]
+        if len(args) != len(func.params):
+            raise ValueError(f"Function '{node.name}' expects {len(func.params)} arguments, got {len(args)}")
+
+        saved_variables = self.variables
+        self.variables = dict(zip(func.params, args))
+        self.variables['IT'] = None
+
+        return_value = None
+        try:
+            self.execute_block(func.body)
+        except ReturnException as e:
+            return_value = e.value
+        finally:
+            self.variables = saved_variables
+
+        self.IT = return_value
+        self.variables['IT'] = self.IT
+        self.update_symbol_callback('IT', self.IT)
+        return return_value
+
+# CaseTable for a switch whose labels are all literals and that has no case validation errors, else None
+def case_table(node):
+    cases = node.cases
+    if any(type(case.label) is not Literal or case.skip_error for case in cases):
+        return None
+    if node.default is not None and node.default.skip_error:
+        return None
+    return CaseTable([case.label.value for case in cases])
+
+# bound of a counted loop: UPPIN / NERFIN YR <var> with TIL BOTH SAEM <var> AN <bound> or
+# WILE DIFFRINT <var> AN <bound>, where bound is a NUMBR literal or a variable and the body never assigns,
+# casts, reads into or loops over the loop variable or the bound variable. None for other loops.
+def counted_loop_bound(node):
+    comparison = {TokenType.TIL: TokenType.BOTH_SAEM, TokenType.WILE: TokenType.DIFFRINT}[node.condition_type]
+    condition = node.condition
+    if (type(condition) is not Comparison or condition.op != comparison
+            or type(condition.left) is not Variable or condition.left.name != node.variable):
+        return None
+    bound = condition.right
+    names = {node.variable}
+    if type(bound) is Variable:
+        names.add(bound.name)
+    elif type(bound) is Invariant:
+        # the loop writes none of the variables it reads
+        return bound
+    elif type(bound) is not Literal or type(bound.value) is not int:
+        return None
+    if 'IT' in names or (type(bound) is Variable and bound.name == node.variable) or assigns_any(node.body, names):
+        return None
+    return bound
+
+# True when statements can change one of names (function bodies have their own variables)
+def assigns_any(statements, names):
+    for statement in statements:
+        node_type = type(statement)
+        if node_type in (Declaration, Assignment, Gimmeh, TypeCast) and statement.name in names:
+            return True
+        if node_type is If:
+            bodies = [statement.then_body, *(body for _, body in statement.mebbe_clauses)]
+            if statement.else_body is not None:
+                bodies.append(statement.else_body)
+        elif node_type is Switch:
+            bodies = [case.body for case in statement.cases]
+            if statement.default is not None:
+                bodies.append(statement.default.body)
+        elif node_type is Loop:
+            if statement.variable in names:
+                return True
+            bodies = [statement.body]
+        else:
+            continue
+        if any(assigns_any(body, names) for body in bodies):
+            return True
+    return False
+
+# copy of a function body with FOUND YR I IZ <name> ... MKAY replaced by TailCall wherever it appears
+# (a FOUND YR ends the function from any depth of conditionals, switches and loops)
+def mark_tail_calls(statements, name):
+    marked = []
+    for statement in statements:
+        node_type = type(statement)
+        if node_type is Return and type(statement.value) is FunctionCall and statement.value.name == name:
+            statement = TailCall(statement.value, statement.line)
+        elif node_type is If:
+            statement = If(mark_tail_calls(statement.then_body, name),
+                           tuple((condition, mark_tail_calls(body, name)) for condition, body in statement.mebbe_clauses),
+                           None if statement.else_body is None else mark_tail_calls(statement.else_body, name),
+                           statement.end_error, statement.line)
+        elif node_type is Switch:
+            statement = Switch(tuple(Case(case.label, mark_tail_calls(case.body, name), case.skip_error, case.line)
+                                     for case in statement.cases),
+                               None if statement.default is None else
+                               Case(None, mark_tail_calls(statement.default.body, name),
+                                    statement.default.skip_error, statement.default.line),
+                               statement.line)
+        elif node_type is Loop:
+            statement = Loop(statement.label, statement.operation, statement.variable, statement.condition_type,
+                             statement.condition, mark_tail_calls(statement.body, name), statement.end_error,
+                             statement.invariants, statement.line)
+        marked.append(statement)
+    return tuple(marked)
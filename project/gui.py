@@ -1,14 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox, simpledialog
 from PIL import Image, ImageTk
-from lexer import Lexer
 from parser import Parser
+from program_cache import ProgramCache
+from runtime import Bukkit, stringify
 
 # logo from: https://lolcode-redesign.webflow.io
 
 class LOLCodeInterpreterGUI:
-    def __init__(self, root):
+    def __init__(self, root, use_cache=True):
         self.root = root
+        # lexed/parsed programs are reused across runs of the same code
+        self.program_cache = ProgramCache(enabled=None if use_cache else False)
         self.root.title("LOL CODE Interpreter sheesh")
         self.root.geometry("1400x800")
         
@@ -350,6 +353,11 @@ class LOLCodeInterpreterGUI:
             return 'NOOB'
         elif isinstance(value, bool):
             return 'WIN' if value else 'FAIL'
+        elif type(value) is Bukkit:
+            # size and the first few elements, so a long BUKKIT keeps its row readable
+            shown = ', '.join(stringify(item) for item in value.items[:10])
+            more = ', ...' if len(value) > 10 else ''
+            return f"BUKKIT of {len(value)}: [{shown}{more}]"
         else:   
             return str(value)
     
@@ -377,9 +385,8 @@ class LOLCodeInterpreterGUI:
         code = self.text_editor.get(1.0, tk.END)
         
         try:
-            # Lexical analysis
-            lexer = Lexer(code)
-            tokens = lexer.tokenize()
+            # Lexical analysis + parsing (cached by source)
+            tokens, program = self.program_cache.compile(code)
             
             # Display tokens
             for token in tokens:
@@ -389,10 +396,10 @@ class LOLCodeInterpreterGUI:
             
             # Syntax analysis and execution
             parser = Parser(tokens, self.update_symbol_table,
-                          self.write_to_console, self.read_input)
+                          self.write_to_console, self.read_input, program=program)
             parser.parse()
                         
         except (SyntaxError, NameError, ValueError, Exception) as e:
             error_msg = str(e) if str(e) else f"{type(e).__name__} occurred"
             self.write_to_console(f"Error: {error_msg}\n")
-            messagebox.showerror("Execution Error", error_msg)
\ No newline at end of file
+            messagebox.showerror("Execution Error", error_msg)
\ No newline at end of file
@@ -1,12 +1,65 @@
-from token_types import TokenType, Token # Import TokenType enum and Token class
+import re # Import re for the compiled master token pattern
+from token_types import TokenType, Token, TokenStream # Import TokenType enum, Token class and compact TokenStream
+
+# List of multi-word keywords in LOLCODE
+MULTIWORD_KEYWORDS = [
+    "I HAS A", "SUM OF", "DIFF OF", "PRODUKT OF", "QUOSHUNT OF", 
+    "MOD OF", "BIGGR OF", "SMALLR OF", "BOTH OF", "EITHER OF", 
+    "WON OF", "ANY OF", "ALL OF", "BOTH SAEM", "IS NOW A", 
+    "O RLY?", "YA RLY", "NO WAI", "WTF?", "IM IN YR", "IM OUTTA YR", 
+    "HOW IZ I", "IF U SAY SO", "FOUND YR", "I IZ",
+    "A BUKKIT", "PIK OF", "SIZ OF", "PUT IN", "SHUV IN"
+]
+
+# keyword value -> token type map, built once instead of looping over TokenType for every word
+KEYWORD_TYPES = {token_type.value: token_type for token_type in TokenType}
+
+# token types produced by multi-word keywords, their token value is always the canonical keyword
+MULTIWORD_TYPES = {KEYWORD_TYPES[keyword] for keyword in MULTIWORD_KEYWORDS}
+
+# master pattern matched once per token position against the uppercased line
+# alternatives are tried in the same order as the per-character scan: BTW comment, whitespace,
+# string literal, multi-word keyword (not part of a larger word), then a plain word up to whitespace
+TOKEN_PATTERN = re.compile(
+    r'(?P<comment>BTW(?=\s|\Z))'
+    r'|(?P<space>\s+)'
+    r'|(?P<yarn>"[^"]*")'
+    r'|(?P<keyword>' + '|'.join(re.escape(keyword) for keyword in MULTIWORD_KEYWORDS) + r')(?=[\s,;)(.]|\Z)'
+    r'|(?P<word>\S+)'
+)
+
+# line boundaries recognised by str.splitlines()
+LINE_BREAK = re.compile(r'\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# split source like str.splitlines() but also yield the offset where each line starts
+def iter_line_offsets(source):
+    start = 0
+    for m in LINE_BREAK.finditer(source):
+        yield start, source[start:m.start()]
+        start = m.end()
+    if start < len(source):
+        yield start, source[start:]
+
+# read lines from a text stream, binary stream or mmap without loading the whole file
+# each physical line is split again with splitlines() so line numbering matches str.splitlines() on the full source
+def read_lines(fileobj, encoding='utf-8'):
+    line = fileobj.readline()
+    while line:
+        if isinstance(line, bytes):
+            line = line.decode(encoding)
+        yield from line.splitlines()
+        line = fileobj.readline()
 
 # Lexer class for lexing LOLCODE code
 class Lexer:
     # Initialize lexer with source code
-    def __init__(self, source_code):
+    # table_driven=False selects the original per-character scan (kept for benchmarking and as a fallback)
+    def __init__(self, source_code='', table_driven=True):
         self.source = source_code
         self.tokens = []
         self.line_number = 1
+        self.in_multiline_comment = False
+        self.table_driven = table_driven
         
     # validates identifier name
     def is_valid_identifier(self, identifier):
@@ -19,153 +72,249 @@ class Lexer:
                 return False
         return True
 
+    # classify a single word (keyword, literal or identifier) found at the given column
+    def classify_word(self, word, word_upper, column):
+        # Check if word matches any single-word keyword
+        token_type = KEYWORD_TYPES.get(word_upper)
+        if token_type:
+            return token_type
+
+        # Check for numeric literals (NUMBR, NUMBAR), TROOF, NOOB, or IDENTIFIER
+        if word.lstrip('-').isdigit():
+            return TokenType.NUMBR_LITERAL
+        if word.lstrip('-').replace('.', '', 1).isdigit() and word.count('.') <= 1:
+            return TokenType.NUMBAR_LITERAL
+        if word in ["WIN", "FAIL"]:
+            return TokenType.TROOF_LITERAL
+        if word == "NOOB":
+            return TokenType.NOOB
+        # check if identifier valid
+        if not self.is_valid_identifier(word):
+            raise SyntaxError(f"Lexical Error at line {self.line_number}, column {column}: Invalid identifier '{word}'")
+        return TokenType.IDENTIFIER
+
     # Tokenize source code into a list of tokens
     def tokenize(self):
         # split source code into lines for processing and tracking line numbers
-        # separates handling for single-line and multi-line comments as well as string literals / multi-word keywords / single-word tokens etc.
-        lines = self.source.splitlines()
-        in_multiline_comment = False
-        
-        # List of multi-word keywords in LOLCODE
-        multiword_keywords = [
-            "I HAS A", "SUM OF", "DIFF OF", "PRODUKT OF", "QUOSHUNT OF", 
-            "MOD OF", "BIGGR OF", "SMALLR OF", "BOTH OF", "EITHER OF", 
-            "WON OF", "ANY OF", "ALL OF", "BOTH SAEM", "IS NOW A", 
-            "O RLY?", "YA RLY", "NO WAI", "WTF?", "IM IN YR", "IM OUTTA YR", 
-            "HOW IZ I", "IF U SAY SO", "FOUND YR", "I IZ"
-        ]
+        self.tokens.extend(self.iter_lines(self.source.splitlines()))
+
+        # return list of tokens
+        return self.tokens
+
+    # Lazily tokenize a text stream, binary stream or mmap (or the lexer's own source when none is given)
+    # tokens are yielded one at a time so the whole program never has to be held in memory
+    def iter_tokens(self, fileobj=None):
+        if fileobj is None:
+            return self.iter_lines(self.source.splitlines())
+        return self.iter_lines(read_lines(fileobj))
+
+    # Tokenize an iterable of lines, yielding tokens as they are found
+    # the OBTW/TLDR state is kept on the lexer so it carries over between chunks of lines
+    def iter_lines(self, lines):
+        scan_line = self.scan_line if self.table_driven else self.scan_line_legacy
 
         # Process each line
         for line in lines:
-            column = 1 # Track column number for error reporting
             stripped = line.strip() # Remove leading/trailing whitespace
+            if not self.is_comment_line(stripped):
+                yield from scan_line(stripped)
+            self.line_number += 1
 
-            # Handle start/end of multi-line comments
-            if stripped.startswith("OBTW"):
-                in_multiline_comment = True
-                self.line_number += 1
-                continue
+    # Tokenize source code into a compact TokenStream instead of a list of Token objects
+    def tokenize_stream(self):
+        stream = TokenStream(self.source)
+        for line_start, line in iter_line_offsets(self.source):
+            stripped = line.strip() # Remove leading/trailing whitespace
+            if not self.is_comment_line(stripped):
+                # offset of the stripped line in the source
+                offset = line_start + len(line) - len(line.lstrip())
+                self.scan_line_into(stream, stripped, offset)
+            self.line_number += 1
+        return stream
 
-            # Handle end of multi-line comment
-            if stripped.startswith("TLDR"):
-                in_multiline_comment = False
-                self.line_number += 1
-                continue
+    # handle start/end of multi-line comments, returns True when the line is not code
+    def is_comment_line(self, stripped):
+        # Handle start of multi-line comment
+        if stripped.startswith("OBTW"):
+            self.in_multiline_comment = True
+            return True
+
+        # Handle end of multi-line comment
+        if stripped.startswith("TLDR"):
+            self.in_multiline_comment = False
+            return True
+
+        # Skip line inside multi-line comments
+        return self.in_multiline_comment
+
+    # Tokenize one stripped line in a single pass using the compiled master pattern
+    def scan_line(self, stripped):
+        # keywords are matched case-insensitively, so match against the uppercased line and slice values from the original
+        # uppercasing that changes the length (e.g. 'ß' -> 'SS') would break the index mapping, use the original scan instead
+        scan = stripped.upper()
+        if len(scan) != len(stripped):
+            yield from self.scan_line_legacy(stripped)
+            return
+
+        line_number = self.line_number
+        match = TOKEN_PATTERN.match
+        i = 0
+        line_length = len(stripped)
+
+        while i < line_length:
+            m = match(scan, i)
+            kind = m.lastgroup
+            j = m.end()
+
+            # Rest of line is a comment, stop processing
+            if kind == 'comment':
+                break
+
+            # columns advance one per character, so a token's column is its index + 1
+            if kind == 'yarn':
+                yield Token(TokenType.YARN_LITERAL, stripped[i:j], line_number, i + 1)
+            elif kind == 'keyword':
+                keyword = m.group('keyword')
+                yield Token(KEYWORD_TYPES[keyword], keyword, line_number, i + 1)
+            elif kind == 'word':
+                word = stripped[i:j]
+                yield Token(self.classify_word(word, m.group('word'), i + 1), word, line_number, i + 1)
+
+            i = j
+
+    # Tokenize one stripped line starting at the given source offset into a TokenStream
+    # same scan as scan_line but without creating Token objects
+    def scan_line_into(self, stream, stripped, offset):
+        scan = stripped.upper()
+        if len(scan) != len(stripped):
+            for token in self.scan_line_legacy(stripped):
+                if token.type in MULTIWORD_TYPES:
+                    stream.append(token.type, -1, 0, token.line, token.column)
+                else:
+                    stream.append(token.type, offset + token.column - 1, len(token.value), token.line, token.column)
+            return
+
+        line_number = self.line_number
+        match = TOKEN_PATTERN.match
+        append = stream.append
+        i = 0
+        line_length = len(stripped)
+
+        while i < line_length:
+            m = match(scan, i)
+            kind = m.lastgroup
+            j = m.end()
+
+            # Rest of line is a comment, stop processing
+            if kind == 'comment':
+                break
+
+            if kind == 'yarn':
+                append(TokenType.YARN_LITERAL, offset + i, j - i, line_number, i + 1)
+            elif kind == 'keyword':
+                append(KEYWORD_TYPES[m.group('keyword')], -1, 0, line_number, i + 1)
+            elif kind == 'word':
+                token_type = self.classify_word(stripped[i:j], m.group('word'), i + 1)
+                append(token_type, offset + i, j - i, line_number, i + 1)
+
+            i = j
+
+    # Tokenize one stripped line with the original per-character scan
+    # (tries every multi-word keyword at every position; kept as the reference implementation)
+    def scan_line_legacy(self, stripped):
+        column = 1 # Track column number for error reporting
+
+        # Tokenization logic --
+        # track position in line
+        i = 0 # 
+        line_length = len(stripped) 
+        
+        # Process characters in the line
+        while i < line_length:
+            # Check for BTW comment - stop processing rest of line
+            # BTW must be followed by whitespace or end of line
+            if i + 3 <= line_length and stripped[i:i+3].upper() == "BTW":
+                # Check if BTW is followed by end of string or whitespace
+                if i + 3 >= line_length or stripped[i+3].isspace():
+                    # Rest of line is a comment, stop processing
+                    break
             
-            # Skip line inside multi-line comments
-            if in_multiline_comment:
-                self.line_number += 1
+            # Skip whitespace
+            if stripped[i].isspace():
+                i += 1
+                column += 1
                 continue
-
-            # Tokenization logic --
-            # track position in line
-            i = 0 # 
-            line_length = len(stripped) 
             
-            # Process characters in the line
-            while i < line_length:
-                # Check for BTW comment - stop processing rest of line
-                # BTW must be followed by whitespace or end of line
-                if i + 3 <= line_length and stripped[i:i+3].upper() == "BTW":
-                    # Check if BTW is followed by end of string or whitespace
-                    if i + 3 >= line_length or stripped[i+3].isspace():
-                        # Rest of line is a comment, stop processing
-                        break
-                
-                # Skip whitespace
-                if stripped[i].isspace():
-                    i += 1
-                    column += 1
-                    continue
-                
-                # Handle string literals by checking for opening quote and finding closing quote
-                if stripped[i] == '"':
-                    j = i + 1
-                    while j < line_length and stripped[j] != '"':
-                        j += 1
-                    
-                    # If closing quote found, get string literal token
-                    if j < line_length:
-                        yarn_literal = stripped[i:j+1]
-                        self.tokens.append(Token(TokenType.YARN_LITERAL, yarn_literal, self.line_number, column))
-                        i = j + 1
-                        column += len(yarn_literal)
-                        continue
-                
-                # Check for multi-word keywords first
-                token_found = False # boolean flag to indicate if token was found
-                
-                # Check each multi-word keyword by iterating through list + matching at current position
-                for keyword in multiword_keywords:
-                    keyword_upper = keyword.upper()
-                    if (i + len(keyword)) <= line_length and stripped[i:i+len(keyword)].upper() == keyword_upper:
-                        # Ensure keyword is not part of a larger word
-                        next_char_index = i + len(keyword)
-                        # Check if next character is whitespace or punctuation or end of line
-                        if (next_char_index >= line_length or 
-                            stripped[next_char_index].isspace() or
-                            stripped[next_char_index] in [',', ';', ')', '(', '.']):
-                            
-                            # Identify token type for the multi-word keyword
-                            token_type = None
-                            for t in TokenType:
-                                if t.value == keyword_upper:
-                                    token_type = t
-                                    break
-                            
-                            # Add token if type found
-                            if token_type:
-                                self.tokens.append(Token(token_type, keyword, self.line_number, column))
-                            
-                            # Move index and column forward by length of keyword
-                            i += len(keyword)
-                            column += len(keyword)
-                            token_found = True
-                            break
-                
-                # If multi-word keyword found --> skip to next iteration
-                if token_found:
-                    continue
-                
-                # Handle single-word tokens (keywords, literals, identifiers)
-                j = i
-                while j < line_length and not stripped[j].isspace():
+            # Handle string literals by checking for opening quote and finding closing quote
+            if stripped[i] == '"':
+                j = i + 1
+                while j < line_length and stripped[j] != '"':
                     j += 1
                 
-                # Extract word and determine type
-                word = stripped[i:j]
-                token_type = None
-                
-                # Check if word matches any single-word keyword
-                for t in TokenType:
-                    if word.upper() == t.value:
-                        token_type = t
+                # If closing quote found, get string literal token
+                if j < line_length:
+                    yarn_literal = stripped[i:j+1]
+                    yield Token(TokenType.YARN_LITERAL, yarn_literal, self.line_number, column)
+                    i = j + 1
+                    column += len(yarn_literal)
+                    continue
+            
+            # Check for multi-word keywords first
+            token_found = False # boolean flag to indicate if token was found
+            
+            # Check each multi-word keyword by iterating through list + matching at current position
+            for keyword in MULTIWORD_KEYWORDS:
+                keyword_upper = keyword.upper()
+                if (i + len(keyword)) <= line_length and stripped[i:i+len(keyword)].upper() == keyword_upper:
+                    # Ensure keyword is not part of a larger word
+                    next_char_index = i + len(keyword)
+                    # Check if next character is whitespace or punctuation or end of line
+                    if (next_char_index >= line_length or 
+                        stripped[next_char_index].isspace() or
+                        stripped[next_char_index] in [',', ';', ')', '(', '.']):
+                        
+                        # Identify token type for the multi-word keyword
+                        token_type = None
+                        for t in TokenType:
+                            if t.value == keyword_upper:
+                                token_type = t
+                                break
+                        
+                        # Add token if type found
+                        if token_type:
+                            yield Token(token_type, keyword, self.line_number, column)
+                        
+                        # Move index and column forward by length of keyword
+                        i += len(keyword)
+                        column += len(keyword)
+                        token_found = True
                         break
-                    
-                # If not a keyword, check for literals or identifiers
-                if not token_type:
-                    # Check for numeric literals (NUMBR, NUMBAR), TROOF, NOOB, or IDENTIFIER
-                    if word.lstrip('-').isdigit():
-                        token_type = TokenType.NUMBR_LITERAL
-                    elif word.lstrip('-').replace('.', '', 1).isdigit() and word.count('.') <= 1:
-                        token_type = TokenType.NUMBAR_LITERAL
-                    elif word in ["WIN", "FAIL"]:
-                        token_type = TokenType.TROOF_LITERAL
-                    elif word == "NOOB":
-                        token_type = TokenType.NOOB
-                    else:
-                        # check if identifier valid
-                        if not self.is_valid_identifier(word):
-                            raise SyntaxError(f"Lexical Error at line {self.line_number}, column {column}: Invalid identifier '{word}'")
-                        token_type = TokenType.IDENTIFIER
-                
-                # add identified token to list
-                self.tokens.append(Token(token_type, word, self.line_number, column))
+            
+            # If multi-word keyword found --> skip to next iteration
+            if token_found:
+                continue
+            
+            # Handle single-word tokens (keywords, literals, identifiers)
+            j = i
+            while j < line_length and not stripped[j].isspace():
+                j += 1
+            
+            # Extract word and determine type
+            word = stripped[i:j]
+            token_type = None
+            
+            # Check if word matches any single-word keyword
+            for t in TokenType:
+                if word.upper() == t.value:
+                    token_type = t
+                    break
                 
-                i = j
-                column += len(word)
+            # If not a keyword, check for literals or identifiers
+            if not token_type:
+                token_type = self.classify_word(word, word.upper(), column)
             
-            self.line_number += 1
-
-        # return list of tokens
-        return self.tokens
\ No newline at end of file
+            # add identified token to list
+            yield Token(token_type, word, self.line_number, column)
+            
+            i = j
+            column += len(word)
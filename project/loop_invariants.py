@@ -0,0 +1,257 @@
+from token_types import TokenType  # Import TokenType Enum
+from ast_nodes import (Literal, Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, BukkitOp, FunctionCall,
+                       Invariant, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Case, Switch, Loop, FunctionDef, Return)  # Import AST node classes
+
+# operators whose value only depends on their operands (no calls, BUKKIT operations or input)
+PURE_OPERATORS = (NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast)
+
+# operators that look at what a BUKKIT operand holds (its truth value, text or identity);
+# arithmetic on a BUKKIT always fails the same way
+CONTENT_OPERATORS = (Comparison, BooleanOp, Not, Smoosh, Cast)
+
+# BUKKIT operations that change the BUKKIT they are given
+MUTATING_BUKKIT_OPS = (TokenType.PUT_IN, TokenType.SHUV_IN)
+
+# InvariantHoister class: finds the loop-invariant expressions of every loop (part of the optimizer)
+# An expression in a loop's condition or body is invariant when it is built from pure operators over literals
+# and variables that nothing in the loop writes (R, GIMMEH, IS NOW A, the UPPIN / NERFIN variable of the
+# loop or of a loop nested in it; the IT variable always counts as written). Functions only see their own
+# variables, so a call in the loop cannot write one, but it can change a BUKKIT it is passed: in a loop that
+# calls a function or runs PUT IN / SHUV IN, operators that look at the contents of a variable are not invariant.
+# Each largest invariant expression that contains an operator becomes an Invariant node listed in the loop's
+# invariants. The engines evaluate it where it stands the first time it runs after the loop is entered and
+# reuse the value for the rest of that run of the loop, so the value, the errors it raises and when they are
+# raised stay as they were. Loops are handled outermost first: an expression invariant in an outer loop is
+# hoisted out of it, and what is left is looked at again for each nested loop.
+# hoisted lists (Invariant, loop label) for the report
+class InvariantHoister:
+    def __init__(self):
+        self.hoisted = []
+        self.written = None      # names written in the loop being rewritten
+        self.mutates = False     # True when that loop can change the contents of a BUKKIT
+        self.invariants = None   # Invariant nodes found for that loop
+        self.label = None
+
+        # node class -> handler returning (rewritten expression, True when it is invariant)
+        self.expression_visitors = {
+            Literal: self.visit_leaf,
+            Variable: self.visit_variable,
+            Invariant: self.visit_leaf,
+            NumericOp: self.visit_binary,
+            Comparison: self.visit_binary,
+            BooleanOp: self.visit_operands,
+            Smoosh: self.visit_operands,
+            Not: self.visit_operand,
+            Cast: self.visit_operand,
+            BukkitOp: self.visit_operands,
+            FunctionCall: self.visit_function_call,
+        }
+
+    # statements with the invariants of every loop in them (and in the functions they define) hoisted
+    def hoist_block(self, statements):
+        return tuple(self.hoist_statement(statement) for statement in statements)
+
+    def hoist_statement(self, statement):
+        node_type = type(statement)
+        if node_type is Loop:
+            loop = self.hoist_loop(statement)
+            return rebuild_loop(loop, loop.condition, self.hoist_block(loop.body), loop.invariants)
+        if node_type is FunctionDef:
+            return FunctionDef(statement.name, statement.params, self.hoist_block(statement.body), statement.line)
+        if node_type is If:
+            return rebuild_if(statement, statement.mebbe_clauses, self.hoist_block)
+        if node_type is Switch:
+            return rebuild_switch(statement, statement.cases, self.hoist_block)
+        return statement
+
+    # the loop with its own invariants hoisted (nested loops are rewritten but not yet hoisted themselves)
+    def hoist_loop(self, node):
+        saved = self.written, self.mutates, self.invariants, self.label
+        self.written = {'IT'}
+        self.mutates = False
+        scan_loop(node, self)
+        self.invariants = list(node.invariants)
+        self.label = node.label
+        try:
+            condition = None if node.condition is None else self.hoist(node.condition)
+            body = self.rewrite_block(node.body)
+            return rebuild_loop(node, condition, body, tuple(self.invariants))
+        finally:
+            self.written, self.mutates, self.invariants, self.label = saved
+
+    # ---- rewriting the statements of one loop ----
+
+    def rewrite_block(self, statements):
+        return tuple(self.rewrite_statement(statement) for statement in statements)
+
+    # function definitions run later, in their own scope, so they are left alone
+    def rewrite_statement(self, statement):
+        node_type = type(statement)
+        if node_type in (Declaration, Assignment):
+            if statement.value is None:
+                return statement
+            return node_type(statement.name, self.hoist(statement.value), statement.line)
+        if node_type is Visible:
+            return Visible(tuple(self.hoist(part) for part in statement.parts), statement.line)
+        if node_type is ExpressionStatement:
+            return ExpressionStatement(self.hoist(statement.expression), statement.line)
+        if node_type is Return and statement.value is not None:
+            return Return(self.hoist(statement.value), statement.line)
+        if node_type is If:
+            mebbe_clauses = tuple((self.hoist(condition), body) for condition, body in statement.mebbe_clauses)
+            return rebuild_if(statement, mebbe_clauses, self.rewrite_block)
+        if node_type is Switch:
+            cases = tuple(Case(self.hoist(case.label), case.body, case.skip_error, case.line)
+                          for case in statement.cases)
+            return rebuild_switch(statement, cases, self.rewrite_block)
+        if node_type is Loop:
+            condition = None if statement.condition is None else self.hoist(statement.condition)
+            return rebuild_loop(statement, condition, self.rewrite_block(statement.body), statement.invariants)
+        return statement
+
+    # expression with its largest invariant subexpressions replaced by Invariant nodes
+    def hoist(self, node):
+        node, invariant = self.visit(node)
+        return self.wrap(node) if invariant else node
+
+    # Invariant for an invariant expression that computes something (a literal or variable is left as it is)
+    def wrap(self, node):
+        if type(node) not in PURE_OPERATORS:
+            return node
+        invariant = Invariant(node, node.line)
+        self.invariants.append(invariant)
+        self.hoisted.append((invariant, self.label))
+        return invariant
+
+    # ---- expressions: (rewritten expression, True when it is invariant) ----
+
+    def visit(self, node):
+        visitor = self.expression_visitors.get(type(node))
+        if visitor is None:
+            return node, False
+        return visitor(node)
+
+    def visit_leaf(self, node):
+        return node, True
+
+    def visit_variable(self, node):
+        return node, node.name not in self.written
+
+    # operands of an expression: each invariant one is wrapped unless the whole expression is invariant
+    def visit_children(self, node, children):
+        visited = [self.visit(child) for child in children]
+        invariant = (type(node) in PURE_OPERATORS and all(flag for _, flag in visited)
+                     and not (self.mutates and type(node) in CONTENT_OPERATORS
+                              and any(may_be_bukkit(child) for child, _ in visited)))
+        if invariant:
+            return [child for child, _ in visited], True
+        return [self.wrap(child) if flag else child for child, flag in visited], False
+
+    def visit_binary(self, node):
+        (left, right), invariant = self.visit_children(node, (node.left, node.right))
+        if left is node.left and right is node.right:
+            return node, invariant
+        return type(node)(node.op, left, right, node.line), invariant
+
+    def visit_operands(self, node):
+        operands, invariant = self.visit_children(node, node.operands)
+        if all(new is old for new, old in zip(operands, node.operands)):
+            return node, invariant
+        if type(node) is Smoosh:
+            return Smoosh(tuple(operands), node.line), invariant
+        return type(node)(node.op, tuple(operands), node.line), invariant
+
+    def visit_operand(self, node):
+        (operand,), invariant = self.visit_children(node, (node.operand,))
+        if operand is node.operand:
+            return node, invariant
+        if type(node) is Not:
+            return Not(operand, node.line), invariant
+        return Cast(operand, node.type_name, node.line), invariant
+
+    def visit_function_call(self, node):
+        args, _ = self.visit_children(node, node.args)
+        if all(new is old for new, old in zip(args, node.args)):
+            return node, False
+        return FunctionCall(node.name, tuple(args), node.line), False
+
+# True when an expression can give a BUKKIT (a variable, or a cast, which can leave a BUKKIT as it is)
+def may_be_bukkit(node):
+    if type(node) is Invariant:
+        node = node.expression
+    return type(node) in (Variable, Cast)
+
+# add the names written anywhere in a loop to hoister.written and note whether it can change a BUKKIT
+def scan_loop(node, hoister):
+    if node.variable is not None:
+        hoister.written.add(node.variable)
+    if node.condition is not None:
+        scan_expression(node.condition, hoister)
+    scan_block(node.body, hoister)
+
+def scan_block(statements, hoister):
+    for statement in statements:
+        node_type = type(statement)
+        if node_type in (Declaration, Assignment, Gimmeh, TypeCast):
+            hoister.written.add(statement.name)
+        if node_type in (Declaration, Assignment, Return):
+            if statement.value is not None:
+                scan_expression(statement.value, hoister)
+        elif node_type is Visible:
+            for part in statement.parts:
+                scan_expression(part, hoister)
+        elif node_type is ExpressionStatement:
+            scan_expression(statement.expression, hoister)
+        elif node_type is If:
+            scan_block(statement.then_body, hoister)
+            for condition, body in statement.mebbe_clauses:
+                scan_expression(condition, hoister)
+                scan_block(body, hoister)
+            if statement.else_body is not None:
+                scan_block(statement.else_body, hoister)
+        elif node_type is Switch:
+            for case in statement.cases:
+                scan_expression(case.label, hoister)
+                scan_block(case.body, hoister)
+            if statement.default is not None:
+                scan_block(statement.default.body, hoister)
+        elif node_type is Loop:
+            scan_loop(statement, hoister)
+
+# calls and PUT IN / SHUV IN can change the contents of a BUKKIT
+def scan_expression(node, hoister):
+    node_type = type(node)
+    if node_type is FunctionCall or (node_type is BukkitOp and node.op in MUTATING_BUKKIT_OPS):
+        hoister.mutates = True
+    if node_type in (NumericOp, Comparison):
+        children = (node.left, node.right)
+    elif node_type in (BooleanOp, Smoosh, BukkitOp):
+        children = node.operands
+    elif node_type in (Not, Cast):
+        children = (node.operand,)
+    elif node_type is FunctionCall:
+        children = node.args
+    elif node_type is Invariant:
+        children = (node.expression,)
+    else:
+        return
+    for child in children:
+        scan_expression(child, hoister)
+
+def rebuild_loop(node, condition, body, invariants):
+    return Loop(node.label, node.operation, node.variable, node.condition_type, condition, body, node.end_error,
+                invariants, node.line)
+
+# copy of an O RLY? with new MEBBE conditions and every body passed through rewrite
+def rebuild_if(node, mebbe_clauses, rewrite):
+    return If(rewrite(node.then_body), tuple((condition, rewrite(body)) for condition, body in mebbe_clauses),
+              None if node.else_body is None else rewrite(node.else_body), node.end_error, node.line)
+
+# copy of a WTF? with new cases and every case body passed through rewrite
+def rebuild_switch(node, cases, rewrite):
+    default = node.default
+    if default is not None:
+        default = Case(None, rewrite(default.body), default.skip_error, default.line)
+    return Switch(tuple(Case(case.label, rewrite(case.body), case.skip_error, case.line) for case in cases),
+                  default, node.line)
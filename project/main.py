@@ -1,11 +1,94 @@
-import tkinter as tk
-from gui import LOLCodeInterpreterGUI
+import sys
+import argparse
+from parser import Parser, ENGINES
+from program_cache import ProgramCache
+from type_inference import TypeInference
+
+# run a .lol file without the GUI: output goes to stdout, GIMMEH reads lines from stdin
+# with optimize, the optimizer's changes are listed on stderr when show_optimizations is set
+# with memoize, the call cache's hit/miss counts are written to stderr when show_memo_stats is set
+# show_types writes the variable types TypeInference finds (and arithmetic on YARNs) to stderr first
+# show_tiers lists the loops and functions the tiered engine compiled on stderr
+def run_file(path, engine='ast', use_cache=True, optimize=False, show_optimizations=False, tail_calls=False,
+             frame_budget=None, memoize=False, memo_size=None, show_memo_stats=False, show_types=False,
+             tier=None, hot_threshold=None, show_tiers=False):
+    with open(path, encoding='utf-8') as source_file:
+        code = source_file.read()
+
+    parser = None
+    try:
+        tokens, program = ProgramCache(enabled=None if use_cache else False).compile(code)
+        if show_types:
+            for line, description in TypeInference().infer(program).report:
+                sys.stderr.write(f"types: line {line}: {description}\n")
+        parser = Parser(tokens, lambda name, value: None, sys.stdout.write,
+                        lambda prompt: sys.stdin.readline().rstrip('\n'), engine=engine, program=program,
+                        optimize=optimize, tail_calls=tail_calls, frame_budget=frame_budget,
+                        memoize=memoize, memo_size=memo_size, tier=tier, hot_threshold=hot_threshold)
+        parser.parse()
+    except Exception as e:
+        error_msg = str(e) if str(e) else f"{type(e).__name__} occurred"
+        sys.stdout.flush()
+        sys.stderr.write(f"Error: {error_msg}\n")
+        return 1
+    finally:
+        if show_optimizations and parser is not None:
+            for line, description in parser.optimization_report:
+                sys.stderr.write(f"optimizer: line {line}: {description}\n")
+        if show_memo_stats and parser is not None and parser.call_cache is not None:
+            stats = parser.call_cache.stats()
+            sys.stderr.write(f"memo: {stats['hits']} hits, {stats['misses']} misses, "
+                             f"{stats['size']}/{stats['max_size']} cached\n")
+        if show_tiers and parser is not None:
+            for line, description in parser.tier_report:
+                sys.stderr.write(f"tiers: line {line}: {description}\n")
+    return 0
 
 # Entry point for LOL CODE interpreter
+# usage: python main.py                      (GUI)
+#        python main.py program.lol [options]  (headless)
 def main():
+    arg_parser = argparse.ArgumentParser(description="LOL CODE interpreter")
+    arg_parser.add_argument('file', nargs='?', help="run this .lol file without the GUI")
+    arg_parser.add_argument('--engine', choices=ENGINES, default='ast', help="execution engine")
+    arg_parser.add_argument('--optimize', action='store_true',
+                            help="fold constants, remove dead branches and hoist loop invariants first")
+    arg_parser.add_argument('--show-optimizations', action='store_true', help="list what --optimize changed on stderr")
+    arg_parser.add_argument('--tail-calls', action='store_true',
+                            help="run self-recursive FOUND YR I IZ calls without growing the stack (ast engine)")
+    arg_parser.add_argument('--frame-budget', type=int, metavar='N',
+                            help="maximum depth of nested function calls (vm engine, default 1000000)")
+    arg_parser.add_argument('--memoize', action='store_true',
+                            help="cache results of functions without VISIBLE / GIMMEH (ast engine)")
+    arg_parser.add_argument('--memo-size', type=int, metavar='N',
+                            help="number of results kept by --memoize (default 4096)")
+    arg_parser.add_argument('--show-memo-stats', action='store_true', help="print --memoize hits and misses on stderr")
+    arg_parser.add_argument('--show-types', action='store_true',
+                            help="print the inferred type of every variable and any arithmetic on YARNs on stderr")
+    arg_parser.add_argument('--tier', type=int, choices=(0, 1),
+                            help="run everything in the token interpreter (0) or compile every loop and function "
+                                 "when first entered (1) (tiered engine)")
+    arg_parser.add_argument('--hot-threshold', type=int, metavar='N',
+                            help="loop iterations or function calls before the tiered engine compiles them "
+                                 "(default 1000)")
+    arg_parser.add_argument('--show-tiers', action='store_true',
+                            help="list the loops and functions the tiered engine compiled on stderr")
+    arg_parser.add_argument('--no-cache', action='store_true', help="do not read or write the compiled-program cache")
+    args = arg_parser.parse_args()
+
+    if args.file:
+        sys.exit(run_file(args.file, args.engine, use_cache=not args.no_cache, optimize=args.optimize,
+                          show_optimizations=args.show_optimizations, tail_calls=args.tail_calls,
+                          frame_budget=args.frame_budget, memoize=args.memoize, memo_size=args.memo_size,
+                          show_memo_stats=args.show_memo_stats, show_types=args.show_types, tier=args.tier,
+                          hot_threshold=args.hot_threshold, show_tiers=args.show_tiers))
+
+    import tkinter as tk
+    from gui import LOLCodeInterpreterGUI
+
     # initialize main application window, create + run GUI app and start event loop
     root = tk.Tk()
-    app = LOLCodeInterpreterGUI(root)
+    app = LOLCodeInterpreterGUI(root, use_cache=not args.no_cache)
     root.mainloop()
-    
-main()
\ No newline at end of file
+
+main()
@@ -0,0 +1,194 @@
+import math  # Import math for float keys
+from collections import OrderedDict  # Import OrderedDict for LRU order
+from runtime import Bukkit  # Import Bukkit to keep BUKKIT values out of cache keys
+from ast_nodes import (NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, FunctionCall, BukkitOp, Invariant,
+                       Assignment, Visible, Gimmeh, ExpressionStatement, If, Switch, Loop,
+                       FunctionDef, Return, TailCall, Raise)  # Import AST node classes
+
+DEFAULT_MEMO_SIZE = 4096
+
+# statements a pure function may not contain: console I/O, and defining functions (which changes
+# what later calls run)
+IMPURE_STATEMENTS = (Visible, Gimmeh, FunctionDef)
+
+# names of the functions in program whose result depends only on their arguments (and, for the
+# names in entry_it_readers, on the IT register they are called with): no VISIBLE or GIMMEH, and
+# every function they call is pure. Functions only see their parameters and the IT register, so
+# besides the return value a pure call only has symbol table updates as an effect.
+# A name is pure only when every definition of it is (a name can be defined more than once).
+def pure_functions(program):
+    definitions = function_definitions(program.statements)
+    calls = {}
+    pure = set()
+    for name, nodes in definitions.items():
+        called = set()
+        if not any(has_impure_statement(node.body, called) for node in nodes):
+            pure.add(name)
+            calls[name] = called
+
+    # drop functions that call an impure or undefined function until nothing changes
+    changed = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            if not calls[name] <= pure:
+                pure.discard(name)
+                changed = True
+    return pure
+
+# names of the functions that can test IT (O RLY? / WTF?) before setting it, directly or through a call,
+# i.e. that read the IT register left by their caller (calls reset the IT variable, not the register)
+def entry_it_readers(program):
+    definitions = function_definitions(program.statements)
+    readers = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, nodes in definitions.items():
+            if name not in readers and any(reads_unset_it(node.body, False, readers)[0] for node in nodes):
+                readers.add(name)
+                changed = True
+    return readers
+
+# name -> FunctionDef nodes anywhere in statements
+def function_definitions(statements, definitions=None):
+    if definitions is None:
+        definitions = {}
+    for statement in statements:
+        if type(statement) is FunctionDef:
+            definitions.setdefault(statement.name, []).append(statement)
+        for body in statement_bodies(statement):
+            function_definitions(body, definitions)
+    return definitions
+
+# True when statements contain an impure statement or a BUKKIT operation (BUKKITs are mutable, so their
+# contents can differ between two calls with the same arguments); names of called functions are added to called
+def has_impure_statement(statements, called):
+    for statement in statements:
+        if type(statement) in IMPURE_STATEMENTS:
+            return True
+        for expression in statement_expressions(statement):
+            if collect_calls(expression, called):
+                return True
+        if any(has_impure_statement(body, called) for body in statement_bodies(statement)):
+            return True
+    return False
+
+# returns (IT is read before it is set, IT is certainly set afterwards)
+# readers are the functions known to read the IT register they are called with
+def reads_unset_it(statements, it_set, readers):
+    for statement in statements:
+        node_type = type(statement)
+        if not it_set:
+            if node_type in (If, Switch):
+                return True, it_set
+            called = set()
+            for expression in statement_expressions(statement):
+                collect_calls(expression, called)
+            if called & readers:
+                return True, it_set
+        # a branch or loop body may not run, so only its reads count
+        for body in statement_bodies(statement):
+            if reads_unset_it(body, it_set, readers)[0]:
+                return True, it_set
+        if node_type in (ExpressionStatement, Assignment):
+            it_set = True
+    return False, it_set
+
+def statement_expressions(statement):
+    node_type = type(statement)
+    if node_type is Assignment:
+        return [statement.value]
+    if node_type is ExpressionStatement:
+        return [statement.expression]
+    if node_type is Return:
+        return [] if statement.value is None else [statement.value]
+    if node_type is TailCall:
+        return [statement.call]
+    if node_type is Raise:
+        return list(statement.operands)
+    if node_type is If:
+        return [condition for condition, _ in statement.mebbe_clauses]
+    if node_type is Switch:
+        return [case.label for case in statement.cases]
+    if node_type is Loop:
+        return [] if statement.condition is None else [statement.condition]
+    return []
+
+def statement_bodies(statement):
+    node_type = type(statement)
+    if node_type is If:
+        bodies = [statement.then_body] + [body for _, body in statement.mebbe_clauses]
+        if statement.else_body is not None:
+            bodies.append(statement.else_body)
+        return bodies
+    if node_type is Switch:
+        bodies = [case.body for case in statement.cases]
+        if statement.default is not None:
+            bodies.append(statement.default.body)
+        return bodies
+    if node_type in (Loop, FunctionDef):
+        return [statement.body]
+    return []
+
+# adds the names of the functions expression calls to called; True when it contains a BUKKIT operation
+def collect_calls(expression, called):
+    node_type = type(expression)
+    if node_type is FunctionCall:
+        called.add(expression.name)
+        return any([collect_calls(arg, called) for arg in expression.args])
+    if node_type in (NumericOp, Comparison):
+        return any([collect_calls(expression.left, called), collect_calls(expression.right, called)])
+    if node_type in (BooleanOp, Smoosh, Raise):
+        return any([collect_calls(operand, called) for operand in expression.operands])
+    if node_type in (Not, Cast):
+        return collect_calls(expression.operand, called)
+    if node_type is Invariant:
+        return collect_calls(expression.expression, called)
+    if node_type is BukkitOp:
+        for operand in expression.operands:
+            collect_calls(operand, called)
+        return True
+    return False
+
+# hashable key for a LOLCODE value that keeps types apart (1, 1.0, "1" and WIN differ)
+def value_key(value):
+    if type(value) is float:
+        # -0.0 == 0.0 but prints differently
+        return (float, value, math.copysign(1.0, value))
+    return (type(value), value)
+
+# LRU cache of function results keyed by the function definition, the argument values and the IT
+# register the call starts with (None for functions that do not read it)
+class CallCache:
+    def __init__(self, max_size=DEFAULT_MEMO_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # None when a value is a BUKKIT: the result can depend on its contents, which a later statement can change
+    def key(self, func, args, caller_it=None):
+        if type(caller_it) is Bukkit or any([type(arg) is Bukkit for arg in args]):
+            return None
+        return (func, tuple(value_key(arg) for arg in args), value_key(caller_it))
+
+    # (True, value) for a cached result, (False, None) otherwise
+    def lookup(self, key):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def store(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'max_size': self.max_size}
@@ -0,0 +1,412 @@
+import math  # Import math for finite float checks
+from token_types import TokenType  # Import TokenType Enum
+from runtime import is_truthy, stringify, cast_value, values_equal, numeric_op, boolean_op, SHORT_CIRCUIT_OPS  # Import runtime value helpers
+from ast_nodes import (Program, Literal, Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, BukkitOp,
+                       FunctionCall, Invariant, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Case, Switch, Loop, FunctionDef, Break, Return, Raise)  # Import AST node classes
+from loop_invariants import InvariantHoister  # Import loop-invariant hoisting pass
+
+# marks the IT register as not statically known
+UNKNOWN = object()
+
+# largest NUMBR a fold may produce (bigger results are left to run time)
+MAX_FOLDED_INT = 2**63
+
+# statements after which nothing in the same block runs
+TERMINATORS = (Break, Return, Raise)
+
+# Optimizer class for the optional AST optimization stage
+# - folds expressions whose operands are all literals (SUM OF 2 AN 3, SMOOSH "a" AN "b" MKAY,
+#   MAEK "12" A NUMBR, BOTH SAEM WIN AN WIN, ...) using the runtime helpers every engine uses,
+#   and merges adjacent literal operands of SMOOSH and VISIBLE
+# - removes O RLY?/WTF? branches when the IT register they test is statically known
+#   (set by a literal expression statement or assignment earlier in the same block)
+# - drops statements after GTFO / FOUND YR / a raised error in the same block
+# - then hoists loop-invariant expressions (PRODUKT OF n AN n in a loop that never writes n) so they
+#   are computed once per run of the loop instead of on every iteration (see loop_invariants.py)
+# output, errors and symbol callbacks stay the same: a fold that would raise (MAEK "x" A NUMBR,
+# SUM OF NOOB AN 1) is left in place so the error is still raised when the code runs
+# every change is recorded in report as (line, description)
+class Optimizer:
+    def __init__(self):
+        self.report = []
+
+        # node class -> handler returning (statements, IT after them)
+        self.statement_optimizers = {
+            Declaration: self.optimize_declaration,
+            Assignment: self.optimize_assignment,
+            Visible: self.optimize_visible,
+            Gimmeh: self.optimize_unchanged,
+            TypeCast: self.optimize_unchanged,
+            ExpressionStatement: self.optimize_expression_statement,
+            If: self.optimize_if,
+            Switch: self.optimize_switch,
+            Loop: self.optimize_loop,
+            FunctionDef: self.optimize_function_definition,
+            Break: self.optimize_unchanged,
+            Return: self.optimize_return,
+            Raise: self.optimize_unchanged,
+        }
+        # node class -> handler returning the folded expression
+        self.expression_folders = {
+            Literal: self.fold_unchanged,
+            Variable: self.fold_unchanged,
+            NumericOp: self.fold_numeric_op,
+            Comparison: self.fold_comparison,
+            BooleanOp: self.fold_boolean_op,
+            Not: self.fold_not,
+            Smoosh: self.fold_smoosh,
+            Cast: self.fold_cast,
+            BukkitOp: self.fold_bukkit_op,
+            FunctionCall: self.fold_function_call,
+            Invariant: self.fold_unchanged,
+            Raise: self.fold_unchanged,
+        }
+
+    # return an optimized copy of program (IT starts as NOOB)
+    def optimize(self, program):
+        statements, _ = self.optimize_block(program.statements, None)
+        hoister = InvariantHoister()
+        statements = hoister.hoist_block(statements)
+        for invariant, label in hoister.hoisted:
+            self.note(invariant.line, f"hoisted {source(invariant.expression)} out of loop {label}")
+        return Program(statements)
+
+    # report as text, one line per change
+    def format_report(self):
+        return '\n'.join(f"line {line}: {description}" for line, description in self.report)
+
+    def note(self, line, description):
+        self.report.append((line, description))
+
+    # optimize a statement list given the IT value on entry; returns (statements, IT on exit)
+    def optimize_block(self, statements, it):
+        result = []
+        for index, statement in enumerate(statements):
+            optimized, it = self.statement_optimizers[type(statement)](statement, it)
+            result.extend(optimized)
+            if result and isinstance(result[-1], TERMINATORS) and index + 1 < len(statements):
+                dropped = len(statements) - index - 1
+                self.note(statements[index + 1].line, f"removed {dropped} unreachable statement(s)")
+                break
+        return tuple(result), it
+
+    # fold an expression and report it when the whole expression became a literal
+    def expression(self, node):
+        folded = self.fold(node)
+        if type(folded) is Literal and type(node) is not Literal:
+            self.note(node.line, f"folded {source(node)} to {source(folded)}")
+        return folded
+
+    def fold(self, node):
+        return self.expression_folders[type(node)](node)
+
+    # fold operands; returns (folded operands, True when all of them are literals)
+    def fold_operands(self, operands):
+        folded = [self.fold(operand) for operand in operands]
+        return folded, all(type(operand) is Literal for operand in folded)
+
+    # operands of an expression that could not be folded: report the ones that were
+    def report_operands(self, operands, folded):
+        for operand, new in zip(operands, folded):
+            if type(new) is Literal and type(operand) is not Literal:
+                self.note(operand.line, f"folded {source(operand)} to {source(new)}")
+
+    # ---- statements ----
+
+    def optimize_unchanged(self, node, it):
+        return [node], it
+
+    def optimize_declaration(self, node, it):
+        if node.value is None:
+            return [node], it
+        value = self.expression(node.value)
+        return [Declaration(node.name, value, node.line)], it if not calls_function(value) else UNKNOWN
+
+    # assignment also sets IT
+    def optimize_assignment(self, node, it):
+        value = self.expression(node.value)
+        return [Assignment(node.name, value, node.line)], literal_value(value)
+
+    def optimize_visible(self, node, it):
+        folded = [self.fold(part) for part in node.parts]
+        self.report_operands(node.parts, folded)
+        parts = self.merge_literals(folded, node.line, 'VISIBLE')
+        return [Visible(parts, node.line)], it if not any(calls_function(part) for part in parts) else UNKNOWN
+
+    def optimize_expression_statement(self, node, it):
+        expression = self.expression(node.expression)
+        return [ExpressionStatement(expression, node.line)], literal_value(expression)
+
+    # O RLY? with a known IT becomes the statements of the branch it takes
+    def optimize_if(self, node, it):
+        if it is UNKNOWN:
+            mebbe_clauses = [(self.expression(condition), body) for condition, body in node.mebbe_clauses]
+            return [self.rebuild_if(node, node.then_body, mebbe_clauses)], UNKNOWN
+
+        if is_truthy(it):
+            self.note(node.line, "O RLY? always takes YA RLY")
+            return self.inline(node.then_body, node.end_error, node.line, it)
+
+        # MEBBE conditions are evaluated in order until one is true
+        mebbe_clauses = [(self.expression(condition), body) for condition, body in node.mebbe_clauses]
+        while mebbe_clauses and type(mebbe_clauses[0][0]) is Literal:
+            condition, body = mebbe_clauses.pop(0)
+            if is_truthy(condition.value):
+                self.note(condition.line, "O RLY? always takes this MEBBE")
+                return self.inline(body, node.end_error, node.line, it)
+        if mebbe_clauses:
+            self.note(node.line, "removed YA RLY branch that never runs")
+            return [self.rebuild_if(node, (), mebbe_clauses)], UNKNOWN
+
+        if node.else_body is not None:
+            self.note(node.line, "O RLY? always takes NO WAI")
+        else:
+            self.note(node.line, "removed O RLY? that never runs a branch")
+        return self.inline(node.else_body or (), node.end_error, node.line, it)
+
+    def rebuild_if(self, node, then_body, mebbe_clauses):
+        then_body, _ = self.optimize_block(then_body, UNKNOWN)
+        mebbe_clauses = tuple((condition, self.optimize_block(body, UNKNOWN)[0]) for condition, body in mebbe_clauses)
+        else_body = None if node.else_body is None else self.optimize_block(node.else_body, UNKNOWN)[0]
+        return If(then_body, mebbe_clauses, else_body, node.end_error, node.line)
+
+    # statements of a branch that always runs, followed by the missing OIC error if any
+    def inline(self, body, end_error, line, it):
+        statements, it = self.optimize_block(body, it)
+        statements = list(statements)
+        if end_error and not (statements and isinstance(statements[-1], TERMINATORS)):
+            statements.append(Raise(end_error, (), line))
+        return statements, it
+
+    # WTF? with a known IT and literal labels keeps only the case that runs
+    # (switches with case validation errors are left alone)
+    def optimize_switch(self, node, it):
+        cases = [self.rebuild_case(case, self.expression(case.label)) for case in node.cases]
+        default = node.default
+        known = (it is not UNKNOWN and all(type(case.label) is Literal and not case.skip_error for case in cases)
+                 and (default is None or not default.skip_error))
+        if not known:
+            cases = [self.rebuild_case(case, case.label, self.optimize_block(case.body, UNKNOWN)[0]) for case in cases]
+            if default is not None:
+                default = self.rebuild_case(default, None, self.optimize_block(default.body, UNKNOWN)[0])
+            return [Switch(tuple(cases), default, node.line)], UNKNOWN
+
+        for case in cases:
+            if values_equal(it, case.label.value):
+                self.note(case.line, f"WTF? always takes OMG {source(case.label)}")
+                return self.keep_case(Switch((case,), None, node.line), case, it)
+        if default is not None:
+            self.note(default.line, "WTF? always takes OMGWTF")
+            return self.keep_case(Switch((), default, node.line), default, it)
+        self.note(node.line, "removed WTF? that never runs a case")
+        return [], it
+
+    # the switch reduced to the case that runs: inline its body unless a GTFO leaves the switch
+    def keep_case(self, switch, case, it):
+        if breaks_out(case.body):
+            body, _ = self.optimize_block(case.body, it)
+            case = self.rebuild_case(case, case.label, body)
+            if switch.default is None:
+                return [Switch((case,), None, switch.line)], UNKNOWN
+            return [Switch((), case, switch.line)], UNKNOWN
+        statements, it = self.optimize_block(case.body, it)
+        return list(statements), it
+
+    def rebuild_case(self, case, label, body=None):
+        return Case(label, case.body if body is None else body, case.skip_error, case.line)
+
+    def optimize_loop(self, node, it):
+        condition = None if node.condition is None else self.expression(node.condition)
+        body, _ = self.optimize_block(node.body, UNKNOWN)
+        return [Loop(node.label, node.operation, node.variable, node.condition_type, condition, body,
+                     node.end_error, node.invariants, node.line)], UNKNOWN
+
+    # function bodies run with whatever IT the caller has
+    def optimize_function_definition(self, node, it):
+        body, _ = self.optimize_block(node.body, UNKNOWN)
+        return [FunctionDef(node.name, node.params, body, node.line)], it
+
+    def optimize_return(self, node, it):
+        if node.value is None:
+            return [node], it
+        return [Return(self.expression(node.value), node.line)], it
+
+    # ---- expressions ----
+
+    def fold_unchanged(self, node):
+        return node
+
+    # try a fold; errors are left for run time and oversized results are not folded
+    def literal(self, compute, node):
+        try:
+            value = compute()
+        except Exception:
+            return None
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        if isinstance(value, int) and not isinstance(value, bool) and abs(value) >= MAX_FOLDED_INT:
+            return None
+        return Literal(value, node.line)
+
+    def fold_numeric_op(self, node):
+        (left, right), constant = self.fold_operands((node.left, node.right))
+        if constant:
+            folded = self.literal(lambda: numeric_op(node.op, left.value, right.value), node)
+            if folded is not None:
+                return folded
+        self.report_operands((node.left, node.right), (left, right))
+        return NumericOp(node.op, left, right, node.line)
+
+    def fold_comparison(self, node):
+        (left, right), constant = self.fold_operands((node.left, node.right))
+        if constant:
+            equal = values_equal(left.value, right.value)
+            return Literal(equal if node.op == TokenType.BOTH_SAEM else not equal, node.line)
+        self.report_operands((node.left, node.right), (left, right))
+        return Comparison(node.op, left, right, node.line)
+
+    def fold_boolean_op(self, node):
+        operands, constant = self.fold_operands(node.operands)
+        stop = SHORT_CIRCUIT_OPS.get(node.op)
+        if stop is not None:
+            return self.fold_short_circuit(node, operands, stop)
+        if constant:
+            return Literal(boolean_op(node.op, [operand.value for operand in operands]), node.line)
+        self.report_operands(node.operands, operands)
+        return BooleanOp(node.op, tuple(operands), node.line)
+
+    # ALL OF / BOTH OF / ANY OF / EITHER OF stop at the first operand that decides the result: a literal that
+    # decides it ends the operand list (the operands after it never run), literals that do not are dropped
+    def fold_short_circuit(self, node, operands, stop):
+        kept = []
+        end = len(operands)
+        for index, operand in enumerate(operands):
+            if type(operand) is not Literal:
+                kept.append(operand)
+            elif is_truthy(operand.value) is stop:
+                if not kept:
+                    return Literal(stop, node.line)
+                kept.append(operand)
+                end = index + 1
+                if end < len(operands):
+                    self.note(operand.line, f"removed {len(operands) - end} {keyword(node.op)} operand(s) "
+                                            f"after {source(operand)} that never run")
+                break
+        if not kept:
+            return Literal(not stop, node.line)
+        self.report_operands(node.operands[:end], operands[:end])
+        return BooleanOp(node.op, tuple(kept), node.line)
+
+    def fold_not(self, node):
+        operand = self.fold(node.operand)
+        if type(operand) is Literal:
+            return Literal(not is_truthy(operand.value), node.line)
+        self.report_operands((node.operand,), (operand,))
+        return Not(operand, node.line)
+
+    def fold_smoosh(self, node):
+        operands, constant = self.fold_operands(node.operands)
+        if constant:
+            return Literal(''.join([stringify(operand.value) for operand in operands]), node.line)
+        self.report_operands(node.operands, operands)
+        return Smoosh(self.merge_literals(operands, node.line, 'SMOOSH'), node.line)
+
+    def fold_cast(self, node):
+        operand = self.fold(node.operand)
+        if type(operand) is Literal:
+            folded = self.literal(lambda: cast_value(operand.value, node.type_name), node)
+            if folded is not None:
+                return folded
+        self.report_operands((node.operand,), (operand,))
+        return Cast(operand, node.type_name, node.line)
+
+    # BUKKIT operations create or change a BUKKIT at run time, so only their operands fold
+    def fold_bukkit_op(self, node):
+        operands = [self.fold(operand) for operand in node.operands]
+        self.report_operands(node.operands, operands)
+        return BukkitOp(node.op, tuple(operands), node.line)
+
+    def fold_function_call(self, node):
+        args = [self.fold(arg) for arg in node.args]
+        self.report_operands(node.args, args)
+        return FunctionCall(node.name, tuple(args), node.line)
+
+    # join runs of adjacent literal operands into one YARN literal (both SMOOSH and VISIBLE stringify each part)
+    def merge_literals(self, operands, line, keyword):
+        merged = []
+        run = []
+        for operand in list(operands) + [None]:
+            if type(operand) is Literal:
+                run.append(operand)
+                continue
+            if len(run) > 1:
+                text = ''.join([stringify(literal.value) for literal in run])
+                self.note(run[0].line, f"merged {len(run)} {keyword} literals into {source(Literal(text, line))}")
+                merged.append(Literal(text, run[0].line))
+            else:
+                merged.extend(run)
+            run = []
+            if operand is not None:
+                merged.append(operand)
+        return tuple(merged)
+
+# IT after a statement that stores this expression's value
+def literal_value(expression):
+    return expression.value if type(expression) is Literal else UNKNOWN
+
+# True when evaluating the expression can call a function (calls set IT)
+def calls_function(expression):
+    if type(expression) is FunctionCall:
+        return True
+    if type(expression) in (NumericOp, Comparison):
+        return calls_function(expression.left) or calls_function(expression.right)
+    if type(expression) in (BooleanOp, Smoosh, BukkitOp):
+        return any(calls_function(operand) for operand in expression.operands)
+    if type(expression) in (Not, Cast):
+        return calls_function(expression.operand)
+    return False
+
+# True when a GTFO in these statements leaves the enclosing switch (loops and switches catch their own)
+def breaks_out(statements):
+    for statement in statements:
+        if type(statement) is Break:
+            return True
+        if type(statement) is If:
+            bodies = [statement.then_body] + [body for _, body in statement.mebbe_clauses]
+            if statement.else_body is not None:
+                bodies.append(statement.else_body)
+            if any(breaks_out(body) for body in bodies):
+                return True
+    return False
+
+# LOLCODE text of an expression (for the report; function calls and BUKKIT operations are shown as ...)
+def source(node):
+    node_type = type(node)
+    if node_type is Invariant:
+        return source(node.expression)
+    if node_type is Literal:
+        value = node.value
+        if value is None:
+            return 'NOOB'
+        if isinstance(value, bool):
+            return 'WIN' if value else 'FAIL'
+        if isinstance(value, str):
+            return f'"{value}"'
+        return repr(value)
+    if node_type in (NumericOp, Comparison):
+        return f"{keyword(node.op)} {source(node.left)} AN {source(node.right)}"
+    if node_type is BooleanOp:
+        return f"{keyword(node.op)} {' AN '.join(source(operand) for operand in node.operands)} MKAY"
+    if node_type is Not:
+        return f"NOT {source(node.operand)}"
+    if node_type is Smoosh:
+        return f"SMOOSH {' AN '.join(source(operand) for operand in node.operands)} MKAY"
+    if node_type is Cast:
+        return f"MAEK {source(node.operand)} A {node.type_name}"
+    if node_type is Variable:
+        return node.name
+    return '...'
+
+def keyword(op):
+    return op.name.replace('_', ' ')
@@ -1,45 +1,149 @@
 from token_types import TokenType  # Import TokenType Enum 
 from LOL_exceptions import BreakException, ReturnException  # Import custom exceptions for control flow
+from token_cursor import TokenCursor, TokenWindow  # Import token cursor and streaming token window
+from block_index import is_invalid_case_token  # Import switch case validation
+from runtime import (to_number, is_truthy, stringify, cast_value, values_equal, numeric_op, boolean_op, bukkit_op,
+                     CaseTable, smoosh, SHORT_CIRCUIT_OPS, Scope)  # Import runtime value helpers
+from ast_builder import ASTBuilder, BOOLEAN_OPS, BUKKIT_OPS  # Import AST front end and operator token sets
+from optimizer import Optimizer  # Import optional AST optimizer
+from evaluator import Evaluator  # Import AST evaluator
+from closure_compiler import ClosureCompiler  # Import closure-compiling backend
+from vm import VirtualMachine  # Import bytecode VM backend
+from transpiler import PythonTranspiler  # Import Python transpiler backend
+from tiering import TierCompiler, DEFAULT_HOT_THRESHOLD  # Import tier 1 compiler of the tiered engine
+
+# execution engines selectable with Parser(..., engine=...)
+#   ast      - build the AST once, then walk the tree (default)
+#   closures - build the AST once, resolve variables to slots, compile it into nested Python closures and call them
+#   vm       - build the AST once, compile it to bytecode and run it on a stack VM (deep recursion,
+#              function calls use a heap frame stack instead of Python's)
+#   python   - build the AST once, translate it to Python source, compile() and run it
+#   tokens   - original interpreter that executes directly off the token list
+#   tiered   - the token interpreter (tier 0), compiling loops and functions to Python (tier 1) once they are hot
+ENGINES = ('ast', 'closures', 'vm', 'python', 'tokens', 'tiered')
+
+# engines that run the token interpreter
+TOKEN_ENGINES = ('tokens', 'tiered')
+
+# AST backends: engine name -> class taking (program, update_symbol, write_console, read_input) with run()
+AST_BACKENDS = {
+    'ast': Evaluator,
+    'closures': ClosureCompiler,
+    'vm': VirtualMachine,
+    'python': PythonTranspiler,
+}
+
+# tokens that parse_expression turns into a value on their own
+LITERAL_TOKENS = (TokenType.NUMBR_LITERAL, TokenType.NUMBAR_LITERAL, TokenType.YARN_LITERAL,
+                  TokenType.TROOF_LITERAL, TokenType.NOOB)
+
+# caller state saved while a function runs (token interpreter)
+class CallFrame:
+    __slots__ = ('return_position', 'variables')
+
+    def __init__(self, return_position, variables):
+        self.return_position = return_position
+        self.variables = variables
 
 # Parser class for parsing LOLCODE tokens + executing program
-class Parser:
+class Parser(TokenCursor):
     # Initialize parser with tokens and callbacks for symbol table updates and console I/O
-    def __init__(self, tokens, update_symbol_callback, write_console_callback, read_input_callback):
-        self.tokens = tokens
-        self.position = 0
-        self.variables = {"IT": None}
+    # tokens can be a list or any iterable of tokens (read through a TokenWindow)
+    # program is an already built AST for these tokens (e.g. from ProgramCache), built from tokens when None
+    # optimize runs the Optimizer on the AST first (AST engines only); its changes are kept in optimization_report
+    # tail_calls runs self-recursive FOUND YR I IZ calls as jumps (ast engine only)
+    # frame_budget limits nested function calls in the vm engine, whose call stack is not Python's
+    # memoize caches the results of pure functions in an LRU of memo_size entries (ast engine only);
+    # the cache and its hit/miss counts are in call_cache after parse()
+    # tier forces the tiered engine to interpret everything (0) or compile every loop and function when it is
+    # first entered (1); otherwise a loop label or function name is compiled once it has run hot_threshold
+    # iterations or calls. What was compiled is listed in tier_report
+    def __init__(self, tokens, update_symbol_callback, write_console_callback, read_input_callback, engine='ast',
+                 program=None, optimize=False, tail_calls=False, frame_budget=None, memoize=False, memo_size=None,
+                 tier=None, hot_threshold=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of: {', '.join(ENGINES)}")
+        if optimize and engine in TOKEN_ENGINES:
+            raise ValueError("The optimizer needs an AST engine, the token interpreter runs the tokens as written")
+        if tail_calls and engine != 'ast':
+            raise ValueError("Tail calls are only supported by the 'ast' engine")
+        if frame_budget is not None and engine != 'vm':
+            raise ValueError("A frame budget is only supported by the 'vm' engine")
+        if memoize and engine != 'ast':
+            raise ValueError("Memoization is only supported by the 'ast' engine")
+        if memo_size is not None and memo_size < 1:
+            raise ValueError("The memoization cache needs room for at least one result")
+        if (tier is not None or hot_threshold is not None) and engine != 'tiered':
+            raise ValueError("Tiers are only supported by the 'tiered' engine")
+        if tier not in (None, 0, 1):
+            raise ValueError("The tier must be 0 (token interpreter) or 1 (compiled)")
+        if hot_threshold is not None and hot_threshold < 1:
+            raise ValueError("The hot threshold must be at least one iteration or call")
+        super().__init__(tokens)
+        self.engine = engine
+        self.program = program
+        self.optimize = optimize
+        self.tail_calls = tail_calls
+        self.frame_budget = frame_budget
+        self.memoize = memoize
+        self.memo_size = memo_size
+        self.call_cache = None
+        self.optimization_report = []
+        self.variables = Scope(IT=None)
         self.IT = None
         self.update_symbol_callback = update_symbol_callback
         self.write_console_callback = write_console_callback
         self.read_input_callback = read_input_callback
         self.functions = {}
+        self.call_stack = []
+        self.counted_loops = {}  # loop start position -> bound token of a counted loop, or None
+        self.switch_tables = {}  # WTF? position -> (CaseTable, case body starts, OMGWTF body start), or None
 
-    # get current token from token list
-    def current_token(self):
-        if self.position < len(self.tokens):
-            return self.tokens[self.position]
-        return None
+        # tiered engine (tier_compiler is None when everything is interpreted)
+        self.tier_compiler = TierCompiler(self) if engine == 'tiered' and tier != 0 else None
+        self.hot_threshold = 0 if tier == 1 else hot_threshold or DEFAULT_HOT_THRESHOLD
+        self.loop_counts = {}         # loop label -> iterations run by the interpreter
+        self.call_counts = {}         # function name -> calls
+        self.compiled_loops = {}      # IM IN YR position -> compiled loop, or None when it cannot be compiled
+        self.compiled_functions = {}  # HOW IZ I position -> compiled body, or None when it cannot be compiled
+        self.tier_report = []         # (line, description) for every loop and function compiled
 
-    # peek ahead in token list without advancing position
-    def peek(self, offset=1):
-        if self.position + offset < len(self.tokens):
-            return self.tokens[self.position + offset]
-        return None
+    # main entry point: parse and execute the program with the selected engine
+    def parse(self):
+        if self.engine in TOKEN_ENGINES:
+            return self.parse_program()
 
-    # advance to next token
-    def advance(self):
-        self.position += 1
+        if self.program is None:
+            self.program = ASTBuilder(self.tokens).build()
+        if self.optimize:
+            optimizer = Optimizer()
+            self.program = optimizer.optimize(self.program)
+            self.optimization_report = optimizer.report
+        options = {}
+        if self.tail_calls:
+            options['tail_calls'] = True
+        if self.frame_budget is not None:
+            options['frame_budget'] = self.frame_budget
+        if self.memoize:
+            options['memoize'] = True
+            if self.memo_size is not None:
+                options['memo_size'] = self.memo_size
+        backend = AST_BACKENDS[self.engine](self.program, self.update_symbol_callback,
+                                            self.write_console_callback, self.read_input_callback, **options)
+        try:
+            backend.run()
+        finally:
+            # expose final state like the token interpreter does
+            self.variables = backend.variables
+            self.IT = backend.IT
+            self.call_cache = getattr(backend, 'call_cache', None)
 
-    # expect a specific token type, raise error if not found
-    def expect(self, token_type):
-        token = self.current_token()
-        if not token or token.type != token_type:
-            raise SyntaxError(f"Syntax Error at line {token.line if token else 'EOF'}: Expected {token_type.value}, got {token.type.value if token else 'EOF'}")
-        self.advance()
-        return token
+    # token interpreter: parse and execute directly off the token list
+    def parse_program(self):
+        # index every block up front (a stream is indexed block by block as it is read)
+        if not isinstance(self.tokens, TokenWindow):
+            self.blocks.build()
 
-    # main parse function to process tokens
-    def parse(self):
         # parse any function definitions before HAI
         while self.current_token() and self.current_token().type == TokenType.HOW_IZ_I:
             self.parse_function_definition()
@@ -63,6 +167,7 @@ class Parser:
                 self.parse_function_definition()
             else:
                 self.parse_statement()
+            self.release_tokens()
 
         # Expect KTHXBYE to end main program
         self.expect(TokenType.KTHXBYE)
@@ -164,14 +269,15 @@ class Parser:
             
             # Break on statement-ending tokens - CHECK THIS FIRST
             if token.type in [TokenType.GIMMEH, TokenType.KTHXBYE,
-                            TokenType.YA_RLY, TokenType.NO_WAI,
+                            TokenType.YA_RLY, TokenType.NO_WAI, TokenType.MEBBE,
                             TokenType.OIC, TokenType.O_RLY,
                             TokenType.IM_OUTTA_YR, TokenType.OMG,
                             TokenType.OMGWTF, TokenType.GTFO,
                             TokenType.VISIBLE, TokenType.BTW, TokenType.IS_NOW_A,
                             TokenType.I_HAS_A, TokenType.IM_IN_YR,
                             TokenType.I_IZ, TokenType.FOUND_YR, 
-                            TokenType.HOW_IZ_I, TokenType.IF_U_SAY_SO]: 
+                            TokenType.HOW_IZ_I, TokenType.IF_U_SAY_SO,
+                            TokenType.PUT_IN, TokenType.SHUV_IN]: 
                 break
                 
             # Break on assignment statement
@@ -211,40 +317,61 @@ class Parser:
         self.update_symbol_callback(var_name, input_value)
 
     # parse IF-THEN-ELSE statement
+    # branches that are not taken are skipped with the block index instead of token by token
     def parse_if_then_else(self):
+        block_end = self.blocks.end(self.position)
         self.advance()  # consume O RLY?
         
         condition = self.IT # use IT as condition
         
         # expect YA RLY
+        branch = self.position
         self.expect(TokenType.YA_RLY)
         
         # evaluate condition and execute appropriate block
         if self.is_truthy(condition):
             # Execute YA RLY block
-            while (self.current_token() and 
-                   self.current_token().type not in [TokenType.NO_WAI, TokenType.MEBBE, TokenType.OIC]):
-                self.parse_statement()
-            
-            # Skip else branches
-            while self.current_token() and self.current_token().type != TokenType.OIC:
-                self.advance()
+            self.parse_branch()
         else:
             # Skip YA RLY block
-            while (self.current_token() and 
-                   self.current_token().type not in [TokenType.NO_WAI, TokenType.MEBBE, TokenType.OIC]):
+            self.position = self.blocks.next_branch(branch)
+            
+            # MEBBE <condition>: execute the first branch whose condition is true
+            taken = False
+            while self.current_token() and self.current_token().type == TokenType.MEBBE:
+                branch = self.position
                 self.advance()
+                if self.is_truthy(self.parse_expression()):
+                    self.parse_branch()
+                    taken = True
+                    break
+                self.position = self.blocks.next_branch(branch)
             
             # Execute NO WAI if present
-            if self.current_token() and self.current_token().type == TokenType.NO_WAI:
+            if not taken and self.current_token() and self.current_token().type == TokenType.NO_WAI:
                 self.advance()
                 while self.current_token() and self.current_token().type != TokenType.OIC:
                     self.parse_statement()
         
+        # Skip remaining branches
+        self.position = block_end
         self.expect(TokenType.OIC)
     
+    # execute statements of an O RLY? branch up to the next branch marker or OIC
+    def parse_branch(self):
+        while (self.current_token() and 
+               self.current_token().type not in [TokenType.NO_WAI, TokenType.MEBBE, TokenType.OIC]):
+            self.parse_statement()
+    
     # parse SWITCH statement
+    # skipped cases are jumped over with the block index; their bodies are still validated
     def parse_switch(self):
+        switch_start = self.position
+        switch_end = self.blocks.end(switch_start)
+        if switch_start not in self.switch_tables:
+            self.switch_tables[switch_start] = self.compile_switch(switch_start, switch_end)
+        if self.switch_tables[switch_start] is not None:
+            return self.run_switch_table(self.switch_tables[switch_start], switch_end)
         self.advance()  # consume WTF?
         
         switch_value = self.IT
@@ -254,53 +381,48 @@ class Parser:
         
         # helper function to validate case body tokens
         def validate_case_token(token):
-            if token and token.type == TokenType.IDENTIFIER:
-                value = token.value.upper()
-                if value.startswith("OMG") and value not in ["OMG", "OMGWTF"]:
-                    raise SyntaxError(
-                        f"Syntax Error at line {token.line}: Expected OMG or OMGWTF in switch case, got '{token.value}'"
-                    )
+            if is_invalid_case_token(token):
+                raise SyntaxError(
+                    f"Syntax Error at line {token.line}: Expected OMG or OMGWTF in switch case, got '{token.value}'"
+                )
+        
+        # skip tokens up to end, validating every skipped token
+        def skip_case(end):
+            invalid = self.blocks.first_invalid_case(self.position, end)
+            if invalid is not None:
+                validate_case_token(self.token_at(invalid))
+            self.position = end
         
         # process cases until OIC
         while self.current_token() and self.current_token().type != TokenType.OIC:
             if should_break:
                 # even when breaking validate tokens
-                validate_case_token(self.current_token())
-                self.advance()
+                skip_case(switch_end)
                 continue
                 
             token = self.current_token()
+            case_start = self.position
             
             # process OMG case
             if token.type == TokenType.OMG:
                 self.advance()
                 case_value = self.parse_expression()
                 
-                if not found_match and not in_omgwtf and not should_break:
-                    if self.values_equal(switch_value, case_value):
-                        found_match = True
-                        # eecute this case
-                        while (self.current_token() and 
-                            self.current_token().type not in [TokenType.OMG, TokenType.OMGWTF, TokenType.OIC]):
-                            # validate before parsing
-                            validate_case_token(self.current_token())
-                            try:
-                                self.parse_statement()
-                            except BreakException:
-                                should_break = True
-                                break
-                    else:
-                        # skip case but validate
-                        while (self.current_token() and 
-                            self.current_token().type not in [TokenType.OMG, TokenType.OMGWTF, TokenType.OIC]):
-                            validate_case_token(self.current_token())
-                            self.advance()
-                else:
-                    # skip case but validate
+                if not found_match and not in_omgwtf and not should_break and self.values_equal(switch_value, case_value):
+                    found_match = True
+                    # eecute this case
                     while (self.current_token() and 
                         self.current_token().type not in [TokenType.OMG, TokenType.OMGWTF, TokenType.OIC]):
+                        # validate before parsing
                         validate_case_token(self.current_token())
-                        self.advance()
+                        try:
+                            self.parse_statement()
+                        except BreakException:
+                            should_break = True
+                            break
+                else:
+                    # skip case but validate
+                    skip_case(self.blocks.next_branch(case_start))
             
             # process OMGWTF (default) case
             elif token.type == TokenType.OMGWTF:
@@ -318,10 +440,7 @@ class Parser:
                             break
                 else:
                     # skip case but validate
-                    while (self.current_token() and 
-                        self.current_token().type not in [TokenType.OIC]):
-                        validate_case_token(self.current_token())
-                        self.advance()
+                    skip_case(self.blocks.next_branch(case_start))
             
             else:
                 # invalid token in switch case
@@ -335,8 +454,49 @@ class Parser:
         if self.current_token() and self.current_token().type == TokenType.OIC:
             self.expect(TokenType.OIC)
     
+    # jump table for a switch whose OMG labels are all single literal tokens and that contains no invalid
+    # case token: (CaseTable of the label values, body start of each case, OMGWTF body start or None).
+    # None for other switches, which run case by case.
+    def compile_switch(self, switch_start, switch_end):
+        if self.blocks.first_invalid_case(switch_start, switch_end) is not None:
+            return None
+        labels, bodies, default = [], [], None
+        position = switch_start + 1
+        while position < switch_end:
+            token = self.token_at(position)
+            if token.type == TokenType.OMG and default is None:
+                label = self.token_at(position + 1)
+                if label is None or label.type not in LITERAL_TOKENS:
+                    return None
+                labels.append(self.literal_value(label))
+                bodies.append(position + 2)
+            elif token.type == TokenType.OMGWTF and default is None:
+                default = position + 1
+            else:
+                return None
+            position = self.blocks.next_branch(position)
+        return CaseTable(labels), bodies, default
+
+    # run the matching case (or OMGWTF) of a compiled switch and continue after its OIC
+    def run_switch_table(self, table, switch_end):
+        case_table, bodies, default = table
+        index = case_table.match(self.IT)
+        body_start = bodies[index] if index is not None else default
+        if body_start is not None:
+            self.position = body_start
+            try:
+                while (self.current_token() and
+                       self.current_token().type not in [TokenType.OMG, TokenType.OMGWTF, TokenType.OIC]):
+                    self.parse_statement()
+            except BreakException:
+                pass
+        self.position = switch_end
+        if self.current_token() and self.current_token().type == TokenType.OIC:
+            self.expect(TokenType.OIC)
+
     # parse loop statement
     def parse_loop(self):
+        loop_start = self.position
         self.advance()  # consume IM IN YR
         loop_name = self.expect(TokenType.IDENTIFIER).value
         
@@ -372,20 +532,29 @@ class Parser:
             # Mark the start of loop body
             loop_body_start = self.position
             
-            # Find the end of the loop
-            depth = 1
-            loop_end = self.position
-            while loop_end < len(self.tokens):
-                if self.tokens[loop_end].type == TokenType.IM_IN_YR:
-                    depth += 1
-                elif self.tokens[loop_end].type == TokenType.IM_OUTTA_YR:
-                    depth -= 1
-                    if depth == 0:
-                        break
-                loop_end += 1
+            # End of the loop from the block index
+            loop_end = self.blocks.end(loop_start)
             
+            # tiered engine: once its label is hot the loop runs compiled, from the next condition check on
+            compiled = None
+            if self.tier_compiler is not None:
+                compiled = self.hot_loop(loop_start, loop_name, 0)
+
+            # counted loop (i == bound ends it, neither changes in the body): run it on a native int counter
+            counted = False
+            if compiled is None and loop_var and condition_type:
+                bound_token = self.counted_loop_bound(loop_start, loop_var, condition_type, condition_start_pos,
+                                                      loop_body_start, loop_end)
+                if bound_token is not None:
+                    bound = self.counted_loop_value(bound_token)
+                    counted = bound is not None and type(self.variables[loop_var]) is int
+            if counted:
+                step = 1 if operation == TokenType.UPPIN else -1
+                compiled = self.run_counted_loop(loop_var, step, bound, loop_body_start, loop_end, loop_start,
+                                                 loop_name)
+
             # Execute loop
-            while True:
+            while not counted and compiled is None:
                 # Check condition if present
                 if condition_type:
                     saved_pos = self.position
@@ -417,6 +586,12 @@ class Parser:
                     else:  # NERFIN
                         self.variables[loop_var] = self.to_number(self.variables[loop_var]) - 1
                     self.update_symbol_callback(loop_var, self.variables[loop_var])
+
+                if self.tier_compiler is not None:
+                    compiled = self.hot_loop(loop_start, loop_name, 1)
+
+            if compiled is not None:
+                compiled(self.variables)
             
             # Move position to after loop
             self.position = loop_end
@@ -430,8 +605,120 @@ class Parser:
             # Restore the previous loop state
             self._in_loop = old_in_loop
     
+    # bound token of a counted loop: the condition is TIL BOTH SAEM <var> AN <bound> or
+    # WILE DIFFRINT <var> AN <bound> with a NUMBR or variable bound, and the body never assigns, casts,
+    # reads into, declares or loops over the loop variable or the bound variable. None for other loops.
+    def counted_loop_bound(self, loop_start, loop_var, condition_type, condition_start, body_start, loop_end):
+        if loop_start in self.counted_loops:
+            return self.counted_loops[loop_start]
+
+        bound_token = None
+        condition = [self.token_at(position) for position in range(condition_start, body_start)]
+        if condition and condition[-1].type == TokenType.MKAY:
+            condition.pop()
+        comparison = {TokenType.TIL: TokenType.BOTH_SAEM, TokenType.WILE: TokenType.DIFFRINT}[condition_type]
+        if (len(condition) == 4 and condition[0].type == comparison
+                and condition[1].type == TokenType.IDENTIFIER and condition[1].value == loop_var
+                and condition[2].type == TokenType.AN
+                and condition[3].type in (TokenType.NUMBR_LITERAL, TokenType.IDENTIFIER)
+                and loop_var != 'IT' and condition[3].value not in ('IT', loop_var)):
+            bound_token = condition[3]
+            names = {loop_var}
+            if bound_token.type == TokenType.IDENTIFIER:
+                names.add(bound_token.value)
+            for position in range(body_start, loop_end):
+                token = self.token_at(position)
+                following = self.token_at(position + 1)
+                if token.type in (TokenType.GIMMEH, TokenType.I_HAS_A, TokenType.YR):
+                    changes = following is not None and following.value in names
+                    if token.type == TokenType.YR:
+                        # UPPIN / NERFIN YR <var> of a nested loop
+                        previous = self.token_at(position - 1)
+                        changes = changes and previous.type in (TokenType.UPPIN, TokenType.NERFIN)
+                else:
+                    changes = (token.type == TokenType.IDENTIFIER and token.value in names and following is not None
+                               and following.type in (TokenType.R, TokenType.IS_NOW_A))
+                if changes:
+                    bound_token = None
+                    break
+
+        self.counted_loops[loop_start] = bound_token
+        return bound_token
+
+    # int value of a counted loop bound, or None when it is not a declared NUMBR (the loop runs as written)
+    def counted_loop_value(self, bound_token):
+        if bound_token.type == TokenType.NUMBR_LITERAL:
+            return int(bound_token.value)
+        value = self.variables.get(bound_token.value)
+        return value if type(value) is int else None
+
+    # run a counted loop body until the counter reaches bound, without re-parsing the condition;
+    # the counter is stored in variables every iteration (the body may read it) but only sent to
+    # the symbol table when the loop ends
+    # returns the compiled loop to finish the loop with when the tiered engine finds it hot, else None
+    def run_counted_loop(self, loop_var, step, bound, loop_body_start, loop_end, loop_start, loop_name):
+        variables = self.variables
+        start = counter = variables[loop_var]
+        try:
+            while counter != bound:
+                self.position = loop_body_start
+                try:
+                    while self.position < loop_end:
+                        if self.current_token().type == TokenType.IM_OUTTA_YR:
+                            break
+                        self.parse_statement()
+                except BreakException:
+                    break
+                counter += step
+                variables[loop_var] = counter
+                if self.tier_compiler is not None:
+                    compiled = self.hot_loop(loop_start, loop_name, 1)
+                    if compiled is not None:
+                        # the compiled loop sends the counter to the symbol table from here on
+                        self.update_symbol_callback(loop_var, counter)
+                        start = counter
+                        return compiled
+        finally:
+            if counter != start:
+                self.update_symbol_callback(loop_var, counter)
+        return None
+
+    # compiled form of the loop at loop_start once its label has run hot_threshold iterations, else None
+    # (iterations is the number the interpreter has just run; None also when the loop cannot be compiled)
+    def hot_loop(self, loop_start, loop_name, iterations):
+        count = self.loop_counts[loop_name] = self.loop_counts.get(loop_name, 0) + iterations
+        if count < self.hot_threshold:
+            return None
+        if loop_start not in self.compiled_loops:
+            compiled = self.tier_compiler.compile_loop(loop_start, getattr(self, "_in_function", False))
+            self.compiled_loops[loop_start] = compiled
+            self.note_tier(loop_start, compiled, f"loop {loop_name}", f"{count} iterations")
+        return self.compiled_loops[loop_start]
+
+    # compiled body of the function once its name has been called hot_threshold times, else None
+    def hot_function(self, func_name, func_info):
+        count = self.call_counts[func_name] = self.call_counts.get(func_name, 0) + 1
+        if count < self.hot_threshold:
+            return None
+        func_start = func_info['start']
+        if func_start not in self.compiled_functions:
+            compiled = self.tier_compiler.compile_function(func_start)
+            self.compiled_functions[func_start] = compiled
+            self.note_tier(func_start, compiled, f"function {func_name}", f"{count} calls")
+        return self.compiled_functions[func_start]
+
+    # add a tier_report entry for the loop or function at position
+    def note_tier(self, position, compiled, name, count):
+        token = self.token_at(position)
+        if compiled is None:
+            description = f"{name} stays in tier 0 (too deeply nested to compile)"
+        else:
+            description = f"compiled {name} after {count}"
+        self.tier_report.append((token.line if token else None, description))
+
     # parse function definition
     def parse_function_definition(self):
+        func_start = self.position
         self.advance()  # consume HOW IZ I
         func_name = self.expect(TokenType.IDENTIFIER).value
         
@@ -447,20 +734,16 @@ class Parser:
         # Mark start of function body
         func_body_start = self.position
         
-        # Find end of function
-        depth = 1
-        func_end = self.position
-        while func_end < len(self.tokens):
-            if self.tokens[func_end].type == TokenType.HOW_IZ_I:
-                depth += 1
-            elif self.tokens[func_end].type == TokenType.IF_U_SAY_SO:
-                depth -= 1
-                if depth == 0:
-                    break
-            func_end += 1
+        # End of function from the block index
+        func_end = self.blocks.end(func_start)
+        
+        # keep the definition (and its closing IF U SAY SO) available once the stream moves past it
+        if isinstance(self.tokens, TokenWindow):
+            self.tokens.pin(func_start, func_end + 1)
         
         # Store function
         self.functions[func_name] = {
+            'start': func_start,
             'params': params,
             'body_start': func_body_start,
             'body_end': func_end
@@ -492,50 +775,54 @@ class Parser:
         if self.current_token() and self.current_token().type == TokenType.MKAY:
             self.advance()
 
+        return self.call_function(func_name, args)
+
+    # run a declared function with the argument values (also called by compiled code of the tiered engine)
+    def call_function(self, func_name, args):
+        func_info = self.functions[func_name]
         if len(args) != len(func_info['params']):
             raise ValueError(f"Function '{func_name}' expects {len(func_info['params'])} arguments, got {len(args)}")
 
-        # Save global state
-        saved_position = self.position
-        saved_variables = self.variables.copy()
-        saved_IT = self.IT
-        
+        # tiered engine: once its name is hot the function body runs compiled
+        compiled = None
+        if self.tier_compiler is not None:
+            compiled = self.hot_function(func_name, func_info)
+
+        # push a frame for the caller's position and variables; the callee's scope is a new dict
+        # holding ONLY the parameters (bound directly) and its own IT, no globals
+        local_scope = Scope(zip(func_info['params'], args))
+        local_scope['IT'] = None
+        self.call_stack.append(CallFrame(self.position, self.variables))
+        self.variables = local_scope
+
         # Save and set function context flag
         old_in_function = getattr(self, "_in_function", False)
         self._in_function = True
 
-        # Prepare local function scope - ONLY parameters, no globals
-        local_scope = {param: arg for param, arg in zip(func_info['params'], args)}
-        local_scope['IT'] = None 
-
         # Execute function with isolated scope
         self.position = func_info['body_start']
+        body_end = func_info['body_end']
         return_value = None
 
         try:
-            while self.position < func_info['body_end']:
-                token = self.current_token()
-                if not token:
-                    break
-                
-                # Use ONLY local scope during function execution
-                self.variables = local_scope.copy() 
-                self.parse_statement()
-                
-                # Update local_scope with any changes from the statement
-                local_scope = self.variables.copy()
-                
+            if compiled is not None:
+                return_value = compiled(local_scope)
+            else:
+                while self.position < body_end:
+                    if not self.current_token():
+                        break
+                    self.parse_statement()
         except ReturnException as e:
             return_value = e.value
         finally:
-            # Restore function context flag
+            # Restore function context flag and the caller's state
             self._in_function = old_in_function
+            frame = self.call_stack.pop()
+            self.position = frame.return_position
+            self.variables = frame.variables
 
-        # Restore original state
-        self.position = saved_position
-        self.variables = saved_variables
         self.IT = return_value
-        
+
         # Update IT in dictionary
         self.variables['IT'] = self.IT 
         self.update_symbol_callback('IT', self.IT)
@@ -543,36 +830,78 @@ class Parser:
         return return_value
 
     
-    # skip expression for constructs like loop conditions
+    # skip an expression without evaluating it: consumes exactly the tokens parse_expression would
+    # (loop conditions, and the operands a short-circuiting boolean operator does not need)
+    # nothing runs, so skipped operands raise no semantic errors; syntax errors are raised as parse_expression does
     def skip_expression(self):
         token = self.current_token()
         if not token:
-            return
-        
-        # skip literals and identifiers
-        if token.type in [TokenType.NUMBR_LITERAL, TokenType.NUMBAR_LITERAL, 
-                         TokenType.YARN_LITERAL, TokenType.TROOF_LITERAL,
-                         TokenType.NOOB, TokenType.IDENTIFIER]:
+            raise SyntaxError("Unexpected end of input")
+
+        if token.type in LITERAL_TOKENS or token.type == TokenType.IDENTIFIER:
             self.advance()
         elif token.type in [TokenType.SUM_OF, TokenType.DIFF_OF, TokenType.PRODUKT_OF,
-                           TokenType.QUOSHUNT_OF, TokenType.MOD_OF, TokenType.BIGGR_OF,
-                           TokenType.SMALLR_OF, TokenType.BOTH_OF, TokenType.EITHER_OF,
-                           TokenType.WON_OF, TokenType.BOTH_SAEM, TokenType.DIFFRINT, TokenType.ALL_OF]:
+                            TokenType.QUOSHUNT_OF, TokenType.MOD_OF, TokenType.BIGGR_OF,
+                            TokenType.SMALLR_OF, TokenType.BOTH_SAEM, TokenType.DIFFRINT]:
             self.advance()
             self.skip_expression()
-            # consume chained AN expressions
-            while self.current_token() and self.current_token().type == TokenType.AN:
-                self.advance()
-                self.skip_expression()
-            # optional MKAY
-            if self.current_token() and self.current_token().type == TokenType.MKAY:
-                self.advance()
+            self.expect(TokenType.AN)
+            self.skip_expression()
+            self.skip_mkay()
+        elif token.type in BOOLEAN_OPS:
+            self.advance()
+            self.skip_expression()
+            self.skip_operands()
         elif token.type == TokenType.NOT:
             self.advance()
             self.skip_expression()
+        elif token.type == TokenType.SMOOSH:
+            self.advance()
+            while self.current_token() and self.current_token().type not in [TokenType.MKAY,
+                                                                             TokenType.I_HAS_A,
+                                                                             TokenType.VISIBLE]:
+                self.skip_expression()
+                if self.current_token() and self.current_token().type == TokenType.AN:
+                    self.advance()
+                else:
+                    break
+            self.skip_mkay()
+        elif token.type == TokenType.BUKKIT:
+            self.advance()
+        elif token.type in BUKKIT_OPS:
+            self.advance()
+            self.skip_expression()
+            for _ in range(BUKKIT_OPS[token.type] - 1):
+                self.expect(TokenType.AN)
+                self.skip_expression()
+            self.skip_mkay()
+        elif token.type == TokenType.MAEK:
+            self.advance()
+            self.skip_expression()
+            if self.current_token() and self.current_token().type == TokenType.BUKKIT:
+                self.advance()
+            else:
+                self.expect(TokenType.A)
+                self.advance()
+        elif token.type == TokenType.I_IZ:
+            self.advance()
+            self.expect(TokenType.IDENTIFIER)
+            while self.current_token() and self.current_token().type == TokenType.YR:
+                self.advance()
+                self.skip_expression()
+                if self.current_token() and self.current_token().type == TokenType.AN:
+                    self.advance()
+            self.skip_mkay()
         else:
+            raise SyntaxError(f"Syntax Error at line {token.line}: Unexpected token {token.type.value}")
+
+    # skip the AN-separated operands left in an operator that takes any number of them, and its MKAY
+    def skip_operands(self):
+        while self.current_token() and self.current_token().type == TokenType.AN:
             self.advance()
-    
+            self.skip_expression()
+        self.skip_mkay()
+
     # parse type cast statement
     def parse_type_cast(self):
         # expect identifier
@@ -582,6 +911,8 @@ class Parser:
         self.advance()
         
         # check if variable is declared
+        if var_name not in self.variables:
+            raise KeyError(var_name)
         value = self.variables[var_name]
         casted_value = self.cast_value(value, type_name)
         
@@ -598,26 +929,9 @@ class Parser:
             raise SyntaxError("Unexpected end of input")
         
         # Literals
-        if token.type == TokenType.NUMBR_LITERAL:
-            self.advance()
-            return int(token.value)
-        
-        if token.type == TokenType.NUMBAR_LITERAL:
-            self.advance()
-            return float(token.value)
-        
-        if token.type == TokenType.YARN_LITERAL:
-            self.advance()
-            return token.value[1:-1]  # Remove quotes
-        
-        # Boolean literals
-        if token.type == TokenType.TROOF_LITERAL:
+        if token.type in LITERAL_TOKENS:
             self.advance()
-            return token.value == "WIN"
-        
-        if token.type == TokenType.NOOB:
-            self.advance()
-            return None
+            return self.literal_value(token)
         
         # Variable reference
         if token.type == TokenType.IDENTIFIER:
@@ -634,19 +948,7 @@ class Parser:
             return self.parse_numeric_op(token.type)
         
         # Boolean operations
-        if token.type == TokenType.ALL_OF:
-            return self.parse_all_of()
-        
-        if token.type == TokenType.ANY_OF:
-            return self.parse_boolean_op(token.type)
-
-        if token.type == TokenType.BOTH_OF:
-            return self.parse_boolean_op(token.type)
-        
-        if token.type == TokenType.EITHER_OF:
-            return self.parse_boolean_op(token.type)
-        
-        if token.type == TokenType.WON_OF:
+        if token.type in BOOLEAN_OPS:
             return self.parse_boolean_op(token.type)
         
         if token.type == TokenType.NOT:
@@ -664,13 +966,12 @@ class Parser:
         # String concatenation
         if token.type == TokenType.SMOOSH:
             self.advance()
-            result = ''
+            values = []
             
             while self.current_token() and self.current_token().type not in [TokenType.MKAY, 
                                                                              TokenType.I_HAS_A,
                                                                              TokenType.VISIBLE]:
-                value = self.parse_expression()
-                result += self.stringify(value)
+                values.append(self.parse_expression())
                 
                 if self.current_token() and self.current_token().type == TokenType.AN:
                     self.advance()
@@ -680,15 +981,20 @@ class Parser:
             if self.current_token() and self.current_token().type == TokenType.MKAY:
                 self.advance()
             
-            return result
+            return smoosh(values)
+        
+        # BUKKITs
+        if token.type == TokenType.BUKKIT:
+            self.advance()
+            return bukkit_op(TokenType.BUKKIT, [])
+
+        if token.type in BUKKIT_OPS:
+            return self.parse_bukkit_op(token.type)
         
         if token.type == TokenType.MAEK:
             self.advance()
             value = self.parse_expression()
-            self.expect(TokenType.A)
-            type_name = self.current_token().value
-            self.advance()
-            return self.cast_value(value, type_name)
+            return self.cast_value(value, self.parse_cast_type())
         
         # Function call as expression
         if token.type == TokenType.I_IZ:
@@ -696,6 +1002,19 @@ class Parser:
         
         raise SyntaxError(f"Syntax Error at line {token.line}: Unexpected token {token.type.value}")
     
+    # value of a literal token (one of LITERAL_TOKENS)
+    def literal_value(self, token):
+        if token.type == TokenType.NUMBR_LITERAL:
+            return int(token.value)
+        if token.type == TokenType.NUMBAR_LITERAL:
+            return float(token.value)
+        if token.type == TokenType.YARN_LITERAL:
+            return token.value[1:-1]  # Remove quotes
+        # Boolean literals
+        if token.type == TokenType.TROOF_LITERAL:
+            return token.value == "WIN"
+        return None
+
     # parse comparison operation with type coercion
     def parse_comparison_op(self, op_type):
         self.advance()
@@ -745,201 +1064,58 @@ class Parser:
         if self.current_token() and self.current_token().type == TokenType.MKAY:
             self.advance()
         
-        # Convert to numbers (will raise error if cannot be cast)
-        val1 = self.to_number(left)
-        val2 = self.to_number(right)
-        
-        # if both values are int result is NUMBR
-        # if at least one is a float result is NUMBAR
-        both_are_numbr = (isinstance(val1, int) and isinstance(val2, int) and 
-                        not isinstance(val1, bool) and not isinstance(val2, bool))
-        
-        if op_type == TokenType.SUM_OF:
-            result = val1 + val2
-            return int(result) if both_are_numbr else float(result)
-        
-        elif op_type == TokenType.DIFF_OF:
-            result = val1 - val2
-            return int(result) if both_are_numbr else float(result)
-        
-        elif op_type == TokenType.PRODUKT_OF:
-            result = val1 * val2
-            return int(result) if both_are_numbr else float(result)
-        
-        elif op_type == TokenType.QUOSHUNT_OF:
-            if val2 == 0:
-                return 0
-            result = val1 / val2
-            # if both are NUMBR, truncate to int else keep as float
-            return int(result) if both_are_numbr else result
-        
-        elif op_type == TokenType.MOD_OF:
-            if val2 == 0:
-                return 0
-            result = val1 % val2
-            return int(result) if both_are_numbr else result
-        
-        elif op_type == TokenType.BIGGR_OF:
-            result = max(val1, val2)
-            return int(result) if both_are_numbr else result
-        
-        elif op_type == TokenType.SMALLR_OF:
-            result = min(val1, val2)
-            return int(result) if both_are_numbr else result
-            
-        return 0
+        return numeric_op(op_type, left, right)
     
-    # parse boolean ops (ANY_OF, BOTH_OF, EITHER_OF, WON_OF)
-    def parse_boolean_op(self, op_type):
+    # parse BUKKIT operations (PIK OF, SIZ OF, PUT IN, SHUV IN): a fixed number of operands separated by AN
+    def parse_bukkit_op(self, op_type):
         self.advance()
-        first = self.parse_expression()
-        args = [first]
-        while self.current_token() and self.current_token().type == TokenType.AN:
-            self.advance()
+        args = [self.parse_expression()]
+        for _ in range(BUKKIT_OPS[op_type] - 1):
+            self.expect(TokenType.AN)
             args.append(self.parse_expression())
-        # optional MKAY
-        if self.current_token() and self.current_token().type == TokenType.MKAY:
-            self.advance()
-        # evaluate
-        if op_type == TokenType.BOTH_OF:
-            # logical AND across all
-            for a in args:
-                if not self.is_truthy(a):
-                    return False
-            return True
-        if op_type == TokenType.ANY_OF or op_type == TokenType.EITHER_OF:
-            for a in args:
-                if self.is_truthy(a):
-                    return True
-            return False
-        if op_type == TokenType.WON_OF:
-            # XOR across arguments: True if an odd number of truthy args
-            count = 0
-            for a in args:
-                if self.is_truthy(a):
-                    count += 1
-            return (count % 2) == 1
-        return False
+        self.skip_mkay()
+        return bukkit_op(op_type, args)
     
-    # parse ALL OF
-    def parse_all_of(self):
+    # parse boolean ops (ALL_OF, ANY_OF, BOTH_OF, EITHER_OF, WON_OF)
+    # ALL OF / BOTH OF stop at the first false operand and ANY OF / EITHER OF at the first true one;
+    # the operands after it are skipped without being evaluated (see runtime.SHORT_CIRCUIT_OPS)
+    def parse_boolean_op(self, op_type):
         self.advance()
-        result = True
+        stop = SHORT_CIRCUIT_OPS.get(op_type)
+        if stop is None:
+            args = [self.parse_expression()]
+            while self.current_token() and self.current_token().type == TokenType.AN:
+                self.advance()
+                args.append(self.parse_expression())
+            self.skip_mkay()
+            return boolean_op(op_type, args)
+
         while True:
-            value = self.parse_expression()
-            if not self.is_truthy(value):
-                result = False
-            # Continue if AN separator is detected
+            if self.is_truthy(self.parse_expression()) is stop:
+                self.skip_operands()
+                return stop
             if self.current_token() and self.current_token().type == TokenType.AN:
                 self.advance()
                 continue
-            break
-        # optional MKAY
-        if self.current_token() and self.current_token().type == TokenType.MKAY:
-            self.advance()
-        return result
+            self.skip_mkay()
+            return not stop
     
     # utility function to convert value to number
     def to_number(self, value):
-        # return error on implicit typecast of NOOB to number
-        if value is None:
-            raise ValueError("Type Error: Cannot implicitly typecast NOOB to numeric type.")
-        
-        if isinstance(value, (int, float)):
-            return value
-        if isinstance(value, str):
-            # vlidate YARN for numeric casting
-            if not value:  # empty string
-                return 0
-            # check if string contains only valid numeric characters
-            test_str = value.lstrip('-')  # remove leading negative sign
-            if not test_str:  # just a minus sign
-                raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
-            
-            # check for valid numeric string (digits and at most one period)
-            has_period = False
-            for char in test_str:
-                if char == '.':
-                    if has_period:  # more than one period
-                        raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
-                    has_period = True
-                elif not char.isdigit():
-                    raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
-            
-            try:
-                if '.' in value:
-                    return float(value)
-                return int(value)
-            except ValueError:
-                raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
-        
-        if isinstance(value, bool):
-            return 1 if value else 0
-        
-        raise ValueError(f"Type Error: Cannot convert {type(value).__name__} to numeric type.")
+        return to_number(value)
     
     # utility function to determine truthiness of a value
     def is_truthy(self, value):
-        if value is None: # NOOB is false
-            return False
-        # if value is boolean, number, or string
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, (int, float)):
-            return value != 0
-        if isinstance(value, str):
-            return value != ''
-        return True
+        return is_truthy(value)
     
     # utility function to convert value to string
     def stringify(self, value):
-        if value is None: # NOOB
-            return ''
-        # check for boolean if so convert to WIN/FAIL
-        if isinstance(value, bool):
-            return 'WIN' if value else 'FAIL'
-        if isinstance(value, float):
-            return f"{value:.2f}"
-        return str(value) # convert other types to string
+        return stringify(value)
     
     # utility function to cast value to specified type
     def cast_value(self, value, type_name):
-        type_upper = type_name.upper()
-        
-        # explicit casting of NOOB = empty/zero values
-        if value is None:
-            if type_upper == 'NUMBR':
-                return 0
-            elif type_upper == 'NUMBAR':
-                return 0.0
-            elif type_upper == 'YARN':
-                return ''
-            elif type_upper == 'TROOF':
-                return False
-        
-        if type_upper == 'NUMBR':
-            return int(self.to_number(value))
-        elif type_upper == 'NUMBAR':
-            return self.to_number(value)
-        elif type_upper == 'YARN':
-            return self.stringify(value)
-        elif type_upper == 'TROOF':
-            return self.is_truthy(value)
-        
-        return value
+        return cast_value(value, type_name)
     
+    # compare two values for equality with type coercion
     def values_equal(self, val1, val2):
-        # compare two values for equality with type coercion
-        # If both are the same type, direct comparison
-        if type(val1) == type(val2):
-            return val1 == val2
-        
-        # try numeric comparison if one is string and one is number
-        try:
-            # convert both to numbers and compare
-            num1 = self.to_number(val1)
-            num2 = self.to_number(val2)
-            return num1 == num2
-        except:
-            # if fails, they're not equal
-            return False
\ No newline at end of file
+        return values_equal(val1, val2)
@@ -0,0 +1,167 @@
+import os  # Import os for cache files and environment settings
+import sys  # Import sys for the Python version in the cache key
+import pickle  # Import pickle for serializing the AST
+import hashlib  # Import hashlib for source hashes
+import tempfile  # Import tempfile for atomic writes
+from token_types import Token, TOKEN_TYPES, TYPE_CODES  # Import Token class and compact type codes
+from lexer import Lexer  # Import Lexer class
+from ast_builder import ASTBuilder  # Import AST front end
+
+# On-disk cache of lexed + parsed programs (like __pycache__ for .lol files)
+# each entry is <sha256 of source and interpreter version>.lolc holding a small header and a
+# pickle of the token list (compact tuples) and the Program AST.
+# Entries are written atomically (temp file + rename); when the directory grows past max_size
+# the least recently used entries (oldest mtime, refreshed on every hit) are removed.
+#
+# settings: LOLCODE_CACHE_DIR overrides the directory (default ~/.cache/lolcode),
+#           LOLCODE_NO_CACHE=1 disables the cache
+
+# bump when the lexer, token types or AST nodes change so old entries are ignored
+INTERPRETER_VERSION = '5'
+
+# file layout version
+CACHE_MAGIC = b'LOLC'
+FORMAT_VERSION = 1
+HEADER = CACHE_MAGIC + bytes([FORMAT_VERSION])
+
+CACHE_SUFFIX = '.lolc'
+DEFAULT_MAX_SIZE = 64 * 2**20
+
+def default_cache_dir():
+    directory = os.environ.get('LOLCODE_CACHE_DIR')
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'lolcode')
+
+def cache_disabled():
+    return os.environ.get('LOLCODE_NO_CACHE', '') not in ('', '0')
+
+# ProgramCache class for loading and storing compiled programs
+class ProgramCache:
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE, enabled=None):
+        self.directory = directory or default_cache_dir()
+        self.max_size = max_size
+        self.enabled = not cache_disabled() if enabled is None else enabled
+        self.hits = 0
+        self.misses = 0
+
+    # lex and parse source, reusing a cached result when there is one; returns (tokens, program)
+    # lexical errors are raised as usual and nothing is cached for that source
+    def compile(self, source):
+        cached = self.load(source)
+        if cached is not None:
+            return cached
+
+        tokens = Lexer(source).tokenize()
+        program = ASTBuilder(tokens).build()
+        self.store(source, tokens, program)
+        return tokens, program
+
+    # cache key: hash of interpreter version, Python version and source
+    def key(self, source):
+        digest = hashlib.sha256()
+        digest.update(f"{INTERPRETER_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}:".encode())
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def path(self, source):
+        return os.path.join(self.directory, self.key(source) + CACHE_SUFFIX)
+
+    # return (tokens, program) from the cache or None (missing, stale or unreadable entries are misses)
+    def load(self, source):
+        if not self.enabled:
+            return None
+        path = self.path(source)
+        try:
+            with open(path, 'rb') as cache_file:
+                data = cache_file.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        try:
+            if not data.startswith(HEADER):
+                raise ValueError("stale cache entry")
+            token_rows, program = pickle.loads(data[len(HEADER):])
+            tokens = [Token(TOKEN_TYPES[code], value, line, column) for code, value, line, column in token_rows]
+        except Exception:
+            # corrupt or from another format version: drop it
+            self.remove(path)
+            self.misses += 1
+            return None
+
+        # mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return tokens, program
+
+    # write an entry atomically; failures (read-only directory, unpicklable values) are ignored
+    def store(self, source, tokens, program):
+        if not self.enabled:
+            return
+        token_rows = [(TYPE_CODES[token.type], token.value, token.line, token.column) for token in tokens]
+        try:
+            data = HEADER + pickle.dumps((token_rows, program), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+
+        temp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as cache_file:
+                cache_file.write(data)
+            os.replace(temp_path, self.path(source))
+            temp_path = None
+        except OSError:
+            return
+        finally:
+            if temp_path is not None:
+                self.remove(temp_path)
+        self.evict()
+
+    # remove least recently used entries until the cache fits in max_size
+    def evict(self):
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+            total += stat.st_size
+
+        entries.sort()
+        for _, path, size in entries:
+            if total <= self.max_size:
+                break
+            self.remove(path)
+            total -= size
+
+    # delete every cache entry
+    def clear(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(CACHE_SUFFIX):
+                self.remove(os.path.join(self.directory, name))
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
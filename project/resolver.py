@@ -0,0 +1,199 @@
+from ast_nodes import (Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, BukkitOp,
+                       FunctionCall, Invariant, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Switch, Loop, FunctionDef, Return, Raise)  # Import AST node classes
+
+# slot of the IT variable in every scope
+IT_SLOT = 0
+
+# value of a slot whose variable has not been declared yet
+UNSET = object()
+
+# Scope class: the variables of the program body or of one function, each with a fixed slot index
+class Scope:
+    def __init__(self):
+        self.names = ['IT']      # slot -> identifier (for the symbol table), None for hidden slots
+        self.slots = {'IT': IT_SLOT}
+
+    def add(self, name):
+        if name not in self.slots:
+            self.slots[name] = len(self.names)
+            self.names.append(name)
+        return self.slots[name]
+
+    # a slot that is not a variable (the value of a hoisted loop invariant, UNSET until it is computed)
+    def add_hidden(self):
+        self.names.append(None)
+        return len(self.names) - 1
+
+    # fresh storage for this scope (declared slots are filled in when the declaration runs)
+    def new_frame(self):
+        frame = [UNSET] * len(self.names)
+        frame[IT_SLOT] = None
+        return frame
+
+    # name -> value for the declared slots of frame, in declaration order
+    def variables(self, frame):
+        return {name: value for name, value in zip(self.names, frame) if value is not UNSET and name is not None}
+
+# Resolver class: resolution pass that gives every variable a slot before execution
+# the program body's scope is IT plus the WAZZUP declarations; a function's scope is IT plus its
+# parameters (functions do not see the caller's variables). Declarations only appear in WAZZUP, which
+# runs before everything else, so whether a name is declared at a given reference is known statically.
+# References to names that are not declared there are recorded in undeclared and get the error the
+# interpreter raises, so engines raise it when (and only if) execution reaches the reference
+# instead of checking the name on every access.
+class Resolver:
+    def __init__(self):
+        self.global_scope = Scope()
+        self.function_scopes = {}  # id(FunctionDef) -> Scope
+        self.slots = {}            # id(node) -> slot of the variable the node reads or writes
+        self.errors = {}           # id(node) -> error raised when the node runs
+        self.undeclared = []       # (line, message) for every unresolved reference
+        self.scope = None
+        self.declared = None
+
+        # node class -> resolve method (statements and expressions)
+        self.resolvers = {
+            Variable: self.resolve_variable,
+            NumericOp: self.resolve_binary,
+            Comparison: self.resolve_binary,
+            BooleanOp: self.resolve_operands,
+            Smoosh: self.resolve_operands,
+            Not: self.resolve_operand,
+            Cast: self.resolve_operand,
+            BukkitOp: self.resolve_operands,
+            FunctionCall: self.resolve_function_call,
+            Invariant: self.resolve_invariant,
+            Declaration: self.resolve_declaration,
+            Assignment: self.resolve_assignment,
+            Visible: self.resolve_visible,
+            Gimmeh: self.resolve_gimmeh,
+            TypeCast: self.resolve_type_cast,
+            ExpressionStatement: self.resolve_expression_statement,
+            If: self.resolve_if,
+            Switch: self.resolve_switch,
+            Loop: self.resolve_loop,
+            FunctionDef: self.resolve_function_definition,
+            Return: self.resolve_return,
+            Raise: self.resolve_operands,
+        }
+
+    # resolve a whole program, returns self
+    def resolve(self, program):
+        self.scope = self.global_scope
+        self.declared = {'IT'}
+        self.resolve_block(program.statements)
+        return self
+
+    def resolve_block(self, statements):
+        for statement in statements:
+            self.resolve_node(statement)
+
+    # literals and GTFO have nothing to resolve
+    def resolve_node(self, node):
+        resolver = self.resolvers.get(type(node))
+        if resolver is not None:
+            resolver(node)
+
+    # give node the slot of name, or record error when name is not declared at this point
+    def reference(self, node, name, error):
+        if name in self.declared:
+            self.slots[id(node)] = self.scope.slots[name]
+        else:
+            self.errors[id(node)] = error
+            self.undeclared.append((node.line, str(error)))
+
+    def undeclared_error(self, name):
+        return NameError(f"Semantic Error: Variable '{name}' not declared")
+
+    # ---- expressions ----
+
+    def resolve_variable(self, node):
+        self.reference(node, node.name, self.undeclared_error(node.name))
+
+    def resolve_binary(self, node):
+        self.resolve_node(node.left)
+        self.resolve_node(node.right)
+
+    def resolve_operands(self, node):
+        for operand in node.operands:
+            self.resolve_node(operand)
+
+    def resolve_operand(self, node):
+        self.resolve_node(node.operand)
+
+    def resolve_function_call(self, node):
+        for arg in node.args:
+            self.resolve_node(arg)
+
+    # a hoisted loop invariant keeps its value in a hidden slot of the scope it runs in
+    def resolve_invariant(self, node):
+        self.resolve_node(node.expression)
+        self.slots[id(node)] = self.scope.add_hidden()
+
+    # ---- statements ----
+
+    # the value is evaluated before the name is declared
+    def resolve_declaration(self, node):
+        if node.value is not None:
+            self.resolve_node(node.value)
+        self.slots[id(node)] = self.scope.add(node.name)
+        self.declared.add(node.name)
+
+    def resolve_assignment(self, node):
+        self.reference(node, node.name, self.undeclared_error(node.name))
+        self.resolve_node(node.value)
+
+    def resolve_visible(self, node):
+        for part in node.parts:
+            self.resolve_node(part)
+
+    def resolve_gimmeh(self, node):
+        self.reference(node, node.name, self.undeclared_error(node.name))
+
+    # IS NOW A on an undeclared name fails on the variable lookup itself
+    def resolve_type_cast(self, node):
+        self.reference(node, node.name, KeyError(node.name))
+
+    def resolve_expression_statement(self, node):
+        self.resolve_node(node.expression)
+
+    def resolve_if(self, node):
+        self.resolve_block(node.then_body)
+        for condition, body in node.mebbe_clauses:
+            self.resolve_node(condition)
+            self.resolve_block(body)
+        if node.else_body is not None:
+            self.resolve_block(node.else_body)
+
+    def resolve_switch(self, node):
+        for case in node.cases:
+            self.resolve_node(case.label)
+            self.resolve_block(case.body)
+        if node.default is not None:
+            self.resolve_block(node.default.body)
+
+    def resolve_loop(self, node):
+        if node.variable is not None:
+            self.reference(node, node.variable,
+                           NameError(f"Semantic Error: Loop variable '{node.variable}' not declared"))
+        if node.condition is not None:
+            self.resolve_node(node.condition)
+        self.resolve_block(node.body)
+
+    # function bodies get their own scope: IT and the parameters
+    def resolve_function_definition(self, node):
+        saved_scope, saved_declared = self.scope, self.declared
+        self.scope = Scope()
+        for param in node.params:
+            self.scope.add(param)
+        self.declared = {'IT', *node.params}
+        self.function_scopes[id(node)] = self.scope
+        try:
+            self.resolve_block(node.body)
+        finally:
+            self.scope, self.declared = saved_scope, saved_declared
+
+    def resolve_return(self, node):
+        if node.value is not None:
+            self.resolve_node(node.value)
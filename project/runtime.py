@@ -0,0 +1,480 @@
+from array import array  # Import array for compact BUKKIT storage
+from reprlib import recursive_repr  # Import recursive_repr for BUKKITs that contain themselves
+from token_types import TokenType  # Import TokenType Enum
+
+# Runtime value helpers shared by every execution engine
+# LOLCODE values are plain Python values: None (NOOB), bool (TROOF), int (NUMBR), float (NUMBAR), str (YARN)
+# a long YARN built by SMOOSH can also be a Rope (see smoosh), which the helpers below accept wherever a str goes
+# BUKKITs are Bukkit objects, shared by reference like the values of a Python list
+
+# every helper first dispatches on the exact Python type of the value (the value's LOLCODE type:
+# bool is checked before int, so TROOF never takes a NUMBR path) and only falls back to the general
+# coercion rules for other combinations
+
+# variable scope of the program body or of a function call (token interpreter and generated Python code):
+# reading an undeclared variable raises the usual semantic error
+class Scope(dict):
+    __slots__ = ()
+
+    def __missing__(self, name):
+        raise NameError(f"Semantic Error: Variable '{name}' not declared")
+
+# YARNs up to this length keep their numeric form in yarn_numbers after the first coercion
+NUMBER_CACHE_LENGTH = 64
+NUMBER_CACHE_SIZE = 4096
+
+# YARN -> NUMBR / NUMBAR value of the YARNs coerced so far (short YARNs only, cleared when full)
+yarn_numbers = {}
+
+# SMOOSH extends a first operand at least this long as a Rope instead of copying it
+ROPE_MIN_LENGTH = 1024
+
+# YARN value made of the first count chunks of a chunk list; the ropes appended to one another share the list,
+# so appending to the newest rope adds a chunk instead of copying the text (older ropes keep their count and
+# copy the list when they are appended to again). The text is joined once, when the value is used as a string.
+class Rope:
+    __slots__ = ('chunks', 'count', 'length', 'text')
+
+    def __init__(self, chunks, count, length):
+        self.chunks = chunks
+        self.count = count
+        self.length = length
+        self.text = None
+
+    # rope for this YARN followed by piece
+    def append(self, piece):
+        chunks = self.chunks
+        if len(chunks) != self.count:
+            # a rope appended to this one already extended the shared list
+            chunks = chunks[:self.count]
+        chunks.append(piece)
+        return Rope(chunks, self.count + 1, self.length + len(piece))
+
+    def __str__(self):
+        if self.text is None:
+            chunks = self.chunks
+            self.text = ''.join(chunks if len(chunks) == self.count else chunks[:self.count])
+            # later appends to this rope start from the joined text; the old list stays with the ropes sharing it
+            self.chunks = [self.text]
+            self.count = 1
+        return self.text
+
+    def __len__(self):
+        return self.length
+
+    # equal to the ropes and strs with the same text, like a str
+    def __eq__(self, other):
+        if type(other) is Rope or type(other) is str:
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return repr(str(self))
+
+# the str for a Rope, any other value unchanged
+def plain(value):
+    return str(value) if type(value) is Rope else value
+
+# range of the NUMBRs an array('q') holds
+MIN_STORED_NUMBR = -2**63
+MAX_STORED_NUMBR = 2**63 - 1
+
+# BUKKIT: indexed collection of values
+# elements are kept in an array('q') while they are all NUMBRs, in an array('d') while they are all NUMBARs
+# (8 bytes per element instead of a pointer to a boxed value), and in a list once a value of another type
+# (or a NUMBR too large for 64 bits) is stored; a BUKKIT never goes back to an array
+class Bukkit:
+    __slots__ = ('items',)
+
+    def __init__(self):
+        self.items = array('q')
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, index):
+        return self.items[self.position(index)]
+
+    def set(self, index, value):
+        position = self.position(index)
+        self.store_for(value)[position] = value
+
+    def append(self, value):
+        self.store_for(value).append(value)
+
+    # element index as a position in items, or an error for non-NUMBR and out of range indexes
+    def position(self, index):
+        number = to_number(index)
+        if type(number) is not int:
+            raise ValueError(f"Type Error: BUKKIT index must be a NUMBR, got {TYPE_NAMES.get(type(index))} "
+                             f"{stringify(index)}")
+        if not 0 <= number < len(self.items):
+            raise IndexError(f"Runtime Error: BUKKIT index {number} out of range for a BUKKIT of {len(self.items)}")
+        return number
+
+    # the storage after making room for value: the current array when value fits it, else a list
+    def store_for(self, value):
+        items = self.items
+        if type(items) is list:
+            return items
+        value_type = type(value)
+        if items.typecode == 'q':
+            if value_type is int and MIN_STORED_NUMBR <= value <= MAX_STORED_NUMBR:
+                return items
+            if value_type is float and not items:
+                self.items = array('d')
+                return self.items
+        elif value_type is float:
+            return items
+        self.items = list(items)
+        return self.items
+
+    # elements stringified like VISIBLE would, e.g. [1, 2.50, hai]
+    @recursive_repr('[...]')
+    def __str__(self):
+        return '[' + ', '.join([stringify(item) for item in self.items]) + ']'
+
+    def __repr__(self):
+        return f"BUKKIT{self}"
+
+# LOLCODE type name of each value type
+TYPE_NAMES = {type(None): 'NOOB', bool: 'TROOF', int: 'NUMBR', float: 'NUMBAR', str: 'YARN', Rope: 'YARN',
+              Bukkit: 'BUKKIT'}
+
+# utility function to convert value to number
+def to_number(value):
+    value_type = type(value)
+    if value_type is int or value_type is float or value_type is bool:
+        return value
+    if value_type is str:
+        number = yarn_numbers.get(value)
+        if number is None:
+            number = yarn_to_number(value)
+            if len(value) <= NUMBER_CACHE_LENGTH:
+                if len(yarn_numbers) >= NUMBER_CACHE_SIZE:
+                    yarn_numbers.clear()
+                yarn_numbers[value] = number
+        return number
+
+    # return error on implicit typecast of NOOB to number
+    if value is None:
+        raise ValueError("Type Error: Cannot implicitly typecast NOOB to numeric type.")
+    if value_type is Rope:
+        return yarn_to_number(str(value))
+    if value_type is Bukkit:
+        raise ValueError("Type Error: Cannot convert BUKKIT to numeric type.")
+
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        return yarn_to_number(value)
+    raise ValueError(f"Type Error: Cannot convert {type(value).__name__} to numeric type.")
+
+# numeric value of a YARN, or ValueError when it is not a number
+def yarn_to_number(value):
+    # vlidate YARN for numeric casting
+    if not value:  # empty string
+        return 0
+    # check if string contains only valid numeric characters
+    test_str = value.lstrip('-')  # remove leading negative sign
+    if not test_str:  # just a minus sign
+        raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
+
+    # check for valid numeric string (digits and at most one period)
+    has_period = False
+    for char in test_str:
+        if char == '.':
+            if has_period:  # more than one period
+                raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
+            has_period = True
+        elif not char.isdigit():
+            raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
+
+    try:
+        if '.' in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
+
+# utility function to determine truthiness of a value
+def is_truthy(value):
+    value_type = type(value)
+    if value_type is bool:
+        return value
+    if value_type is int or value_type is float:
+        return value != 0
+    if value_type is str:
+        return value != ''
+    if value is None: # NOOB is false
+        return False
+    if value_type is Rope:
+        return value.length != 0
+    if value_type is Bukkit: # empty BUKKIT is false
+        return len(value.items) != 0
+    # if value is boolean, number, or string
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        return value != ''
+    return True
+
+# utility function to convert value to string
+def stringify(value):
+    value_type = type(value)
+    if value_type is str:
+        return value
+    if value_type is int:
+        return str(value)
+    if value_type is float:
+        return f"{value:.2f}"
+    if value is None: # NOOB
+        return ''
+    # check for boolean if so convert to WIN/FAIL
+    if isinstance(value, bool):
+        return 'WIN' if value else 'FAIL'
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value) # convert other types to string
+
+# utility function to cast value to specified type
+def cast_value(value, type_name):
+    type_upper = type_name.upper()
+
+    # explicit casting of NOOB = empty/zero values
+    if value is None:
+        if type_upper == 'NUMBR':
+            return 0
+        elif type_upper == 'NUMBAR':
+            return 0.0
+        elif type_upper == 'YARN':
+            return ''
+        elif type_upper == 'TROOF':
+            return False
+
+    if type_upper == 'NUMBR':
+        return int(to_number(value))
+    elif type_upper == 'NUMBAR':
+        return to_number(value)
+    elif type_upper == 'YARN':
+        return stringify(value)
+    elif type_upper == 'TROOF':
+        return is_truthy(value)
+
+    return value
+
+# types whose values to_number returns unchanged
+NUMERIC_TYPES = (int, float, bool)
+
+def values_equal(val1, val2):
+    # compare two values for equality with type coercion
+    # If both are the same type, direct comparison
+    type1, type2 = type(val1), type(val2)
+    if type1 == type2:
+        return val1 == val2
+    # numbers and TROOFs compare as numbers; NOOB never converts
+    if type1 in NUMERIC_TYPES and type2 in NUMERIC_TYPES:
+        return val1 == val2
+    if val1 is None or val2 is None:
+        return False
+    if type1 is Rope or type2 is Rope:
+        return values_equal(plain(val1), plain(val2))
+
+    # try numeric comparison if one is string and one is number
+    try:
+        # convert both to numbers and compare
+        num1 = to_number(val1)
+        num2 = to_number(val2)
+        return num1 == num2
+    except:
+        # if fails, they're not equal
+        return False
+
+# first-match lookup over literal WTF? case labels: match(value) is the index of the first label for which
+# values_equal(value, label) holds (or None), found with a few dict lookups instead of comparing every label
+# values_equal compares same-type values directly and other pairs as numbers, so labels are indexed by
+# (type, value) and, per label type, by their numeric value
+class CaseTable:
+    def __init__(self, labels):
+        self.exact = {}    # (type, label) -> index of the first such label
+        self.numeric = {}  # label type -> numeric value -> index of the first label of that type
+        for index, label in enumerate(labels):
+            self.exact.setdefault((type(label), label), index)
+            try:
+                number = to_number(label)
+            except ValueError:
+                continue
+            self.numeric.setdefault(type(label), {}).setdefault(number, index)
+
+    def match(self, value):
+        value = plain(value)
+        value_type = type(value)
+        found = self.exact.get((value_type, value))
+        try:
+            number = to_number(value)
+        except ValueError:
+            return found
+        for label_type, numbers in self.numeric.items():
+            if label_type is not value_type:
+                index = numbers.get(number)
+                if index is not None and (found is None or index < found):
+                    found = index
+        return found
+
+def numbr_quoshunt(val1, val2):
+    return 0 if val2 == 0 else int(val1 / val2)
+
+def numbr_mod(val1, val2):
+    return 0 if val2 == 0 else val1 % val2
+
+def numbar_quoshunt(val1, val2):
+    return 0 if val2 == 0 else val1 / val2
+
+def numbar_mod(val1, val2):
+    return 0 if val2 == 0 else val1 % val2
+
+# operator -> implementation for two NUMBRs (results stay NUMBR)
+NUMBR_OPS = {
+    TokenType.SUM_OF: lambda val1, val2: val1 + val2,
+    TokenType.DIFF_OF: lambda val1, val2: val1 - val2,
+    TokenType.PRODUKT_OF: lambda val1, val2: val1 * val2,
+    TokenType.QUOSHUNT_OF: numbr_quoshunt,
+    TokenType.MOD_OF: numbr_mod,
+    TokenType.BIGGR_OF: max,
+    TokenType.SMALLR_OF: min,
+}
+
+# operator -> implementation for NUMBAR op NUMBAR and NUMBR/NUMBAR pairs
+NUMBAR_OPS = {
+    TokenType.SUM_OF: lambda val1, val2: float(val1 + val2),
+    TokenType.DIFF_OF: lambda val1, val2: float(val1 - val2),
+    TokenType.PRODUKT_OF: lambda val1, val2: float(val1 * val2),
+    TokenType.QUOSHUNT_OF: numbar_quoshunt,
+    TokenType.MOD_OF: numbar_mod,
+    TokenType.BIGGR_OF: max,
+    TokenType.SMALLR_OF: min,
+}
+
+# (left type, right type) -> operator table for the pairs that need no coercion
+NUMERIC_OPS = {
+    (int, int): NUMBR_OPS,
+    (float, float): NUMBAR_OPS,
+    (int, float): NUMBAR_OPS,
+    (float, int): NUMBAR_OPS,
+}
+
+# apply a numeric operator (SUM OF ... SMALLR OF) to two values
+def numeric_op(op_type, left, right):
+    operations = NUMERIC_OPS.get((type(left), type(right)))
+    if operations is not None and op_type in operations:
+        return operations[op_type](left, right)
+
+    # Convert to numbers (will raise error if cannot be cast)
+    val1 = to_number(left)
+    val2 = to_number(right)
+
+    # if both values are int result is NUMBR
+    # if at least one is a float result is NUMBAR
+    both_are_numbr = (isinstance(val1, int) and isinstance(val2, int) and
+                    not isinstance(val1, bool) and not isinstance(val2, bool))
+
+    if op_type == TokenType.SUM_OF:
+        result = val1 + val2
+        return int(result) if both_are_numbr else float(result)
+
+    elif op_type == TokenType.DIFF_OF:
+        result = val1 - val2
+        return int(result) if both_are_numbr else float(result)
+
+    elif op_type == TokenType.PRODUKT_OF:
+        result = val1 * val2
+        return int(result) if both_are_numbr else float(result)
+
+    elif op_type == TokenType.QUOSHUNT_OF:
+        if val2 == 0:
+            return 0
+        result = val1 / val2
+        # if both are NUMBR, truncate to int else keep as float
+        return int(result) if both_are_numbr else result
+
+    elif op_type == TokenType.MOD_OF:
+        if val2 == 0:
+            return 0
+        result = val1 % val2
+        return int(result) if both_are_numbr else result
+
+    elif op_type == TokenType.BIGGR_OF:
+        result = max(val1, val2)
+        return int(result) if both_are_numbr else result
+
+    elif op_type == TokenType.SMALLR_OF:
+        result = min(val1, val2)
+        return int(result) if both_are_numbr else result
+
+    return 0
+
+# SMOOSH: the operands stringified and concatenated
+# a first operand that is a Rope, or a str of at least ROPE_MIN_LENGTH characters, is extended as a Rope
+# instead of copied, so building a YARN with x R SMOOSH x AN ... MKAY in a loop takes linear time
+def smoosh(values):
+    if values:
+        first = values[0]
+        first_type = type(first)
+        if first_type is Rope or (first_type is str and len(first) >= ROPE_MIN_LENGTH):
+            if first_type is str:
+                first = Rope([first], 1, len(first))
+            return first.append(''.join([stringify(value) for value in values[1:]]))
+    return ''.join([stringify(value) for value in values])
+
+# apply a BUKKIT operation to its already evaluated operands
+# (A BUKKIT makes a new one; PUT IN and SHUV IN give the value they store)
+def bukkit_op(op_type, args):
+    if op_type == TokenType.BUKKIT:
+        return Bukkit()
+    bukkit = args[0]
+    if type(bukkit) is not Bukkit:
+        raise ValueError(f"Type Error: {op_type.value} needs a BUKKIT, got {TYPE_NAMES.get(type(bukkit))}")
+    if op_type == TokenType.PIK_OF:
+        return bukkit.get(args[1])
+    if op_type == TokenType.SIZ_OF:
+        return len(bukkit.items)
+    if op_type == TokenType.PUT_IN:
+        bukkit.set(args[1], args[2])
+        return args[2]
+    bukkit.append(args[1])
+    return args[1]
+
+# boolean operators that evaluate their operands left to right only until one decides the result,
+# mapped to that result: ANY OF / EITHER OF stop at the first true operand and give WIN, ALL OF / BOTH OF
+# stop at the first false one and give FAIL (WON OF needs every operand). The operands after the deciding
+# one are not evaluated at all: their function calls, BUKKIT changes, IT updates and errors (undeclared
+# variables, bad casts, undefined functions) do not happen.
+SHORT_CIRCUIT_OPS = {TokenType.ANY_OF: True, TokenType.EITHER_OF: True,
+                     TokenType.ALL_OF: False, TokenType.BOTH_OF: False}
+
+# combine already evaluated operands of a boolean operator (ANY OF, ALL OF, BOTH OF, EITHER OF, WON OF)
+def boolean_op(op_type, args):
+    if op_type == TokenType.BOTH_OF or op_type == TokenType.ALL_OF:
+        # logical AND across all
+        for a in args:
+            if not is_truthy(a):
+                return False
+        return True
+    if op_type == TokenType.ANY_OF or op_type == TokenType.EITHER_OF:
+        for a in args:
+            if is_truthy(a):
+                return True
+        return False
+    if op_type == TokenType.WON_OF:
+        # XOR across arguments: True if an odd number of truthy args
+        count = 0
+        for a in args:
+            if is_truthy(a):
+                count += 1
+        return (count % 2) == 1
+    return False
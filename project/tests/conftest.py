@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the interpreter modules import each other by name from the project directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
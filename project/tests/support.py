@@ -0,0 +1,17 @@
+from lexer import Lexer  # Import lexer
+from parser import Parser  # Import Parser class
+
+# run a program and return (console output, error message or None); GIMMEH reads from inputs
+# stream=True hands the parser the lazily produced tokens of Lexer.iter_tokens instead of a list
+def run_program(source, engine, inputs=(), stream=False, **options):
+    output = []
+    pending = list(inputs)
+    read_input = lambda prompt: pending.pop(0) if pending else ''
+    try:
+        lexer = Lexer(source)
+        tokens = lexer.iter_tokens() if stream else lexer.tokenize()
+        Parser(tokens, lambda name, value: None, output.append, read_input,
+               engine=engine, **options).parse()
+    except Exception as error:
+        return ''.join(output), str(error) or type(error).__name__
+    return ''.join(output), None
@@ -0,0 +1,30 @@
+import pytest
+
+from lexer import Lexer
+from token_types import TokenType
+from support import run_program
+
+ENGINES = [{'engine': 'tokens'}, {'engine': 'ast'}, {'engine': 'closures'}, {'engine': 'vm'}, {'engine': 'python'},
+           {'engine': 'tiered', 'tier': 1}]
+
+# BUKKIT is only a keyword as part of A BUKKIT, so programs can keep using it as a name
+IDENTIFIER_PROGRAM = '''HAI
+WAZZUP
+I HAS A bukkit ITZ 3
+I HAS A Bukkit ITZ "x"
+I HAS A xs ITZ a bukkit
+BUHBYE
+VISIBLE bukkit " " Bukkit
+bukkit R SUM OF bukkit AN 1
+SHUV IN xs AN bukkit
+VISIBLE SIZ OF xs " " PIK OF xs AN 0 " " MAEK bukkit A BUKKIT
+KTHXBYE'''
+
+def test_bukkit_is_an_identifier():
+    types = [token.type for token in Lexer(IDENTIFIER_PROGRAM).tokenize()]
+    assert types.count(TokenType.BUKKIT) == 2
+    assert [token.value for token in Lexer('I HAS A bukkit').tokenize()][-1] == 'bukkit'
+
+@pytest.mark.parametrize('options', ENGINES, ids=lambda options: '-'.join(map(str, options.values())))
+def test_bukkit_identifier_program(options):
+    assert run_program(IDENTIFIER_PROGRAM, **options) == ('3 x\n1 4 4\n', None)
@@ -0,0 +1,212 @@
+import random
+
+import pytest
+
+import runtime
+from token_types import TokenType
+
+# ---- reference helpers ----
+
+# the value helpers as they were before the type-dispatched fast paths, kept as the reference runtime.py
+# is checked against
+def reference_to_number(value):
+    # return error on implicit typecast of NOOB to number
+    if value is None:
+        raise ValueError("Type Error: Cannot implicitly typecast NOOB to numeric type.")
+
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        # vlidate YARN for numeric casting
+        if not value:  # empty string
+            return 0
+        # check if string contains only valid numeric characters
+        test_str = value.lstrip('-')  # remove leading negative sign
+        if not test_str:  # just a minus sign
+            raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
+
+        # check for valid numeric string (digits and at most one period)
+        has_period = False
+        for char in test_str:
+            if char == '.':
+                if has_period:  # more than one period
+                    raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
+                has_period = True
+            elif not char.isdigit():
+                raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
+
+        try:
+            if '.' in value:
+                return float(value)
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Type Error: Cannot cast YARN '{value}' to numeric type.")
+
+    if isinstance(value, bool):
+        return 1 if value else 0
+
+    raise ValueError(f"Type Error: Cannot convert {type(value).__name__} to numeric type.")
+
+# utility function to determine truthiness of a value
+def reference_is_truthy(value):
+    if value is None: # NOOB is false
+        return False
+    # if value is boolean, number, or string
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        return value != ''
+    return True
+
+# utility function to convert value to string
+def reference_stringify(value):
+    if value is None: # NOOB
+        return ''
+    # check for boolean if so convert to WIN/FAIL
+    if isinstance(value, bool):
+        return 'WIN' if value else 'FAIL'
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value) # convert other types to string
+
+# utility function to cast value to specified type
+def reference_cast_value(value, type_name):
+    type_upper = type_name.upper()
+
+    # explicit casting of NOOB = empty/zero values
+    if value is None:
+        if type_upper == 'NUMBR':
+            return 0
+        elif type_upper == 'NUMBAR':
+            return 0.0
+        elif type_upper == 'YARN':
+            return ''
+        elif type_upper == 'TROOF':
+            return False
+
+    if type_upper == 'NUMBR':
+        return int(reference_to_number(value))
+    elif type_upper == 'NUMBAR':
+        return reference_to_number(value)
+    elif type_upper == 'YARN':
+        return reference_stringify(value)
+    elif type_upper == 'TROOF':
+        return reference_is_truthy(value)
+
+    return value
+
+def reference_values_equal(val1, val2):
+    # compare two values for equality with type coercion
+    # If both are the same type, direct comparison
+    if type(val1) == type(val2):
+        return val1 == val2
+
+    # try numeric comparison if one is string and one is number
+    try:
+        # convert both to numbers and compare
+        num1 = reference_to_number(val1)
+        num2 = reference_to_number(val2)
+        return num1 == num2
+    except:
+        # if fails, they're not equal
+        return False
+
+def reference_numeric_op(op_type, left, right):
+    # Convert to numbers (will raise error if cannot be cast)
+    val1 = reference_to_number(left)
+    val2 = reference_to_number(right)
+
+    # if both values are int result is NUMBR
+    # if at least one is a float result is NUMBAR
+    both_are_numbr = (isinstance(val1, int) and isinstance(val2, int) and
+                    not isinstance(val1, bool) and not isinstance(val2, bool))
+
+    if op_type == TokenType.SUM_OF:
+        result = val1 + val2
+        return int(result) if both_are_numbr else float(result)
+
+    elif op_type == TokenType.DIFF_OF:
+        result = val1 - val2
+        return int(result) if both_are_numbr else float(result)
+
+    elif op_type == TokenType.PRODUKT_OF:
+        result = val1 * val2
+        return int(result) if both_are_numbr else float(result)
+
+    elif op_type == TokenType.QUOSHUNT_OF:
+        if val2 == 0:
+            return 0
+        result = val1 / val2
+        # if both are NUMBR, truncate to int else keep as float
+        return int(result) if both_are_numbr else result
+
+    elif op_type == TokenType.MOD_OF:
+        if val2 == 0:
+            return 0
+        result = val1 % val2
+        return int(result) if both_are_numbr else result
+
+    elif op_type == TokenType.BIGGR_OF:
+        result = max(val1, val2)
+        return int(result) if both_are_numbr else result
+
+    elif op_type == TokenType.SMALLR_OF:
+        result = min(val1, val2)
+        return int(result) if both_are_numbr else result
+
+    return 0
+
+NUMERIC_OPERATORS = (TokenType.SUM_OF, TokenType.DIFF_OF, TokenType.PRODUKT_OF, TokenType.QUOSHUNT_OF,
+                     TokenType.MOD_OF, TokenType.BIGGR_OF, TokenType.SMALLR_OF)
+
+# random LOLCODE value, biased towards the edge cases of the coercion rules
+def random_value(rng):
+    choice = rng.randrange(7)
+    if choice == 0:
+        return rng.choice([None, True, False])
+    if choice == 1:
+        return rng.choice([0, 1, -1, 2, 7, -13, 10 ** 20, -(2 ** 63)])
+    if choice == 2:
+        return rng.choice([0.0, -0.0, 0.5, -2.5, 1.0, 3.25, 1e300, float('inf')])
+    if choice == 3:
+        return rng.choice(['', '-', '--1', '0', '1', '-7', '01', '1.5', '-0.5', '.5', '5.', '1.2.3', '1e5',
+                           ' 1', 'abc', 'WIN', '\u0663', '\u00b2', '12345678901234567890'])
+    if choice == 4:
+        return str(rng.randint(-1000, 1000))
+    if choice == 5:
+        return f"{rng.uniform(-100, 100):.{rng.randint(0, 3)}f}"
+    return rng.randint(-1000, 1000)
+
+# (result, None) or (None, error message) of func(*args)
+def outcome(func, *args):
+    try:
+        result = func(*args)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return (type(result), result if result == result else 'nan'), None
+
+CAST_TYPES = ['NUMBR', 'NUMBAR', 'YARN', 'TROOF', 'NOOB']
+
+# each runtime helper -> its reference and a random argument tuple for it
+HELPERS = {
+    'to_number': (runtime.to_number, reference_to_number, lambda rng: (random_value(rng),)),
+    'is_truthy': (runtime.is_truthy, reference_is_truthy, lambda rng: (random_value(rng),)),
+    'stringify': (runtime.stringify, reference_stringify, lambda rng: (random_value(rng),)),
+    'values_equal': (runtime.values_equal, reference_values_equal,
+                     lambda rng: (random_value(rng), random_value(rng))),
+    'cast_value': (runtime.cast_value, reference_cast_value,
+                   lambda rng: (random_value(rng), rng.choice(CAST_TYPES))),
+    'numeric_op': (runtime.numeric_op, reference_numeric_op,
+                   lambda rng: (rng.choice(NUMERIC_OPERATORS), random_value(rng), random_value(rng))),
+}
+
+# property check: the type-dispatched helpers give the same value (or error) as the reference on random inputs
+@pytest.mark.parametrize('name', HELPERS)
+def test_helper_matches_reference(name):
+    new, old, arguments = HELPERS[name]
+    rng = random.Random(f"{name}-2024")
+    for _ in range(5000):
+        args = arguments(rng)
+        assert outcome(new, *args) == outcome(old, *args), args
@@ -0,0 +1,62 @@
+import pytest
+
+from support import run_program
+
+ENGINES = ['tokens', 'tiered', 'ast']
+
+# programs with unclosed blocks and missing keywords: streamed tokens must give the same output and error
+# as the token list (the stream ends where an unclosed block is looked for its closer)
+PROGRAMS = {
+    'unclosed function before HAI': '''HOW IZ I f YR n
+  VISIBLE n
+HAI
+VISIBLE "s"
+KTHXBYE
+''',
+    'unclosed function in the body': '''HAI
+VISIBLE "s"
+HOW IZ I f YR n
+  VISIBLE n
+KTHXBYE
+''',
+    'unclosed function after KTHXBYE': '''HAI
+VISIBLE "s"
+KTHXBYE
+HOW IZ I f YR n
+  VISIBLE n
+''',
+    'unclosed loop': '''HAI
+WAZZUP
+I HAS A i ITZ 0
+BUHBYE
+IM IN YR l UPPIN YR i TIL BOTH SAEM i AN 3
+  VISIBLE i
+KTHXBYE
+''',
+    'unclosed O RLY?': '''HAI
+WIN
+O RLY?
+  YA RLY
+    VISIBLE "yes"
+KTHXBYE
+''',
+    'unclosed WTF?': '''HAI
+1
+WTF?
+  OMG 1
+    VISIBLE "one"
+KTHXBYE
+''',
+    'missing KTHXBYE': '''HAI
+VISIBLE "s"
+''',
+    'missing HAI': '''VISIBLE "s"
+KTHXBYE
+''',
+}
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_stream_matches_token_list(name, engine):
+    source = PROGRAMS[name]
+    assert run_program(source, engine, stream=True) == run_program(source, engine)
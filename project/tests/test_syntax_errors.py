@@ -0,0 +1,164 @@
+import pytest
+
+from support import run_program
+
+# the token interpreter runs a statement while parsing it, so a syntax error is raised after everything
+# before it has run; the other engines must give the same output and error
+ENGINES = [{'engine': 'ast'}, {'engine': 'ast', 'optimize': True}, {'engine': 'closures'}, {'engine': 'vm'},
+           {'engine': 'python'}, {'engine': 'tiered', 'tier': 1}]
+
+# prints when it is called
+FUNCTIONS = '''HOW IZ I p
+    VISIBLE "in p"
+    FOUND YR 1
+IF U SAY SO
+HOW IZ I t YR x
+    VISIBLE "t " x
+    FOUND YR x
+IF U SAY SO
+'''
+
+PROGRAMS = {
+    # the call before the missing operand runs
+    'operand after a call': '''HAI
+VISIBLE SUM OF I IZ p MKAY AN
+KTHXBYE''',
+    'nested operand after a call': '''HAI
+VISIBLE "a" SMOOSH I IZ p MKAY AN PRODUKT OF I IZ t YR 2 MKAY AN MKAY
+KTHXBYE''',
+    # YA RLY runs, the malformed MEBBE is never reached
+    'bad MEBBE not reached': '''HAI
+VISIBLE "before"
+WIN
+O RLY?
+    YA RLY
+        VISIBLE "taken"
+    MEBBE BOTH SAEM 1 VISIBLE "bad"
+        VISIBLE "mebbe"
+    NO WAI
+        VISIBLE "else"
+OIC
+VISIBLE "after"
+KTHXBYE''',
+    'bad MEBBE after a taken MEBBE': '''HAI
+FAIL
+O RLY?
+    YA RLY
+        VISIBLE "yes"
+    MEBBE I IZ t YR WIN MKAY
+        VISIBLE "first"
+    MEBBE DIFFRINT I IZ p MKAY
+        VISIBLE "second"
+OIC
+VISIBLE "after"
+KTHXBYE''',
+    'bad MEBBE reached': '''HAI
+FAIL
+O RLY?
+    YA RLY
+        VISIBLE "yes"
+    MEBBE I IZ t YR FAIL MKAY
+        VISIBLE "first"
+    MEBBE DIFFRINT I IZ p MKAY
+        VISIBLE "second"
+    NO WAI
+        VISIBLE "else"
+OIC
+VISIBLE "after"
+KTHXBYE''',
+    # the branches after a stray YA RLY are never reached
+    'stray YA RLY': '''HAI
+FAIL
+O RLY?
+    YA RLY
+        VISIBLE "yes"
+    YA RLY
+        VISIBLE "stray"
+    NO WAI
+        VISIBLE "no"
+OIC
+WIN
+VISIBLE "after"
+O RLY?
+    YA RLY
+        VISIBLE "yes"
+    YA RLY
+        VISIBLE "stray"
+OIC
+KTHXBYE''',
+    # a deciding operand skips the rest, which still raises the syntax error
+    'short-circuit stops before the error': '''HAI
+ANY OF I IZ t YR WIN MKAY AN I IZ t YR FAIL MKAY AN SUM OF 1 AN
+KTHXBYE''',
+    'short-circuit reaches the error': '''HAI
+ALL OF I IZ t YR WIN MKAY AN I IZ t YR 1 MKAY AN SUM OF I IZ p MKAY AN
+KTHXBYE''',
+    # the function is looked up, then the arguments before the bad one run
+    'bad argument': '''HAI
+I IZ t YR I IZ p MKAY AN YR SUM OF
+KTHXBYE''',
+    'bad argument of an undefined function': '''HAI
+I IZ nope YR I IZ p MKAY AN YR SUM OF
+KTHXBYE''',
+    # the variable is checked before the value
+    'bad value assigned': '''HAI
+WAZZUP
+I HAS A x
+BUHBYE
+x R SUM OF I IZ p MKAY AN
+KTHXBYE''',
+    'bad value assigned to an undeclared variable': '''HAI
+y R SUM OF I IZ p MKAY AN
+KTHXBYE''',
+    'bad declaration': '''HAI
+WAZZUP
+I HAS A x ITZ SUM OF I IZ p MKAY AN
+BUHBYE
+VISIBLE "body"
+KTHXBYE''',
+    # the loop variable is checked before the syntax of the condition
+    'bad loop condition': '''HAI
+WAZZUP
+I HAS A i ITZ 0
+BUHBYE
+IM IN YR l UPPIN YR i TIL BOTH SAEM i AN
+    VISIBLE "body"
+IM OUTTA YR l
+KTHXBYE''',
+    'bad loop condition with an undeclared variable': '''HAI
+IM IN YR l UPPIN YR i TIL BOTH SAEM i AN
+    VISIBLE "body"
+IM OUTTA YR l
+KTHXBYE''',
+    'bad switch label': '''HAI
+1
+WTF?
+    OMG 2
+        VISIBLE "two"
+    OMG SUM OF I IZ p MKAY AN
+        VISIBLE "bad"
+OIC
+KTHXBYE''',
+    # an error in a function body is raised by each call that reaches it
+    'bad statement in a function': '''HOW IZ I f YR n
+    VISIBLE "f " n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR 0
+    OIC
+    VISIBLE I IZ p MKAY DIFF OF
+IF U SAY SO
+HAI
+I IZ f YR 0 MKAY
+VISIBLE "between"
+I IZ f YR 1 MKAY
+KTHXBYE''',
+}
+
+@pytest.mark.parametrize('options', ENGINES, ids=lambda options: '-'.join(map(str, options.values())))
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_same_output_and_error_as_tokens(name, options):
+    source = FUNCTIONS + PROGRAMS[name]
+    expected = run_program(source, 'tokens')
+    assert run_program(source, **options) == expected
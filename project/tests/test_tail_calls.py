@@ -0,0 +1,125 @@
+import pytest
+
+from lexer import Lexer
+from parser import Parser
+
+# symbol updates, console output and the error (if any) of a run on the ast engine
+def run(source, tail_calls):
+    events = []
+    try:
+        Parser(Lexer(source).tokenize(), lambda name, value: events.append((name, value)), events.append,
+               lambda prompt: '', tail_calls=tail_calls).parse()
+    except Exception as error:
+        events.append(f"{type(error).__name__}: {error}")
+    return events
+
+# tail-recursive sum of 1..depth
+TAIL_SUM = '''HOW IZ I total YR n AN YR acc
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR acc
+        NO WAI
+            FOUND YR I IZ total YR DIFF OF n AN 1 AN YR SUM OF acc AN n MKAY
+    OIC
+IF U SAY SO
+HAI
+I IZ total YR {depth} AN YR 0 MKAY
+VISIBLE IT
+KTHXBYE'''
+
+PROGRAMS = {
+    'tail recursion': TAIL_SUM.format(depth=100),
+    # the recursive call is an operand, not the returned value
+    'non-tail recursion': '''HOW IZ I fact YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR 1
+    OIC
+    FOUND YR PRODUKT OF n AN I IZ fact YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+I IZ fact YR 20 MKAY
+VISIBLE IT
+KTHXBYE''',
+    # a call to another function in tail position stays a normal call
+    'mutual recursion': '''HOW IZ I even YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR WIN
+    OIC
+    FOUND YR I IZ odd YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HOW IZ I odd YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR FAIL
+    OIC
+    FOUND YR I IZ even YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+I IZ even YR 50 MKAY
+VISIBLE IT
+I IZ odd YR 7 MKAY
+VISIBLE IT
+KTHXBYE''',
+    # the tail call reads IT and prints on every level
+    'output and IT': '''HOW IZ I count YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            GTFO
+    OIC
+    VISIBLE n " " IT
+    FOUND YR I IZ count YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+I IZ count YR 5 MKAY
+VISIBLE IT
+KTHXBYE''',
+    # the tail call fails with a wrong argument count at the bottom
+    'argument count error': '''HOW IZ I down YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR I IZ down YR 1 AN YR 2 MKAY
+    OIC
+    FOUND YR I IZ down YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+I IZ down YR 10 MKAY
+VISIBLE IT
+KTHXBYE''',
+    # an argument of the tail call raises a type error
+    'argument type error': '''HOW IZ I down YR n
+    BOTH SAEM n AN 0
+    O RLY?
+        YA RLY
+            FOUND YR I IZ down YR SUM OF "x" AN 1 MKAY
+    OIC
+    FOUND YR I IZ down YR DIFF OF n AN 1 MKAY
+IF U SAY SO
+HAI
+I IZ down YR 3 MKAY
+VISIBLE IT
+KTHXBYE''',
+}
+
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_same_events_with_and_without_tail_calls(name):
+    assert run(PROGRAMS[name], True) == run(PROGRAMS[name], False)
+
+# the same program without tail calls runs out of Python stack
+def test_deep_tail_recursion():
+    source = TAIL_SUM.format(depth=100000)
+    events = run(source, True)
+    assert '5000050000\n' in events
+    assert not any(type(event) is str and 'Error' in event for event in events)
+    assert run(source, False)[-1].startswith('RecursionError')
+
+def test_deep_non_tail_recursion_still_fails():
+    source = PROGRAMS['non-tail recursion'].replace('YR 20 MKAY', 'YR 100000 MKAY')
+    assert run(source, True)[-1].startswith('RecursionError')
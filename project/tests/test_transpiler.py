@@ -0,0 +1,23 @@
+import pytest
+
+from support import run_program
+
+# a NUMBAR literal too large for a float is inf, which has no Python literal
+# (the loop is what the tiered engine compiles)
+HUGE_NUMBAR_PROGRAM = f'''HAI
+WAZZUP
+I HAS A x ITZ {'9' * 400}.0
+BUHBYE
+VISIBLE x
+IM IN YR once
+    VISIBLE {'9' * 400}.0
+    GTFO
+IM OUTTA YR once
+KTHXBYE'''
+
+@pytest.mark.parametrize('options', [{'engine': 'python'}, {'engine': 'python', 'optimize': True},
+                                     {'engine': 'tiered', 'tier': 1}])
+def test_huge_numbar_literal(options):
+    expected = run_program(HUGE_NUMBAR_PROGRAM, 'tokens')
+    assert expected == ('inf\ninf\n', None)
+    assert run_program(HUGE_NUMBAR_PROGRAM, **options) == expected
@@ -0,0 +1,78 @@
+from transpiler import PythonTranspiler, FILENAME  # Import Python transpiler (tier 1 code generator)
+from ast_builder import ASTBuilder, IncompleteStatement  # Import AST front end
+
+# loop iterations (per IM IN YR label) or calls (per HOW IZ I name) the token interpreter runs
+# before the tiered engine compiles that loop or function
+DEFAULT_HOT_THRESHOLD = 1000
+
+# TierCompiler class: tier 1 of the tiered engine
+# compiles one hot loop or function of the token interpreter (Parser, tier 0) at a time: its tokens are
+# built into an AST by ASTBuilder and translated into a Python def by PythonTranspiler.
+# The generated code runs on the interpreter's own state: v is the interpreter's variable scope, _rt is
+# the interpreter (so IT is its IT register) and function calls go through Parser.call_function,
+# so compiled and interpreted loops and functions can call each other in any mix.
+class TierCompiler(PythonTranspiler):
+    def __init__(self, interpreter):
+        super().__init__(None, interpreter.update_symbol_callback, interpreter.write_console_callback,
+                         interpreter.read_input_callback)
+        self.interpreter = interpreter
+        self.globals = None  # namespace shared by all compiled code, created on first use
+
+    # function(v) running the loop at position from its first condition check, or None when it cannot be compiled;
+    # the def is generated as program code, so FOUND YR (and GTFO in a function) raise ReturnException
+    # for the interpreter's function call to catch, as they do in tier 0
+    def compile_loop(self, position, in_function):
+        builder = self.builder(position, in_function)
+        try:
+            node = builder.parse_loop()
+        except (SyntaxError, IncompleteStatement, RecursionError):
+            return None
+        self.function_count += 1
+        return self.load(f"_loop{self.function_count}", (node,), node.line, in_function=False)
+
+    # function(v) running the body of the HOW IZ I at position in scope v and returning its value, or None
+    def compile_function(self, position):
+        builder = self.builder(position, False)
+        try:
+            node = builder.parse_function_definition()
+        except (SyntaxError, RecursionError):
+            return None
+        self.function_count += 1
+        return self.load(f"_function{self.function_count}", node.body, node.line, in_function=True)
+
+    # AST builder over the interpreter's tokens (and block index), positioned at position
+    def builder(self, position, in_function):
+        builder = ASTBuilder(self.interpreter.tokens)
+        builder.blocks = self.interpreter.blocks
+        builder.position = position
+        builder.in_function = in_function
+        return builder
+
+    # generate and compile one def, returning the Python function
+    def load(self, python_name, statements, line, in_function):
+        try:
+            lines, _ = self.translate_function(python_name, statements, line, in_function)
+            code = compile('\n'.join(lines) + '\n', FILENAME, 'exec')
+        except (SyntaxError, RecursionError, MemoryError):
+            # nesting too deep for the Python compiler: the interpreter keeps running it
+            return None
+        if self.globals is None:
+            self.globals = self.namespace()
+        exec(code, self.globals)
+        return self.globals[python_name]
+
+    def namespace(self):
+        namespace = super().namespace()
+        namespace['_rt'] = self.interpreter
+        return namespace
+
+    # ---- runtime support called from generated code ----
+
+    # functions are the interpreter's (a callee may still be in tier 0)
+    def lookup(self, name):
+        if name not in self.interpreter.functions:
+            raise NameError(f"Semantic Error: Function '{name}' not defined")
+        return name
+
+    def call(self, caller_scope, name, args):
+        return self.interpreter.call_function(name, args)
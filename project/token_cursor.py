@@ -0,0 +1,104 @@
+from token_types import TokenType  # Import TokenType Enum
+from block_index import BlockIndex  # Import block jump table
+
+# Buffered window over a lazily produced token stream (e.g. Lexer.iter_tokens)
+# tokens are pulled from the stream on demand; tokens before the release point are dropped
+# except for pinned ranges (function bodies) which can be re-entered at any time
+class TokenWindow:
+    def __init__(self, token_iter):
+        self.source = iter(token_iter)
+        self.buffer = []  # tokens from index self.base onwards
+        self.base = 0
+        self.pinned = {}  # index -> token kept after release
+        self.exhausted = False
+
+    # get token at absolute index, raise IndexError past the end of the stream
+    def __getitem__(self, index):
+        offset = index - self.base
+        if offset < 0:
+            return self.pinned[index]
+        while offset >= len(self.buffer):
+            if self.exhausted:
+                raise IndexError(index)
+            try:
+                self.buffer.append(next(self.source))
+            except StopIteration:
+                self.exhausted = True
+        return self.buffer[offset]
+
+    # keep tokens in [start, end) available after they are released
+    # (an unclosed block ends at the end of the stream, so end can lie past the last token)
+    def pin(self, start, end):
+        for index in range(max(start, self.base), end):
+            try:
+                self.pinned[index] = self[index]
+            except IndexError:
+                break
+
+    # drop buffered tokens before index
+    def release(self, index):
+        if index > self.base:
+            del self.buffer[:index - self.base]
+            self.base = index
+
+# Cursor over a token list, TokenStream or TokenWindow
+# shared by the token interpreter (Parser) and the AST builder
+class TokenCursor:
+    # tokens can be a list or any iterable of tokens (read through a TokenWindow)
+    def __init__(self, tokens):
+        if not hasattr(tokens, '__getitem__'):
+            tokens = TokenWindow(tokens)
+        self.tokens = tokens
+        self.position = 0
+        # jump table between block openers, branch markers and closers
+        self.blocks = BlockIndex(self.token_at)
+
+    # get token at index, None past the end of the tokens
+    def token_at(self, index):
+        try:
+            return self.tokens[index]
+        except IndexError:
+            return None
+
+    # get current token from token list
+    def current_token(self):
+        return self.token_at(self.position)
+
+    # peek ahead in token list without advancing position
+    def peek(self, offset=1):
+        return self.token_at(self.position + offset)
+
+    # drop tokens that can no longer be revisited when reading from a stream
+    def release_tokens(self):
+        if isinstance(self.tokens, TokenWindow):
+            self.tokens.release(self.position)
+
+    # advance to next token
+    def advance(self):
+        self.position += 1
+
+    # expect a specific token type, raise error if not found
+    def expect(self, token_type):
+        token = self.current_token()
+        if not token or token.type != token_type:
+            raise SyntaxError(f"Syntax Error at line {token.line if token else 'EOF'}: Expected {token_type.value}, got {token.type.value if token else 'EOF'}")
+        self.advance()
+        return token
+
+    # consume an optional MKAY
+    def skip_mkay(self):
+        token = self.current_token()
+        if token and token.type == TokenType.MKAY:
+            self.advance()
+
+    # consume the A <type> after the operand of MAEK and return the type name
+    # (MAEK x A BUKKIT lexes as the A BUKKIT keyword; casting to an unknown type leaves the value as it is)
+    def parse_cast_type(self):
+        token = self.current_token()
+        if token and token.type == TokenType.BUKKIT:
+            self.advance()
+            return 'BUKKIT'
+        self.expect(TokenType.A)
+        type_name = self.current_token().value
+        self.advance()
+        return type_name
@@ -1,4 +1,5 @@
 from enum import Enum # Import Enum for defining token types as enumerations
+from array import array # Import array for compact token storage
 
 # Define token types for LOLCODE 
 # Each token type equals to a KEYWORD, LITERAL, or IDENTIFIER
@@ -63,6 +64,11 @@ class TokenType(Enum):
     NOOB = "NOOB"
     IDENTIFIER = "IDENTIFIER"
     PLUS = "+"
+    BUKKIT = "A BUKKIT"
+    PIK_OF = "PIK OF"
+    SIZ_OF = "SIZ OF"
+    PUT_IN = "PUT IN"
+    SHUV_IN = "SHUV IN"
 
 # Token class to represent individual tokens for easier handling during parsing
 class Token:
@@ -75,4 +81,79 @@ class Token:
         
     # String representation of token for debugging
     def __repr__(self):
-        return f"Token({self.type}, '{self.value}', Line: {self.line}, Col: {self.column})"
\ No newline at end of file
+        return f"Token({self.type}, '{self.value}', Line: {self.line}, Col: {self.column})"
+
+# token types indexed by the small integer codes stored in a TokenStream
+TOKEN_TYPES = list(TokenType)
+TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+# Token-compatible view of one entry of a TokenStream
+# the value is only sliced out of the source when it is read
+class TokenView:
+    __slots__ = ('stream', 'index')
+
+    def __init__(self, stream, index):
+        self.stream = stream
+        self.index = index
+
+    @property
+    def type(self):
+        return TOKEN_TYPES[self.stream.types[self.index]]
+
+    @property
+    def value(self):
+        return self.stream.value(self.index)
+
+    @property
+    def line(self):
+        return self.stream.lines[self.index]
+
+    @property
+    def column(self):
+        return self.stream.columns[self.index]
+
+    # String representation of token for debugging
+    def __repr__(self):
+        return f"Token({self.type}, '{self.value}', Line: {self.line}, Col: {self.column})"
+
+# Compact struct-of-arrays token container
+# each token is a type code, a source offset/length, a line and a column stored in array-backed columns
+# keyword tokens whose value is the canonical keyword (multi-word keywords) are stored with offset -1
+class TokenStream:
+    def __init__(self, source):
+        self.source = source
+        self.types = array('B')
+        self.offsets = array('q')
+        self.lengths = array('I')
+        self.lines = array('I')
+        self.columns = array('I')
+
+    # add a token, offset is -1 when the value is the token type's keyword text
+    def append(self, token_type, offset, length, line, column):
+        self.types.append(TYPE_CODES[token_type])
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.lines.append(line)
+        self.columns.append(column)
+
+    # resolve the value of token at index against the source
+    def value(self, index):
+        offset = self.offsets[index]
+        if offset < 0:
+            return TOKEN_TYPES[self.types[index]].value
+        return self.source[offset:offset + self.lengths[index]]
+
+    def __len__(self):
+        return len(self.types)
+
+    # get a Token-compatible view, raise IndexError past the end like a list
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError(index)
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield TokenView(self, index)
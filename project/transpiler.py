@@ -0,0 +1,563 @@
+import sys  # Import sys for command line arguments
+import linecache  # Import linecache so tracebacks can show generated source
+import math  # Import math for non-finite float checks
+from token_types import TokenType  # Import TokenType Enum
+from LOL_exceptions import BreakException, ReturnException  # Import custom exceptions for control flow
+from closure_compiler import ClosureCompiler  # Import closure backend (fallback for very deep nesting)
+from runtime import (to_number, is_truthy, stringify, cast_value, values_equal, numeric_op, boolean_op, smoosh, bukkit_op,
+                     SHORT_CIRCUIT_OPS, Scope)  # Import runtime value helpers
+from ast_nodes import (Literal, Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, BukkitOp,
+                       FunctionCall, Invariant, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Switch, Loop, FunctionDef, Break, Return, Raise)  # Import AST node classes
+
+# LOLCODE -> Python translation
+# every LOLCODE function becomes a Python def taking its scope, loops become while loops,
+# O RLY?/MEBBE an if/elif chain and WTF? an if/elif chain over the OMG labels;
+# values go through the same runtime helpers as the other engines
+
+# numeric operator token -> helper name in the generated module
+NUMERIC_HELPERS = {
+    TokenType.SUM_OF: '_sum',
+    TokenType.DIFF_OF: '_diff',
+    TokenType.PRODUKT_OF: '_produkt',
+    TokenType.QUOSHUNT_OF: '_quoshunt',
+    TokenType.MOD_OF: '_mod',
+    TokenType.BIGGR_OF: '_biggr',
+    TokenType.SMALLR_OF: '_smallr',
+}
+
+# file name of generated code in tracebacks
+FILENAME = '<lolcode>'
+
+# compiled code objects by generated source, so running the same program again skips compile()
+CODE_CACHE = {}
+CODE_CACHE_SIZE = 64
+
+# NUMBR op NUMBR is computed directly (same results as runtime.numeric_op);
+# anything else goes through the coercion rules in runtime.numeric_op
+def _sum(left, right):
+    if type(left) is int and type(right) is int:
+        return left + right
+    return numeric_op(TokenType.SUM_OF, left, right)
+
+def _diff(left, right):
+    if type(left) is int and type(right) is int:
+        return left - right
+    return numeric_op(TokenType.DIFF_OF, left, right)
+
+def _produkt(left, right):
+    if type(left) is int and type(right) is int:
+        return left * right
+    return numeric_op(TokenType.PRODUKT_OF, left, right)
+
+def _quoshunt(left, right):
+    if type(left) is int and type(right) is int and right:
+        return int(left / right)
+    return numeric_op(TokenType.QUOSHUNT_OF, left, right)
+
+def _mod(left, right):
+    if type(left) is int and type(right) is int and right:
+        return left % right
+    return numeric_op(TokenType.MOD_OF, left, right)
+
+def _biggr(left, right):
+    if type(left) is int and type(right) is int:
+        return left if left >= right else right
+    return numeric_op(TokenType.BIGGR_OF, left, right)
+
+def _smallr(left, right):
+    if type(left) is int and type(right) is int:
+        return left if left <= right else right
+    return numeric_op(TokenType.SMALLR_OF, left, right)
+
+# BOTH SAEM: same-type values compare directly (the first rule of values_equal)
+def _equal(left, right):
+    if type(left) is type(right):
+        return left == right
+    return values_equal(left, right)
+
+# OMG label test: True on a match, otherwise raise the case's validation error (if any)
+def _match(switch_value, label, error):
+    if _equal(switch_value, label):
+        return True
+    if error is not None:
+        raise error
+    return False
+
+# raise from inside an expression (after the operands given have been evaluated)
+def _raise(error, *operands):
+    raise error
+
+# value of a hoisted loop invariant that has not been computed in this run of its loop
+_UNSET = object()
+
+# PythonTranspiler class for executing a Program AST as generated Python code
+# translate() returns the source; run() compiles it once (cached by source) and calls the main function.
+# line_map maps generated line numbers back to LOLCODE lines: exceptions escaping the program get
+# a lolcode_line attribute, and syntax errors keep their own "at line N" text.
+class PythonTranspiler:
+    # Initialize transpiler with program and callbacks for symbol table updates and console I/O
+    def __init__(self, program, update_symbol_callback, write_console_callback, read_input_callback):
+        self.program = program
+        self.variables = Scope(IT=None)
+        self.IT = None
+        self.update_symbol_callback = update_symbol_callback
+        self.write_console_callback = write_console_callback
+        self.read_input_callback = read_input_callback
+        self.functions = {}
+
+        # generator state
+        self.lines = []
+        self.line_map = []
+        self.indent = 0
+        self.constants = []
+        self.function_count = 0
+        self.temp_count = 0
+        self.invariant_names = {}  # id(Invariant) -> Python local holding its value
+        self.in_function = False
+        # generated defs for HOW IZ I bodies
+        self.function_sources = []
+        # one entry per enclosing loop / switch case: the GTFO error to raise instead of breaking
+        self.break_errors = []
+        self.source = None
+
+        # node class -> translate method
+        self.statement_translators = {
+            Declaration: self.translate_declaration,
+            Assignment: self.translate_assignment,
+            Visible: self.translate_visible,
+            Gimmeh: self.translate_gimmeh,
+            TypeCast: self.translate_type_cast,
+            ExpressionStatement: self.translate_expression_statement,
+            If: self.translate_if,
+            Switch: self.translate_switch,
+            Loop: self.translate_loop,
+            FunctionDef: self.translate_function_definition,
+            Break: self.translate_break,
+            Return: self.translate_return,
+            Raise: self.translate_raise,
+        }
+        self.expression_translators = {
+            Literal: self.translate_literal,
+            Variable: self.translate_variable,
+            NumericOp: self.translate_numeric_op,
+            Comparison: self.translate_comparison,
+            BooleanOp: self.translate_boolean_op,
+            Not: self.translate_not,
+            Smoosh: self.translate_smoosh,
+            Cast: self.translate_cast,
+            BukkitOp: self.translate_bukkit_op,
+            FunctionCall: self.translate_function_call,
+            Invariant: self.translate_invariant,
+            Raise: self.translate_raise_expression,
+        }
+
+    # generate, compile and run the program
+    def run(self):
+        if self.source is None:
+            self.source = self.translate()
+        try:
+            code = self.compile()
+        except (SyntaxError, RecursionError, MemoryError):
+            # nesting too deep for the Python compiler: run the same tree with closures instead
+            return self.run_fallback()
+        linecache.cache[FILENAME] = (len(self.source), None, self.source.splitlines(True), FILENAME)
+
+        namespace = self.namespace()
+        exec(code, namespace)
+        try:
+            namespace['_main'](self.variables)
+        except BaseException as error:
+            self.annotate(error)
+            raise
+
+    # compile the generated source, reusing the code object of an earlier run of the same source
+    def compile(self):
+        code = CODE_CACHE.get(self.source)
+        if code is None:
+            code = compile(self.source, FILENAME, 'exec')
+            if len(CODE_CACHE) >= CODE_CACHE_SIZE:
+                CODE_CACHE.pop(next(iter(CODE_CACHE)))
+            CODE_CACHE[self.source] = code
+        return code
+
+    def run_fallback(self):
+        backend = ClosureCompiler(self.program, self.update_symbol_callback,
+                                  self.write_console_callback, self.read_input_callback)
+        try:
+            backend.run()
+        finally:
+            self.variables = backend.variables
+            self.IT = backend.IT
+
+    # globals of the generated module
+    def namespace(self):
+        return {
+            '__builtins__': __builtins__,
+            '_rt': self,
+            '_update': self.update_symbol_callback,
+            '_write': self.write_console_callback,
+            '_constants': self.constants,
+            '_functions': self.functions,
+            'Scope': Scope,
+            'BreakException': BreakException,
+            'ReturnException': ReturnException,
+            '_to_number': to_number,
+            '_truthy': is_truthy,
+            '_str': stringify,
+            '_smoosh': smoosh,
+            '_cast': cast_value,
+            '_boolean': boolean_op,
+            '_bukkit': bukkit_op,
+            '_equal': _equal,
+            '_match': _match,
+            '_raise': _raise,
+            '_unset': _UNSET,
+            '_sum': _sum,
+            '_diff': _diff,
+            '_produkt': _produkt,
+            '_quoshunt': _quoshunt,
+            '_mod': _mod,
+            '_biggr': _biggr,
+            '_smallr': _smallr,
+            '_lookup': self.lookup,
+            '_call': self.call,
+            '_gimmeh': self.gimmeh,
+            '_type_cast': self.type_cast,
+        }
+
+    # record the LOLCODE line of the innermost generated frame on an escaping exception
+    def annotate(self, error):
+        if getattr(error, 'lolcode_line', None) is not None:
+            return
+        line = None
+        traceback = error.__traceback__
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == FILENAME:
+                line = self.lolcode_line(traceback.tb_lineno)
+            traceback = traceback.tb_next
+        try:
+            error.lolcode_line = line
+        except AttributeError:
+            pass
+
+    # LOLCODE line for a line of the generated source (1-based)
+    def lolcode_line(self, python_line):
+        if 0 < python_line <= len(self.line_map):
+            return self.line_map[python_line - 1]
+        return None
+
+    # ---- runtime support called from generated code ----
+
+    def lookup(self, name):
+        function = self.functions.get(name)
+        if function is None:
+            raise NameError(f"Semantic Error: Function '{name}' not defined")
+        return function
+
+    # call a function with an isolated scope holding only its parameters and IT
+    def call(self, caller_scope, function, args):
+        name, params, body = function
+        if len(args) != len(params):
+            raise ValueError(f"Function '{name}' expects {len(params)} arguments, got {len(args)}")
+        scope = Scope(zip(params, args))
+        scope['IT'] = None
+        return_value = body(scope)
+        self.IT = return_value
+        caller_scope['IT'] = return_value
+        self.update_symbol_callback('IT', return_value)
+        return return_value
+
+    def gimmeh(self, scope, name):
+        if name not in scope:
+            raise NameError(f"Semantic Error: Variable '{name}' not declared")
+        input_value = self.read_input_callback(f"Enter value for {name}:")
+        scope[name] = input_value
+        self.update_symbol_callback(name, input_value)
+
+    def type_cast(self, scope, name, type_name):
+        if name not in scope:
+            raise KeyError(name)
+        casted_value = cast_value(scope[name], type_name)
+        scope[name] = casted_value
+        self.update_symbol_callback(name, casted_value)
+
+    # ---- code generation ----
+
+    # generate the Python source for the whole program
+    def translate(self):
+        main = self.translate_function('_main', self.program.statements, 0, in_function=False)
+        self.lines, self.line_map = [], []
+        for lines, line_map in self.function_sources + [main]:
+            self.lines.extend(lines)
+            self.line_map.extend(line_map)
+        return '\n'.join(self.lines) + '\n'
+
+    # generate one Python def, returning its (lines, line_map)
+    def translate_function(self, python_name, statements, line, in_function=True):
+        saved = self.lines, self.line_map, self.indent, self.in_function, self.break_errors
+        self.lines, self.line_map, self.indent = [], [], 0
+        self.in_function = in_function
+        self.break_errors = []
+        try:
+            self.emit(f"def {python_name}(v):", line)
+            self.indent += 1
+            self.translate_block(statements, line)
+            self.emit("return None", line)
+            return self.lines, self.line_map
+        finally:
+            self.lines, self.line_map, self.indent, self.in_function, self.break_errors = saved
+
+    # add a line of generated code for the given LOLCODE line
+    def emit(self, text, line):
+        self.lines.append('    ' * self.indent + text)
+        self.line_map.append(line)
+
+    # store a value in the constants table and return an expression for it
+    def constant(self, value):
+        self.constants.append(value)
+        return f"_constants[{len(self.constants) - 1}]"
+
+    def temp(self):
+        self.temp_count += 1
+        return f"_t{self.temp_count}"
+
+    def translate_block(self, statements, line):
+        if not statements:
+            self.emit("pass", line)
+        for statement in statements:
+            self.statement_translators[type(statement)](statement)
+
+    def expression(self, expression):
+        return self.expression_translators[type(expression)](expression)
+
+    # ---- statements ----
+
+    def translate_declaration(self, node):
+        value = 'None' if node.value is None else self.expression(node.value)
+        temp = self.temp()
+        self.emit(f"{temp} = {value}", node.line)
+        self.emit(f"v[{node.name!r}] = {temp}", node.line)
+        self.emit(f"_update({node.name!r}, {temp})", node.line)
+
+    def translate_assignment(self, node):
+        name = node.name
+        self.emit(f"if {name!r} not in v: raise NameError({f'Semantic Error: Variable {name!r} not declared'!r})", node.line)
+        temp = self.temp()
+        self.emit(f"{temp} = {self.expression(node.value)}", node.line)
+        self.emit(f"v[{name!r}] = {temp}", node.line)
+        self.emit(f"_update({name!r}, {temp})", node.line)
+        self.emit(f"_rt.IT = {temp}", node.line)
+        self.emit(f"_update('IT', {temp})", node.line)
+
+    def translate_visible(self, node):
+        parts = ', '.join(f"_str({self.expression(part)})" for part in node.parts)
+        self.emit(f"_write(''.join([{parts}]) + '\\n')", node.line)
+
+    def translate_gimmeh(self, node):
+        self.emit(f"_gimmeh(v, {node.name!r})", node.line)
+
+    def translate_type_cast(self, node):
+        self.emit(f"_type_cast(v, {node.name!r}, {node.type_name!r})", node.line)
+
+    def translate_expression_statement(self, node):
+        temp = self.temp()
+        self.emit(f"{temp} = {self.expression(node.expression)}", node.line)
+        self.emit(f"_rt.IT = {temp}", node.line)
+        self.emit(f"_update('IT', {temp})", node.line)
+
+    # O RLY? uses IT as condition, then each MEBBE condition in order
+    def translate_if(self, node):
+        self.emit("if _truthy(_rt.IT):", node.line)
+        self.translate_indented(node.then_body, node.line)
+        for condition, body in node.mebbe_clauses:
+            self.emit(f"elif _truthy({self.expression(condition)}):", node.line)
+            self.translate_indented(body, node.line)
+        if node.else_body is not None:
+            self.emit("else:", node.line)
+            self.translate_indented(node.else_body, node.line)
+        if node.end_error:
+            self.emit(f"raise {self.constant(node.end_error)}", node.line)
+
+    def translate_indented(self, statements, line):
+        self.indent += 1
+        self.translate_block(statements, line)
+        self.indent -= 1
+
+    # WTF? becomes an if/elif chain over the labels; each case body runs in a one-pass loop so GTFO is a break.
+    # After a case finishes without GTFO, the remaining labels are still evaluated and skipped cases
+    # validated; GTFO in a case only validates the cases after it (raised directly at the GTFO)
+    def translate_switch(self, node):
+        cases = node.cases
+        default = node.default
+        switch_value = self.temp()
+        self.emit(f"{switch_value} = _rt.IT", node.line)
+
+        keyword = 'if'
+        for i, case in enumerate(cases):
+            error = 'None' if case.skip_error is None else self.constant(case.skip_error)
+            self.emit(f"{keyword} _match({switch_value}, {self.expression(case.label)}, {error}):", case.line)
+            keyword = 'elif'
+            self.indent += 1
+            self.emit("for _ in (None,):", case.line)
+            self.indent += 1
+            self.break_errors.append(self.first_skip_error(cases[i + 1:], default))
+            self.translate_block(case.body, case.line)
+            self.break_errors.pop()
+            # post-match path
+            for later in cases[i + 1:]:
+                self.emit(self.expression(later.label), later.line)
+                if later.skip_error:
+                    self.emit(f"raise {self.constant(later.skip_error)}", later.line)
+            if default is not None and default.skip_error:
+                self.emit(f"raise {self.constant(default.skip_error)}", default.line)
+            self.indent -= 2
+
+        if default is not None:
+            if cases:
+                self.emit("else:", default.line)
+                self.indent += 1
+            self.emit("for _ in (None,):", default.line)
+            self.indent += 1
+            self.break_errors.append(None)
+            self.translate_block(default.body, default.line)
+            self.break_errors.pop()
+            self.indent -= 2 if cases else 1
+
+    # first validation error among skipped cases (and OMGWTF), or None
+    def first_skip_error(self, cases, default):
+        for case in cases:
+            if case.skip_error:
+                return case.skip_error
+        if default is not None and default.skip_error:
+            return default.skip_error
+        return None
+
+    def translate_loop(self, node):
+        loop_var = node.variable
+        line = node.line
+        if loop_var is not None:
+            message = f"Semantic Error: Loop variable {loop_var!r} not declared"
+            self.emit(f"if {loop_var!r} not in v: raise NameError({message!r})", line)
+        if node.invariants:
+            names = ' = '.join(self.invariant_name(invariant) for invariant in node.invariants)
+            self.emit(f"{names} = _unset", line)
+
+        self.emit("while True:", line)
+        self.indent += 1
+        if node.condition is not None:
+            condition = f"_truthy({self.expression(node.condition)})"
+            # TIL exits when the condition is true, WILE when it is false
+            if node.condition_type == TokenType.TIL:
+                self.emit(f"if {condition}: break", line)
+            else:
+                self.emit(f"if not {condition}: break", line)
+
+        self.break_errors.append(None)
+        self.translate_block(node.body, line)
+        self.break_errors.pop()
+
+        if loop_var is not None:
+            step = '+ 1' if node.operation == TokenType.UPPIN else '- 1'
+            self.emit(f"v[{loop_var!r}] = _to_number(v[{loop_var!r}]) {step}", line)
+            self.emit(f"_update({loop_var!r}, v[{loop_var!r}])", line)
+        self.indent -= 1
+
+        if node.end_error:
+            self.emit(f"raise {self.constant(node.end_error)}", line)
+
+    # the body becomes a separate def; defining the function at run time only registers it
+    def translate_function_definition(self, node):
+        self.function_count += 1
+        python_name = f"_function{self.function_count}"
+        self.function_sources.append(self.translate_function(python_name, node.body, node.line))
+        self.emit(f"_functions[{node.name!r}] = ({node.name!r}, {node.params!r}, {python_name})", node.line)
+
+    # GTFO breaks out of the innermost loop / switch case, or raises BreakException at top level
+    def translate_break(self, node):
+        if not self.break_errors:
+            self.emit("raise BreakException()", node.line)
+        elif self.break_errors[-1] is not None:
+            self.emit(f"raise {self.constant(self.break_errors[-1])}", node.line)
+        else:
+            self.emit("break", node.line)
+
+    def translate_return(self, node):
+        value = 'None' if node.value is None else self.expression(node.value)
+        if self.in_function:
+            self.emit(f"return {value}", node.line)
+        else:
+            self.emit(f"raise ReturnException({value})", node.line)
+
+    def translate_raise(self, node):
+        for operand in node.operands:
+            self.emit(self.expression(operand), node.line)
+        self.emit(f"raise {self.constant(node.error)}", node.line)
+
+    # ---- expressions ----
+
+    # inf and nan (a NUMBAR literal too large for a float) have no Python literal, so they come from the constants
+    def translate_literal(self, node):
+        value = node.value
+        if type(value) is float and not math.isfinite(value):
+            return self.constant(value)
+        return repr(value)
+
+    def translate_variable(self, node):
+        return f"v[{node.name!r}]"
+
+    def translate_numeric_op(self, node):
+        helper = NUMERIC_HELPERS[node.op]
+        return f"{helper}({self.expression(node.left)}, {self.expression(node.right)})"
+
+    def translate_comparison(self, node):
+        equal = f"_equal({self.expression(node.left)}, {self.expression(node.right)})"
+        return equal if node.op == TokenType.BOTH_SAEM else f"(not {equal})"
+
+    # ALL OF / BOTH OF become Python and, ANY OF / EITHER OF become or, so they stop at the same operand
+    def translate_boolean_op(self, node):
+        stop = SHORT_CIRCUIT_OPS.get(node.op)
+        if stop is not None:
+            joiner = ' or ' if stop else ' and '
+            return '(' + joiner.join(f"_truthy({self.expression(operand)})" for operand in node.operands) + ')'
+        operands = ', '.join(self.expression(operand) for operand in node.operands)
+        return f"_boolean({self.constant(node.op)}, [{operands}])"
+
+    def translate_not(self, node):
+        return f"(not _truthy({self.expression(node.operand)}))"
+
+    def translate_smoosh(self, node):
+        operands = ', '.join(self.expression(operand) for operand in node.operands)
+        return f"_smoosh([{operands}])"
+
+    def translate_cast(self, node):
+        return f"_cast({self.expression(node.operand)}, {node.type_name!r})"
+
+    def translate_bukkit_op(self, node):
+        operands = ', '.join(self.expression(operand) for operand in node.operands)
+        return f"_bukkit({self.constant(node.op)}, [{operands}])"
+
+    # the function is looked up before its arguments are evaluated
+    def translate_function_call(self, node):
+        args = ', '.join(self.expression(arg) for arg in node.args)
+        return f"_call(v, _lookup({node.name!r}), [{args}])"
+
+    # a hoisted loop invariant is a local of the generated def, computed the first time it runs in a run of its loop
+    def translate_invariant(self, node):
+        name = self.invariant_name(node)
+        return f"({name} if {name} is not _unset else ({name} := {self.expression(node.expression)}))"
+
+    def invariant_name(self, node):
+        return self.invariant_names.setdefault(id(node), f"_i{len(self.invariant_names) + 1}")
+
+    def translate_raise_expression(self, node):
+        operands = ''.join(f", {self.expression(operand)}" for operand in node.operands)
+        return f"_raise({self.constant(node.error)}{operands})"
+
+# usage: python transpiler.py program.lol   (prints the generated Python source)
+if __name__ == "__main__":
+    from lexer import Lexer
+    from ast_builder import ASTBuilder
+    with open(sys.argv[1]) as source_file:
+        program = ASTBuilder(Lexer(source_file.read()).tokenize()).build()
+    print(PythonTranspiler(program, None, None, None).translate())
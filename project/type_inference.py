@@ -0,0 +1,424 @@
+from token_types import TokenType  # Import TokenType Enum
+from runtime import TYPE_NAMES, SHORT_CIRCUIT_OPS  # Import value type names and the boolean operators that stop early
+from ast_nodes import (Literal, Variable, NumericOp, Comparison, BooleanOp, Not, Smoosh, Cast, BukkitOp,
+                       FunctionCall, Invariant, Declaration, Assignment, Visible, Gimmeh, TypeCast, ExpressionStatement,
+                       If, Switch, Loop, FunctionDef, Break, Return, Raise)  # Import AST node classes
+
+# an expression that never produces a value (it always raises, or calls a function that never returns);
+# merging it with a type gives that type
+NEVER = 'NEVER'
+
+# operators whose NUMBR / NUMBAR result type follows from the operand types alone
+# (QUOSHUNT OF and MOD OF by zero give NUMBR 0 even for NUMBARs; BIGGR OF / SMALLR OF of a NUMBR
+# and a NUMBAR return whichever operand wins)
+NUMBAR_RESULT_OPS = (TokenType.SUM_OF, TokenType.DIFF_OF, TokenType.PRODUKT_OF)
+
+# type a value can have at a point reached along two paths with types first and second
+def merge_types(first, second):
+    if first == NEVER:
+        return second
+    if second == NEVER or first == second:
+        return first
+    return None
+
+def merge_envs(first, second):
+    return {name: merge_types(first.get(name, NEVER), second.get(name, NEVER))
+            for name in first.keys() | second.keys()}
+
+# result type of MAEK / IS NOW A (see runtime.cast_value)
+def cast_type(operand, type_name):
+    if operand == NEVER:
+        return NEVER
+    type_upper = type_name.upper()
+    if type_upper in ('NUMBR', 'TROOF', 'YARN'):
+        return type_upper
+    if type_upper == 'NUMBAR':
+        # NOOB becomes 0.0, everything else goes through to_number unchanged in type
+        if operand == 'NOOB':
+            return 'NUMBAR'
+        return operand if operand in ('NUMBR', 'NUMBAR', 'TROOF') else None
+    # other type names leave the value as it is
+    return operand
+
+# result type of a numeric operator (see runtime.numeric_op)
+def numeric_type(op, left, right):
+    if left == NEVER or right == NEVER:
+        return NEVER
+    if left == 'NUMBR' and right == 'NUMBR':
+        return 'NUMBR'
+    if left in ('NUMBR', 'NUMBAR') and right in ('NUMBR', 'NUMBAR'):
+        if op in NUMBAR_RESULT_OPS or (left == right == 'NUMBAR' and op not in (TokenType.QUOSHUNT_OF, TokenType.MOD_OF)):
+            return 'NUMBAR'
+    return None
+
+# type of the loop variable after UPPIN / NERFIN (to_number(value) + 1)
+def step_type(value):
+    if value in ('NUMBR', 'TROOF'):
+        return 'NUMBR'
+    if value in ('NUMBAR', NEVER):
+        return value
+    return None
+
+# TypeInference class: flow-sensitive type inference over a Program AST
+# follows every path through the program with the type of each variable (None when it is not known),
+# merging at the end of branches, switches and loops (run to a fixed point) and at GTFO targets.
+# Functions only see their parameters, whose types are unknown; a call has the merged type of what
+# every definition of the function can return.
+# Results:
+#   types[id(expression)]  - the type every value of the expression has, for expressions where it is proven
+#   variable_types         - scope name ('' for the main program) -> variable -> set of types it is given
+#   report                 - (line, description) for each variable type and each arithmetic on a YARN,
+#                            which is coerced on every evaluation
+class TypeInference:
+    def __init__(self):
+        self.types = {}
+        self.variable_types = {}
+        self.visits = {}         # id(expression) -> merged type over every visit
+        self.first_lines = {}    # (scope, variable) -> first line that gives it a type
+        self.return_types = {}   # function name -> merged return type
+        self.break_envs = None   # environments at the GTFOs of the innermost loop / switch
+        self.return_type = None  # merged return type of the function being analyzed
+        self.scope_types = None  # variable -> set of types, for the scope being analyzed
+        self.scope_name = None
+        self.yarn_operations = {}  # line -> names of the numeric operators applied to a YARN there
+
+        # node class -> handler taking (node, env) and updating env
+        self.statement_handlers = {
+            Declaration: self.infer_declaration,
+            Assignment: self.infer_assignment,
+            Visible: self.infer_visible,
+            Gimmeh: self.infer_gimmeh,
+            TypeCast: self.infer_type_cast,
+            ExpressionStatement: self.infer_expression_statement,
+            If: self.infer_if,
+            Switch: self.infer_switch,
+            Loop: self.infer_loop,
+            FunctionDef: self.infer_nothing,
+            Break: self.infer_break,
+            Return: self.infer_return,
+            Raise: self.infer_raise,
+        }
+        # node class -> handler taking (node, env) and returning the expression type
+        self.expression_handlers = {
+            Literal: self.type_literal,
+            Variable: self.type_variable,
+            NumericOp: self.type_numeric_op,
+            Comparison: self.type_comparison,
+            BooleanOp: self.type_boolean_op,
+            Not: self.type_not,
+            Smoosh: self.type_smoosh,
+            Cast: self.type_cast,
+            BukkitOp: self.type_bukkit_op,
+            FunctionCall: self.type_function_call,
+            Invariant: self.type_invariant,
+            Raise: self.type_raise,
+        }
+
+    # infer types for a whole program, returns self
+    def infer(self, program):
+        definitions = {}
+        for statement in program.statements:
+            collect_function_definitions(statement, definitions)
+
+        # return types grow from NEVER until none of them changes
+        self.return_types = {name: NEVER for name in definitions}
+        changed = True
+        while changed:
+            changed = False
+            for name, nodes in definitions.items():
+                return_type = NEVER
+                for node in nodes:
+                    return_type = merge_types(return_type, self.infer_function(node))
+                if return_type != self.return_types[name]:
+                    self.return_types[name] = return_type
+                    changed = True
+
+        # final pass over everything with the settled return types
+        self.visits = {}
+        self.variable_types = {}
+        self.first_lines = {}
+        self.yarn_operations = {}
+        self.infer_scope('', program.statements, {})
+        for nodes in definitions.values():
+            for node in nodes:
+                self.infer_function(node)
+        self.types = {key: value for key, value in self.visits.items() if value is not None and value != NEVER}
+        return self
+
+    # report as text, one line per entry
+    def format_report(self):
+        return '\n'.join(f"line {line}: {description}" for line, description in self.report)
+
+    # merged return type of one function definition
+    def infer_function(self, node):
+        saved = self.return_type
+        self.return_type = NEVER
+        try:
+            self.infer_scope(node.name, node.body, {param: None for param in node.params})
+            # falling off the end returns NOOB
+            if always_leaves(node.body):
+                return self.return_type
+            return merge_types(self.return_type, 'NOOB')
+        finally:
+            self.return_type = saved
+
+    # analyze the statements of one scope, recording the types its variables are given
+    def infer_scope(self, scope, statements, env):
+        saved = self.scope_types, self.scope_name, self.break_envs
+        self.scope_types = self.variable_types.setdefault(scope, {})
+        self.scope_name = scope
+        self.break_envs = None
+        try:
+            return self.infer_block(statements, env)
+        finally:
+            self.scope_types, self.scope_name, self.break_envs = saved
+
+    def infer_block(self, statements, env):
+        for statement in statements:
+            self.statement_handlers[type(statement)](statement, env)
+        return env
+
+    # type of an expression; what it is on every visit ends up in types
+    def type_of(self, expression, env):
+        expression_type = self.expression_handlers[type(expression)](expression, env)
+        key = id(expression)
+        self.visits[key] = merge_types(self.visits.get(key, NEVER), expression_type)
+        return expression_type
+
+    # the IT variable is set by every expression statement and call, so it is never tracked
+    def assign(self, env, name, value_type, line):
+        if name == 'IT':
+            return
+        env[name] = value_type
+        if value_type != NEVER:
+            self.scope_types.setdefault(name, set()).add(value_type)
+            self.first_lines.setdefault((self.scope_name, name), line)
+
+    # ---- statements ----
+
+    def infer_nothing(self, node, env):
+        pass
+
+    def infer_declaration(self, node, env):
+        value_type = 'NOOB' if node.value is None else self.type_of(node.value, env)
+        self.assign(env, node.name, value_type, node.line)
+
+    def infer_assignment(self, node, env):
+        self.assign(env, node.name, self.type_of(node.value, env), node.line)
+
+    def infer_visible(self, node, env):
+        for part in node.parts:
+            self.type_of(part, env)
+
+    # GIMMEH stores whatever the input callback returns
+    def infer_gimmeh(self, node, env):
+        self.assign(env, node.name, None, node.line)
+
+    def infer_type_cast(self, node, env):
+        self.assign(env, node.name, cast_type(env.get(node.name), node.type_name), node.line)
+
+    def infer_expression_statement(self, node, env):
+        self.type_of(node.expression, env)
+
+    # every branch starts from env; what runs after the O RLY? sees any of their results
+    def infer_if(self, node, env):
+        branches = [self.infer_block(node.then_body, dict(env))]
+        for condition, body in node.mebbe_clauses:
+            self.type_of(condition, env)
+            branches.append(self.infer_block(body, dict(env)))
+        if node.else_body is not None:
+            branches.append(self.infer_block(node.else_body, dict(env)))
+        else:
+            branches.append(dict(env))
+        self.merge_into(env, branches)
+
+    # at most one case (or OMGWTF) runs; GTFO leaves the switch
+    def infer_switch(self, node, env):
+        saved_breaks, self.break_envs = self.break_envs, []
+        try:
+            branches = [dict(env)]
+            for case in node.cases:
+                self.type_of(case.label, env)
+                branches.append(self.infer_block(case.body, dict(env)))
+            if node.default is not None:
+                branches.append(self.infer_block(node.default.body, dict(env)))
+            branches.extend(self.break_envs)
+        finally:
+            self.break_envs = saved_breaks
+        self.merge_into(env, branches)
+
+    # the types at the top of the loop are merged with the types after each iteration until they settle;
+    # the loop ends at the condition check (types at the top) or at a GTFO
+    def infer_loop(self, node, env):
+        saved_breaks = self.break_envs
+        top = dict(env)
+        try:
+            while True:
+                self.break_envs = []
+                if node.condition is not None:
+                    self.type_of(node.condition, top)
+                end = self.infer_block(node.body, dict(top))
+                if node.variable is not None and node.variable in end:
+                    end[node.variable] = step_type(end[node.variable])
+                merged = merge_envs(top, end)
+                if merged == top:
+                    break
+                top = merged
+            branches = [top] + self.break_envs
+        finally:
+            self.break_envs = saved_breaks
+        if node.variable is not None and node.variable in top and top[node.variable] != NEVER:
+            self.scope_types.setdefault(node.variable, set()).add(top[node.variable])
+            self.first_lines.setdefault((self.scope_name, node.variable), node.line)
+        self.merge_into(env, branches)
+
+    def infer_break(self, node, env):
+        if self.break_envs is not None:
+            self.break_envs.append(dict(env))
+
+    def infer_return(self, node, env):
+        value_type = 'NOOB' if node.value is None else self.type_of(node.value, env)
+        self.return_type = merge_types(self.return_type, value_type)
+
+    # the operands run before the error is raised
+    def infer_raise(self, node, env):
+        for operand in node.operands:
+            self.type_of(operand, env)
+
+    def merge_into(self, env, branches):
+        merged = branches[0]
+        for branch in branches[1:]:
+            merged = merge_envs(merged, branch)
+        env.clear()
+        env.update(merged)
+
+    # ---- expressions ----
+
+    def type_literal(self, node, env):
+        return TYPE_NAMES.get(type(node.value))
+
+    def type_variable(self, node, env):
+        return env.get(node.name)
+
+    def type_numeric_op(self, node, env):
+        left = self.type_of(node.left, env)
+        right = self.type_of(node.right, env)
+        if 'YARN' in (left, right):
+            self.yarn_operations.setdefault(node.line, set()).add(node.op.value)
+        return numeric_type(node.op, left, right)
+
+    def type_comparison(self, node, env):
+        left = self.type_of(node.left, env)
+        right = self.type_of(node.right, env)
+        return NEVER if NEVER in (left, right) else 'TROOF'
+
+    # ALL OF / BOTH OF / ANY OF / EITHER OF can stop before an operand that never gives a value
+    def type_boolean_op(self, node, env):
+        operand_types = [self.type_of(operand, env) for operand in node.operands]
+        if node.op in SHORT_CIRCUIT_OPS:
+            return NEVER if operand_types[0] == NEVER else 'TROOF'
+        return NEVER if NEVER in operand_types else 'TROOF'
+
+    def type_not(self, node, env):
+        return NEVER if self.type_of(node.operand, env) == NEVER else 'TROOF'
+
+    def type_smoosh(self, node, env):
+        operand_types = [self.type_of(operand, env) for operand in node.operands]
+        return NEVER if NEVER in operand_types else 'YARN'
+
+    def type_cast(self, node, env):
+        return cast_type(self.type_of(node.operand, env), node.type_name)
+
+    # elements can have any type; PUT IN and SHUV IN give the value they store
+    def type_bukkit_op(self, node, env):
+        operand_types = [self.type_of(operand, env) for operand in node.operands]
+        if NEVER in operand_types:
+            return NEVER
+        if node.op == TokenType.BUKKIT:
+            return 'BUKKIT'
+        if node.op == TokenType.SIZ_OF:
+            return 'NUMBR'
+        if node.op in (TokenType.PUT_IN, TokenType.SHUV_IN):
+            return operand_types[-1]
+        return None
+
+    def type_function_call(self, node, env):
+        arg_types = [self.type_of(arg, env) for arg in node.args]
+        if NEVER in arg_types:
+            return NEVER
+        # calling an undefined function raises
+        return self.return_types.get(node.name, NEVER)
+
+    def type_invariant(self, node, env):
+        return self.type_of(node.expression, env)
+
+    def type_raise(self, node, env):
+        self.infer_raise(node, env)
+        return NEVER
+
+    # ---- report ----
+
+    # one entry per variable (at the line that first gives it a type) and per line with YARN arithmetic
+    # (built when asked for: compiling only needs types)
+    @property
+    def report(self):
+        report = []
+        for scope, variables in self.variable_types.items():
+            where = f"in {scope}" if scope else "in the main program"
+            for name, variable_types in variables.items():
+                names = sorted('unknown' if value_type is None else value_type for value_type in variable_types)
+                report.append((self.first_lines[(scope, name)], f"{name} {where} is {' or '.join(names)}"))
+        for line, ops in self.yarn_operations.items():
+            report.append((line, f"{' / '.join(sorted(ops))} on a YARN converts it every time it runs"))
+        return sorted(report, key=lambda entry: entry[0])
+
+# True when running statements never reaches their end (they always return, break or raise)
+def always_leaves(statements):
+    for statement in statements:
+        node_type = type(statement)
+        if node_type in (Return, Break, Raise):
+            return True
+        # a loop without a condition only ends with GTFO, which returns inside a function
+        if node_type is Loop and statement.condition is None and not contains_break(statement.body):
+            return True
+        if node_type is If and statement.else_body is not None:
+            bodies = [statement.then_body, statement.else_body, *(body for _, body in statement.mebbe_clauses)]
+            if all(always_leaves(body) for body in bodies):
+                return True
+    return False
+
+# True when statements contain a Break that leaves them (one outside any nested loop or switch)
+def contains_break(statements):
+    for statement in statements:
+        node_type = type(statement)
+        if node_type is Break:
+            return True
+        if node_type is If:
+            bodies = [statement.then_body, *(body for _, body in statement.mebbe_clauses)]
+            if statement.else_body is not None:
+                bodies.append(statement.else_body)
+            if any(contains_break(body) for body in bodies):
+                return True
+    return False
+
+# add the FunctionDef nodes in statement (and nested in it) to definitions (name -> nodes)
+def collect_function_definitions(statement, definitions):
+    node_type = type(statement)
+    if node_type is FunctionDef:
+        definitions.setdefault(statement.name, []).append(statement)
+        bodies = [statement.body]
+    elif node_type is If:
+        bodies = [statement.then_body, *(body for _, body in statement.mebbe_clauses)]
+        if statement.else_body is not None:
+            bodies.append(statement.else_body)
+    elif node_type is Switch:
+        bodies = [case.body for case in statement.cases]
+        if statement.default is not None:
+            bodies.append(statement.default.body)
+    elif node_type is Loop:
+        bodies = [statement.body]
+    else:
+        return
+    for body in bodies:
+        for nested in body:
+            collect_function_definitions(nested, definitions)
@@ -0,0 +1,241 @@
+from LOL_exceptions import BreakException, ReturnException  # Import custom exceptions for control flow
+from runtime import to_number, is_truthy, stringify, cast_value, values_equal, numeric_op, boolean_op, smoosh, bukkit_op  # Import runtime value helpers
+import bytecode  # Import opcodes
+from bytecode import BytecodeCompiler, NUMERIC_OPERATORS  # Import bytecode compiler
+
+# default limit on nested LOLCODE function calls in the VM
+DEFAULT_FRAME_BUDGET = 1000000
+
+# VirtualMachine class for executing a Program AST as bytecode
+# the program is compiled once by BytecodeCompiler, then each CodeObject runs in a dispatch loop
+# over an operand stack; loops, conditionals and GTFO are jumps instead of exceptions.
+# Function calls do not recurse in Python: CALL saves the caller's frame (code, operand stack, pc,
+# variables, hoisted loop invariants) on a heap stack and switches to the callee, RETURN switches back. Recursion depth is
+# only limited by frame_budget, and running out of it is a LOLCODE runtime error.
+# Semantics (scoping, IT, callbacks, error messages) follow Evaluator.
+class VirtualMachine:
+    # Initialize VM with program and callbacks for symbol table updates and console I/O
+    def __init__(self, program, update_symbol_callback, write_console_callback, read_input_callback,
+                 frame_budget=DEFAULT_FRAME_BUDGET):
+        self.program = program
+        self.frame_budget = frame_budget
+        self.variables = {"IT": None}
+        self.IT = None
+        self.update_symbol_callback = update_symbol_callback
+        self.write_console_callback = write_console_callback
+        self.read_input_callback = read_input_callback
+        self.functions = {}
+        self.code = None
+
+    # compile the whole program once, then run it
+    def run(self):
+        if self.code is None:
+            self.code = BytecodeCompiler(self.program).compile()
+        self.execute(self.code)
+
+    # run a CodeObject (and every function it calls) until its RETURN and return the returned value
+    # (opcodes are tested roughly in order of how often they run)
+    def execute(self, code):
+        # an error inside a function leaves the outermost caller's variables in place
+        frames = []
+        try:
+            return self.dispatch(code, frames)
+        except BaseException:
+            if frames:
+                self.variables = frames[0][4]
+            raise
+
+    # dispatch loop; frames holds (code, instructions, stack, pc, variables, invariants) of every suspended caller
+    # (invariants maps the index of each hoisted loop invariant computed in the frame to its value)
+    def dispatch(self, code, frames):
+        instructions = code.instructions
+        update = self.update_symbol_callback
+        frame_budget = self.frame_budget
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        invariants = {}
+
+        # opcodes as locals: global lookups would cost more than most instructions in the dispatch chain
+        LOAD_NAME, LOAD_CONST, JUMP, POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE = (
+            bytecode.LOAD_NAME, bytecode.LOAD_CONST, bytecode.JUMP, bytecode.POP_JUMP_IF_FALSE, bytecode.POP_JUMP_IF_TRUE)
+        ADD, SUB, MUL, EQ, NE = bytecode.ADD, bytecode.SUB, bytecode.MUL, bytecode.EQ, bytecode.NE
+        ASSIGN, CHECK_VAR, STEP_VAR, SET_IT, LOAD_IT = (
+            bytecode.ASSIGN, bytecode.CHECK_VAR, bytecode.STEP_VAR, bytecode.SET_IT, bytecode.LOAD_IT)
+        FUNCTION, CALL, RETURN, PRINT, SMOOSH, MATCH, POP, NOT = (
+            bytecode.FUNCTION, bytecode.CALL, bytecode.RETURN, bytecode.PRINT, bytecode.SMOOSH,
+            bytecode.MATCH, bytecode.POP, bytecode.NOT)
+        LOAD_INVARIANT = bytecode.LOAD_INVARIANT
+
+        while True:
+            opcode, arg = instructions[pc]
+            pc += 1
+
+            if opcode == LOAD_NAME:
+                try:
+                    push(self.variables[arg])
+                except KeyError:
+                    raise NameError(f"Semantic Error: Variable '{arg}' not declared") from None
+            elif opcode == LOAD_CONST:
+                push(arg)
+            elif opcode == JUMP:
+                pc = arg
+            elif opcode == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is False or (value is not True and not is_truthy(value)):
+                    pc = arg
+            elif opcode == POP_JUMP_IF_TRUE:
+                value = pop()
+                if value is True or (value is not False and is_truthy(value)):
+                    pc = arg
+            elif opcode == LOAD_INVARIANT:
+                index, target = arg
+                if index in invariants:
+                    push(invariants[index])
+                    pc = target
+            elif opcode == ADD or opcode == SUB or opcode == MUL:
+                right = pop()
+                left = pop()
+                # NUMBR op NUMBR stays exact; everything else goes through the coercion rules
+                if type(left) is int and type(right) is int:
+                    if opcode == ADD:
+                        push(left + right)
+                    elif opcode == SUB:
+                        push(left - right)
+                    else:
+                        push(left * right)
+                else:
+                    push(numeric_op(NUMERIC_OPERATORS[opcode], left, right))
+            elif opcode in NUMERIC_OPERATORS:
+                right = pop()
+                push(numeric_op(NUMERIC_OPERATORS[opcode], pop(), right))
+            elif opcode == EQ or opcode == NE:
+                right = pop()
+                left = pop()
+                # same-type values compare directly (the first rule of values_equal)
+                equal = left == right if type(left) is type(right) else values_equal(left, right)
+                push(equal if opcode == EQ else not equal)
+            elif opcode == ASSIGN:
+                value = pop()
+                self.variables[arg] = value
+                update(arg, value)
+                self.IT = value
+                update('IT', value)
+            elif opcode == CHECK_VAR:
+                if arg not in self.variables:
+                    raise NameError(f"Semantic Error: Variable '{arg}' not declared")
+            elif opcode == STEP_VAR:
+                name, step = arg
+                variables = self.variables
+                variables[name] = to_number(variables[name]) + step
+                update(name, variables[name])
+            elif opcode == SET_IT:
+                self.IT = pop()
+                update('IT', self.IT)
+            elif opcode == LOAD_IT:
+                push(self.IT)
+            elif opcode == FUNCTION:
+                function = self.functions.get(arg)
+                if function is None:
+                    raise NameError(f"Semantic Error: Function '{arg}' not defined")
+                push(function)
+            elif opcode == CALL:
+                # call a function with an isolated scope holding only its parameters and IT
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = []
+                name, params, callee = pop()
+                if len(args) != len(params):
+                    raise ValueError(f"Function '{name}' expects {len(params)} arguments, got {len(args)}")
+                if len(frames) >= frame_budget:
+                    raise RuntimeError(f"Runtime Error: Function calls nested more than {frame_budget} deep "
+                                       f"(calling '{name}')")
+
+                frames.append((code, instructions, stack, pc, self.variables, invariants))
+                invariants = {}
+                scope = dict(zip(params, args))
+                scope['IT'] = None
+                self.variables = scope
+                code = callee
+                instructions = callee.instructions
+                stack = []
+                push = stack.append
+                pop = stack.pop
+                pc = 0
+            elif opcode == RETURN:
+                return_value = pop()
+                if not frames:
+                    return return_value
+
+                # back to the caller: its IT is the returned value
+                code, instructions, stack, pc, variables, invariants = frames.pop()
+                self.variables = variables
+                push = stack.append
+                pop = stack.pop
+                self.IT = return_value
+                variables['IT'] = return_value
+                update('IT', return_value)
+                push(return_value)
+            elif opcode == PRINT:
+                parts = stack[-arg:] if arg else []
+                del stack[len(stack) - len(parts):]
+                self.write_console_callback(''.join([stringify(part) for part in parts]) + '\n')
+            elif opcode == SMOOSH:
+                parts = stack[-arg:] if arg else []
+                del stack[len(stack) - len(parts):]
+                push(smoosh(parts))
+            elif opcode == MATCH:
+                label = pop()
+                push(values_equal(stack[-1], label))
+            elif opcode == POP:
+                pop()
+            elif opcode == NOT:
+                push(not is_truthy(pop()))
+            elif opcode == bytecode.BOOL_OP:
+                op, count = arg
+                values = stack[-count:] if count else []
+                del stack[len(stack) - len(values):]
+                push(boolean_op(op, values))
+            elif opcode == bytecode.CAST:
+                push(cast_value(pop(), arg))
+            elif opcode == bytecode.BUKKIT_OP:
+                op, count = arg
+                values = stack[-count:] if count else []
+                del stack[len(stack) - len(values):]
+                push(bukkit_op(op, values))
+            elif opcode == bytecode.STORE_INVARIANT:
+                invariants[arg] = stack[-1]
+            elif opcode == bytecode.RESET_INVARIANTS:
+                for index in arg:
+                    invariants.pop(index, None)
+            elif opcode == bytecode.DECLARE:
+                value = pop()
+                self.variables[arg] = value
+                update(arg, value)
+            elif opcode == bytecode.CHECK_LOOP_VAR:
+                if arg not in self.variables:
+                    raise NameError(f"Semantic Error: Loop variable '{arg}' not declared")
+            elif opcode == bytecode.CAST_VAR:
+                name, type_name = arg
+                casted_value = cast_value(self.variables[name], type_name)
+                self.variables[name] = casted_value
+                update(name, casted_value)
+            elif opcode == bytecode.READ:
+                if arg not in self.variables:
+                    raise NameError(f"Semantic Error: Variable '{arg}' not declared")
+                input_value = self.read_input_callback(f"Enter value for {arg}:")
+                self.variables[arg] = input_value
+                update(arg, input_value)
+            elif opcode == bytecode.DEFINE:
+                self.functions[arg[0]] = arg
+            elif opcode == bytecode.BREAK:
+                raise BreakException()
+            elif opcode == bytecode.RAISE:
+                raise arg
+            elif opcode == bytecode.UNWIND:
+                raise ReturnException(pop())
+            else:
+                raise RuntimeError(f"Unknown opcode {opcode} at {pc - 1} in {code.name}")